@@ -0,0 +1,3 @@
+from agents.registry import get_agent, list_agents, register_agent
+
+__all__ = ["get_agent", "list_agents", "register_agent"]
@@ -0,0 +1,170 @@
+"""Run many briefs through the agents concurrently.
+
+Every brief gets a new instance of its agent from the agent's factory, with
+its own model, memory and session (``batch-<id>-<agent>-<n>``). The session ID
+is also the brief's user ID, so the user memories a brief reads and writes are
+its own. Only the knowledge base and tools of the registry's instance are
+shared, so nothing a run leaves on the agent leaks into another brief. Up to ``concurrency`` briefs
+run at once on agno's async path, and results are yielded as each brief
+finishes. Rate limits are the key pool's business: past them, more concurrency
+only queues in the pool.
+
+    python -m agents.batch content_creator briefs.txt --concurrency 8
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional, Sequence
+
+from agents import config
+from agents.registry import build_agent, get_agent, get_factory, list_agents
+
+if TYPE_CHECKING:
+    from agents.prompt_cache import PromptUsage
+
+logger = logging.getLogger(__name__)
+
+# What a brief's agent borrows from the shared instance: read-only and expensive to build
+SHARED = ("knowledge", "tools")
+
+
+@dataclass
+class BriefResult:
+    agent_id: str
+    index: int
+    brief: str
+    session_id: str
+    content: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    usage: Optional["PromptUsage"] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def user_id(self) -> str:
+        """Memories are kept per brief, under the brief's session ID."""
+        return self.session_id
+
+    def __str__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"{self.agent_id}[{self.index}] {self.seconds:.1f}s {status}"
+
+
+def brief_agent(agent_id: str):
+    """A fresh ``agent_id`` for one brief, sharing the registry instance's knowledge base and tools."""
+    shared = get_agent(agent_id)
+    params = inspect.signature(get_factory(agent_id)).parameters
+    return build_agent(agent_id, **{name: getattr(shared, name) for name in SHARED if name in params})
+
+
+async def prefetch_references(agent, brief: str) -> None:
+    """Look up the brief's references in a thread ahead of ``arun``.
+
+    agno's async run still searches the knowledge base for ``add_references``
+    synchronously, which would stall every other brief on the event loop. The
+    agent then gets the prefetched references for the brief; other lookups
+    (the ``search_knowledge_base`` tool) go through as before.
+    """
+    if not getattr(agent, "add_references", False) or getattr(agent, "knowledge", None) is None:
+        return
+    lookup = agent.get_relevant_docs_from_knowledge
+    references = await asyncio.to_thread(lookup, brief)
+
+    def prefetched(query: str, num_documents: Optional[int] = None, filters=None, **kwargs):
+        if query == brief and num_documents is None and not filters and not kwargs:
+            return references
+        return lookup(query, num_documents, filters, **kwargs)
+
+    agent.get_relevant_docs_from_knowledge = prefetched
+
+
+async def run_batch(batches: Dict[str, Sequence[str]], concurrency: int = config.BATCH_CONCURRENCY,
+                    build: Callable[[str], object] = brief_agent,
+                    batch_id: Optional[str] = None) -> AsyncIterator[BriefResult]:
+    """Run the briefs of every agent in ``batches``, yielding each result as its brief finishes.
+
+    A failed brief is a result with ``error`` set; the rest of the batch keeps
+    going.
+    """
+    # Imported here: it pulls in google-genai
+    from agents.prompt_cache import track_prompt_usage
+
+    batch_id = batch_id or uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_brief(agent_id: str, index: int, brief: str) -> BriefResult:
+        async with semaphore:
+            result = BriefResult(agent_id, index, brief, f"batch-{batch_id}-{agent_id}-{index}")
+            start = time.perf_counter()
+            # Each task runs in its own copy of the context, so usage is counted per brief
+            with track_prompt_usage() as usage:
+                try:
+                    agent = await asyncio.to_thread(build, agent_id)
+                    await prefetch_references(agent, brief)
+                    response = await agent.arun(brief, stream=False, session_id=result.session_id,
+                                                user_id=result.user_id)
+                    result.content = response.content
+                except Exception as e:
+                    logger.warning(f"Brief {index} of {agent_id} failed: {e}")
+                    result.error = f"{type(e).__name__}: {e}"
+            result.seconds = time.perf_counter() - start
+            result.usage = usage
+            return result
+
+    tasks = [asyncio.create_task(run_brief(agent_id, index, brief))
+             for agent_id, briefs in batches.items() for index, brief in enumerate(briefs)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The consumer stopped early or was cancelled
+        for task in tasks:
+            task.cancel()
+
+
+def run_briefs(agent_id: str, briefs: Sequence[str], concurrency: int = config.BATCH_CONCURRENCY,
+               build: Callable[[str], object] = brief_agent) -> AsyncIterator[BriefResult]:
+    return run_batch({agent_id: briefs}, concurrency, build)
+
+
+def save_result(result: BriefResult, directory: Path) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory.joinpath(f"{result.agent_id}-{result.index:03d}.md")
+    path.write_text(result.content or "")
+    return path
+
+
+async def _main(args) -> None:
+    briefs = [line.strip() for line in Path(args.briefs).read_text().splitlines() if line.strip()]
+    batch_id = uuid.uuid4().hex[:8]
+    directory = Path(args.output or config.BATCH_OUTPUT_DIR.joinpath(batch_id))
+    start, failed = time.perf_counter(), 0
+    async for result in run_batch({args.agent: briefs}, args.concurrency, batch_id=batch_id):
+        if result.ok:
+            print(f"{result}  -> {save_result(result, directory)}", flush=True)
+        else:
+            failed += 1
+            print(result, flush=True)
+    seconds = time.perf_counter() - start
+    print(f"{len(briefs)} briefs in {seconds:.1f}s ({len(briefs) / seconds:.2f}/s), {failed} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent", choices=list_agents())
+    parser.add_argument("briefs", help="a text file with one brief per line")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY)
+    parser.add_argument("--output", help=f"where results go (default {config.BATCH_OUTPUT_DIR}/<batch id>)")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
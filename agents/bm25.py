@@ -0,0 +1,126 @@
+"""Local BM25 inverted index over knowledge chunks."""
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:['’-][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i if in into is it its of on or our so that the their "
+    "them then there these they this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over chunk IDs, persisted as JSON.
+
+    Besides postings it keeps each chunk's content, name and metadata so a
+    keyword hit can be returned without touching the vector DB.
+    """
+
+    def __init__(self, path: Optional[Path] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self.version = -1
+        self.docs: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.total_length = 0
+        self._lock = threading.RLock()
+        if self.path and self.path.exists():
+            self._read()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _read(self) -> None:
+        with open(self.path) as f:
+            data = json.load(f)
+        self.version = data.get("version", -1)
+        for doc_id, doc in data["docs"].items():
+            self._index(doc_id, doc)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"version": self.version, "docs": self.docs}, f)
+            tmp.replace(self.path)
+
+    def _index(self, doc_id: str, doc: dict) -> None:
+        terms = Counter(tokenize(doc["content"]))
+        doc["length"] = sum(terms.values())
+        self.docs[doc_id] = doc
+        self.total_length += doc["length"]
+        for term, tf in terms.items():
+            self.postings[term][doc_id] = tf
+
+    def add(self, doc_id: str, content: str, name: Optional[str] = None, meta_data: Optional[dict] = None) -> None:
+        with self._lock:
+            if doc_id in self.docs:
+                self.remove([doc_id])
+            self._index(doc_id, {"content": content, "name": name, "meta_data": meta_data or {}})
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in doc_ids:
+                doc = self.docs.pop(doc_id, None)
+                if doc is None:
+                    continue
+                self.total_length -= doc["length"]
+                for term in set(tokenize(doc["content"])):
+                    postings = self.postings.get(term)
+                    if postings is not None:
+                        postings.pop(doc_id, None)
+                        if not postings:
+                            del self.postings[term]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.docs.clear()
+            self.postings.clear()
+            self.total_length = 0
+
+    def idf(self, term: str) -> float:
+        n = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.docs) - n + 0.5) / (n + 0.5))
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        terms = tokenize(query)
+        with self._lock:
+            if not terms or not self.docs:
+                return []
+            avg_length = self.total_length / len(self.docs)
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(terms):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = self.idf(term)
+                for doc_id, tf in postings.items():
+                    length = self.docs[doc_id]["length"]
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def phrase_matches(self, phrase: str, doc_ids: Sequence[str]) -> List[str]:
+        needle = " ".join(phrase.lower().split())
+        return [d for d in doc_ids if needle in " ".join(self.docs[d]["content"].lower().split())]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
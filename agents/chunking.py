@@ -0,0 +1,277 @@
+"""Chunking strategies that don't need a model call per chunk boundary.
+
+``SemanticChunking`` splits locally on headings, sentence boundaries and drops
+in similarity between neighbouring sentences. ``CachedAgenticChunking`` keeps
+agno's LLM-driven chunking but memoizes its output by page content hash, so an
+unchanged page is never sent to the model twice once the model has answered
+for all of it.
+"""
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from hashlib import sha256
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from agno.document.base import Document
+from agno.document.chunking.agentic import AgenticChunking
+from agno.document.chunking.strategy import ChunkingStrategy
+from agno.models.message import Message
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9•\-*])")
+_WORD = re.compile(r"[a-z0-9]+")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 80:
+        return False
+    if line.startswith("#"):
+        return True
+    if re.match(r"^(?:\d+(?:\.\d+)*\.?|[IVX]+\.|chapter\s+\d+)\s+\S", line, re.IGNORECASE) and not line.endswith("."):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 3 and all(c.isupper() for c in letters):
+        return True
+    words = line.split()
+    return len(words) <= 8 and line[-1] not in ".,;:!?" and sum(w[0].isupper() for w in words) >= len(words) * 0.6
+
+
+def split_sections(text: str) -> List[str]:
+    sections, current = [], []
+    for line in text.splitlines():
+        if is_heading(line) and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    return [s for s in sections if s]
+
+
+def split_sentences(section: str) -> List[str]:
+    sentences = []
+    for block in re.split(r"\n\s*\n", section):
+        lines = block.splitlines()
+        if len(lines) > 1 and all(_BULLET.match(line) or is_heading(line) for line in lines):
+            # Lists and headings keep their line structure
+            sentences.extend(line.strip() for line in lines if line.strip())
+            continue
+        flat = " ".join(line.strip() for line in lines)
+        sentences.extend(s.strip() for s in _SENTENCE_END.split(flat) if s.strip())
+    return sentences
+
+
+def _bag(text: str) -> Counter:
+    return Counter(_WORD.findall(text.lower()))
+
+
+def _lexical_similarity(a: Counter, b: Counter) -> float:
+    dot = sum(v * b.get(k, 0) for k, v in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SemanticChunking(ChunkingStrategy):
+    """Deterministic local chunking.
+
+    Chunks never cross a heading, only end on sentence boundaries, stay under
+    ``chunk_size`` characters and, once past ``min_chunk_size``, break where
+    the similarity between neighbouring sentences falls into the lowest
+    ``breakpoint_percentile`` of the section. With an ``embedder`` similarity
+    uses (cached, batched) sentence embeddings; without one it uses word
+    overlap, which needs no network at all.
+    """
+
+    def __init__(self, chunk_size: int = 5000, min_chunk_size: int = 500, breakpoint_percentile: float = 20.0,
+                 embedder=None):
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.breakpoint_percentile = breakpoint_percentile
+        self.embedder = embedder
+
+    def _similarities(self, sentences: List[str]) -> List[float]:
+        if len(sentences) < 2:
+            return []
+        if self.embedder is not None:
+            from agents.embedding_cache import embed_many
+
+            vectors = embed_many(self.embedder, sentences)
+            return [_cosine(a, b) for a, b in zip(vectors, vectors[1:])]
+        bags = [_bag(s) for s in sentences]
+        return [_lexical_similarity(a, b) for a, b in zip(bags, bags[1:])]
+
+    def _threshold(self, similarities: List[float]) -> float:
+        if not similarities:
+            return -1.0
+        ordered = sorted(similarities)
+        index = min(len(ordered) - 1, int(len(ordered) * self.breakpoint_percentile / 100))
+        return ordered[index]
+
+    def split_text(self, text: str) -> List[str]:
+        chunks = []
+        for section in split_sections(text):
+            sentences = split_sentences(section)
+            similarities = self._similarities(sentences)
+            threshold = self._threshold(similarities)
+            section_start = len(chunks)
+            current, size = [], 0
+            for i, sentence in enumerate(sentences):
+                while len(sentence) > self.chunk_size:
+                    # A single oversized "sentence" (tables, run-on text) is hard split
+                    if current:
+                        chunks.append(" ".join(current))
+                        current, size = [], 0
+                    chunks.append(sentence[:self.chunk_size])
+                    sentence = sentence[self.chunk_size:]
+                drop = i > 0 and similarities[i - 1] <= threshold
+                if current and (size + len(sentence) + 1 > self.chunk_size or (drop and size >= self.min_chunk_size)):
+                    chunks.append(" ".join(current))
+                    current, size = [], 0
+                current.append(sentence)
+                size += len(sentence) + 1
+            if current:
+                tail = " ".join(current)
+                if (len(chunks) > section_start and len(tail) < self.min_chunk_size
+                        and len(chunks[-1]) + len(tail) + 1 <= self.chunk_size):
+                    # Fold a short tail into the previous chunk of the same section
+                    chunks[-1] = f"{chunks[-1]} {tail}"
+                else:
+                    chunks.append(tail)
+        return chunks
+
+    def chunk(self, document: Document) -> List[Document]:
+        if len(document.content) <= self.min_chunk_size:
+            return [document]
+        return _to_documents(document, self.split_text(document.content))
+
+
+def _to_documents(document: Document, texts: List[str]) -> List[Document]:
+    """Build chunk documents the way agno's strategies do (``{id}_{n}`` IDs, ``chunk`` metadata)."""
+    chunks = []
+    for number, text in enumerate(texts, start=1):
+        meta_data = document.meta_data.copy()
+        meta_data["chunk"] = number
+        meta_data["chunk_size"] = len(text)
+        chunks.append(Document(id=f"{document.id}_{number}" if document.id else None,
+                               name=document.name, meta_data=meta_data, content=text))
+    return chunks
+
+
+class ChunkCache:
+    """SQLite map of ``(strategy key, content hash)`` to the chunk texts that strategy produced."""
+
+    def __init__(self, db_file: Path = config.CHUNK_CACHE_FILE):
+        self.db_file = Path(db_file)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (strategy TEXT NOT NULL, content_hash TEXT NOT NULL, "
+            "chunks TEXT NOT NULL, PRIMARY KEY (strategy, content_hash))"
+        )
+
+    def get(self, strategy: str, content: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute("SELECT chunks FROM chunks WHERE strategy = ? AND content_hash = ?",
+                                     (strategy, sha256(content.encode()).hexdigest())).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, strategy: str, content: str, chunks: List[str]) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO chunks (strategy, content_hash, chunks) VALUES (?, ?, ?)",
+                               (strategy, sha256(content.encode()).hexdigest(), json.dumps(chunks)))
+            self._conn.commit()
+
+
+_shared: Optional[ChunkCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_chunk_cache() -> ChunkCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ChunkCache()
+        return _shared
+
+
+# agno's AgenticChunking prompt, unchanged
+AGENTIC_PROMPT = """Analyze this text and determine a natural breakpoint within the first {max_chunk_size} characters.
+            Consider semantic completeness, paragraph boundaries, and topic transitions.
+            Return only the character position number of where to break the text:
+
+            {text}"""
+
+
+class CachedAgenticChunking(AgenticChunking):
+    """``AgenticChunking`` whose decisions are memoized by page content hash.
+
+    agno falls back to a cut at ``max_chunk_size`` whenever the model fails or
+    gives no usable answer. Such a page is chunked the same way here but not
+    cached, so the next load asks the model again.
+    """
+
+    def __init__(self, model=None, max_chunk_size: int = 5000, cache: Optional[ChunkCache] = None):
+        super().__init__(model=model, max_chunk_size=max_chunk_size)
+        self.cache = cache or shared_chunk_cache()
+
+    @property
+    def cache_key(self) -> str:
+        return f"agentic/{getattr(self.model, 'id', type(self.model).__name__)}/{self.max_chunk_size}"
+
+    def chunk(self, document: Document) -> List[Document]:
+        if len(document.content) <= self.max_chunk_size:
+            return [document]
+        texts = self.cache.get(self.cache_key, document.content)
+        if texts is not None:
+            return _to_documents(document, texts)
+        texts, answered = self.split_text(document.content)
+        if answered:
+            self.cache.put(self.cache_key, document.content, texts)
+        return _to_documents(document, texts)
+
+    def _breakpoint(self, text: str) -> Optional[int]:
+        """The model's breakpoint in ``text``, or None if it failed or gave no usable position."""
+        prompt = AGENTIC_PROMPT.format(max_chunk_size=self.max_chunk_size, text=text[:self.max_chunk_size])
+        try:
+            response = self.model.response([Message(role="user", content=prompt)])
+            position = int(response.content.strip()) if response and response.content else 0
+        except Exception as e:
+            logger.debug(f"Agentic chunking fell back to a fixed cut: {e}")
+            return None
+        return min(position, self.max_chunk_size) if position > 0 else None
+
+    def split_text(self, text: str) -> Tuple[List[str], bool]:
+        """Chunk texts as agno cuts them, and whether every breakpoint came from the model."""
+        chunks, answered = [], True
+        remaining = self.clean_text(text)
+        while remaining:
+            position = self._breakpoint(remaining)
+            if position is None:
+                position, answered = self.max_chunk_size, False
+            chunks.append(remaining[:position].strip())
+            remaining = remaining[position:].strip()
+        return chunks, answered
@@ -0,0 +1,153 @@
+"""Paths and environment settings shared by every agent module."""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ************* Paths *************
+ROOT_DIR = Path(__file__).resolve().parent.parent
+KNOWLEDGE_DIR = ROOT_DIR.joinpath("knowledge")
+OUTPUT_DIR = ROOT_DIR.joinpath("output")
+TMP_DIR = ROOT_DIR.joinpath("tmp")
+INGESTION_DIR = TMP_DIR.joinpath("ingestion")
+# Checked-in workflow artifacts (e.g. the approved BrandScript) and the workflow's stage cache
+ARTIFACTS_DIR = ROOT_DIR.joinpath("artifacts")
+WORKFLOW_DIR = TMP_DIR.joinpath("workflow")
+
+# ************* Models *************
+CHAT_MODEL_ID = "gemini-2.0-flash"
+CHUNKING_MODEL_ID = "gemini-2.0-flash-lite"
+EMBEDDING_MODEL_ID = "text-embedding-004"
+EMBEDDING_DIMENSIONS = 768
+# Every Gemini key the agents may use; with KEY_POOL=on all calls share them by load instead of a fixed key per agent
+GEMINI_KEY_ENVS = os.getenv("GEMINI_KEY_ENVS", "1DCNNGEMINI,2DCNNGEMINI,3DCNNGEMINI,4DCNNGEMINI,5DCNNGEMINI").split(",")
+KEY_POOL = os.getenv("KEY_POOL", "on") == "on"
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+# Per-key (requests per minute, tokens per minute) for each model
+MODEL_RATE_LIMITS = {
+    CHAT_MODEL_ID: (int(os.getenv("CHAT_MODEL_RPM", 15)), 1_000_000),
+    CHUNKING_MODEL_ID: (int(os.getenv("CHUNKING_MODEL_RPM", 30)), 1_000_000),
+    EMBEDDING_MODEL_ID: (int(os.getenv("EMBEDDING_MODEL_RPM", 1500)), None),
+    "default": (15, 1_000_000),
+}
+# "provider" sends each agent's static prompt prefix as Gemini cached content, "local" keeps it inline, "off"
+CONTEXT_CACHE = os.getenv("CONTEXT_CACHE", "provider")
+CONTEXT_CACHE_TTL = int(os.getenv("CONTEXT_CACHE_TTL", 3600))
+# Gemini rejects cached content below a per-model minimum size; shorter prefixes stay inline
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 1024))
+# Agents that add the BrandScript from output/ or artifacts/ to their system prompt when run on their own, at
+# ~1.1k tokens a call; the workflow passes it to every stage that uses it either way
+BRANDSCRIPT_AGENTS = [a.strip() for a in os.getenv("BRANDSCRIPT_AGENTS", "seo_specialist").split(",") if a.strip()]
+# "on" answers repeated model calls from disk, "record" re-runs and records them with their tool results,
+# "replay" serves runs only from the recordings, with no model or tool calls
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "off")
+RESPONSE_CACHE_FILE = TMP_DIR.joinpath("responses.db")
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "agentic")
+CHUNK_CACHE_FILE = TMP_DIR.joinpath("chunks.db")
+EMBEDDING_CACHE_FILE = TMP_DIR.joinpath("embeddings.db")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+USER_ID = "z4hid"
+
+# ************* Chat history *************
+# Tokens of recent turns an agent sends verbatim; older turns are folded into a rolling session summary
+HISTORY_TOKENS = int(os.getenv("HISTORY_TOKENS", 8000))
+HISTORY_TOKEN_BUDGETS = {
+    "seo_specialist": 16000,
+    "content_creator": 16000,
+}
+HISTORY_SUMMARIES = os.getenv("HISTORY_SUMMARIES", "on") == "on"
+HISTORY_SUMMARY_MODEL_ID = os.getenv("HISTORY_SUMMARY_MODEL_ID", CHUNKING_MODEL_ID)
+HISTORY_SUMMARY_WORDS = int(os.getenv("HISTORY_SUMMARY_WORDS", 300))
+
+# ************* User memories *************
+# Memories of the user put in an agent's prompt: the ones closest to the message; 0 puts in all of them
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", 8))
+# Cosine similarity at which a new or edited memory replaces its nearest, older memory; 0 keeps duplicates
+MEMORY_DEDUPE_SIMILARITY = float(os.getenv("MEMORY_DEDUPE_SIMILARITY", 0.92))
+# "on" extracts memories from a turn on a background thread, after the run has returned
+MEMORY_BACKGROUND = os.getenv("MEMORY_BACKGROUND", "on") == "on"
+
+# ************* Agent storage *************
+# Sessions and memories of every agent live in one WAL-journaled database, one table pair per agent
+STORAGE_DB_FILE = TMP_DIR.joinpath("agents.db")
+STORAGE_POOL_SIZE = int(os.getenv("STORAGE_POOL_SIZE", 8))
+STORAGE_BUSY_TIMEOUT = float(os.getenv("STORAGE_BUSY_TIMEOUT", 30))
+# Seconds session writes are buffered before a batched flush; 0 writes through, negative disables batching
+STORAGE_FLUSH_INTERVAL = float(os.getenv("STORAGE_FLUSH_INTERVAL", 0.5))
+# Memories were kept here before they moved into agents.db; each table is copied over once
+LEGACY_MEMORY_DB_FILE = TMP_DIR.joinpath("memory.db")
+
+# ************* Batch runs *************
+# Briefs a batch runs at once; past the key pool's rate limits more only queue in the pool
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+BATCH_OUTPUT_DIR = OUTPUT_DIR.joinpath("batch")
+
+# ************* Knowledge parsing *************
+# Processes parsing PDF and CSV knowledge files; 0 parses in the loading process
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+# PDF pages per parse task, and CSV rows per page document
+PARSE_PAGES_PER_TASK = int(os.getenv("PARSE_PAGES_PER_TASK", 8))
+CSV_ROWS_PER_PAGE = int(os.getenv("CSV_ROWS_PER_PAGE", 1000))
+
+# ************* Vector DB *************
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+LANCEDB_URI = TMP_DIR.joinpath("lancedb")
+# The "flat" backend: each collection as a memory-mapped .npy matrix plus a JSON sidecar
+FLAT_DIR = TMP_DIR.joinpath("flat")
+# The "compact" backend: quantized codes per collection, float32 vectors shared across collections
+COMPACT_DIR = TMP_DIR.joinpath("compact")
+# "int8" (4x smaller than float32), "pq" (COMPACT_PQ_SUBVECTORS bytes per vector) or "matryoshka"
+# (a coarse pass over the first COMPACT_COARSE_DIMENSIONS dimensions)
+COMPACT_QUANTIZATION = os.getenv("COMPACT_QUANTIZATION", "int8")
+COMPACT_PQ_SUBVECTORS = int(os.getenv("COMPACT_PQ_SUBVECTORS", 192))
+COMPACT_COARSE_DIMENSIONS = int(os.getenv("COMPACT_COARSE_DIMENSIONS", 256))
+# Candidates re-ranked at full precision per requested result, from a memory-mapped <collection>.vectors.npy;
+# 0 returns the quantized ranking and writes no vectors file
+COMPACT_RERANK = int(os.getenv("COMPACT_RERANK", 4))
+
+# "hybrid" fuses dense search with a local BM25 index, "dense" is vector search only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+# "quoted", "auto" or "off": when keyword hits may skip the embedding call entirely. "auto" (opt-in) also
+# answers short queries whose phrase is in the collection from BM25 alone, without dense retrieval
+HYBRID_EXACT_MATCH = os.getenv("HYBRID_EXACT_MATCH", "quoted")
+BM25_DIR = TMP_DIR.joinpath("bm25")
+
+# Knowledge search results are cached per collection until the TTL passes or the collection is re-ingested
+QUERY_CACHE = os.getenv("QUERY_CACHE", "on") == "on"
+QUERY_CACHE_FILE = TMP_DIR.joinpath("query_cache.db")
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 24 * 3600))
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", 0.95))
+
+# ************* Web search *************
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", 8))
+SEARCH_CACHE_FILE = TMP_DIR.joinpath("search_cache.db")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 24 * 3600))
+
+# ************* Crawling *************
+# Page index and compressed page archive shared by every crawl
+CRAWL_DIR = TMP_DIR.joinpath("crawl")
+# Pages checked within this many seconds are reused as is; older ones are revalidated with ETag/Last-Modified
+CRAWL_MAX_AGE = float(os.getenv("CRAWL_MAX_AGE", 6 * 3600))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 50))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 4))
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", 15))
+
+# ************* Tracing *************
+# "on" records spans of agent runs and their model, tool, embedder, vector search and storage calls
+TRACING = os.getenv("TRACING", "off") == "on"
+TRACE_DIR = Path(os.getenv("TRACE_DIR", TMP_DIR.joinpath("traces")))
+# "jsonl" appends spans to TRACE_DIR/spans.jsonl, "otlp" OTLP/JSON requests to TRACE_DIR/otlp.jsonl
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "jsonl,otlp").split(",")
+# An OTLP/HTTP collector (e.g. http://localhost:4318) that also receives every trace
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+TRACE_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "brainspark-agents")
+
+
+def qdrant_url():
+    return os.getenv("QDRANT_URL")
+
+
+def qdrant_api_key():
+    return os.getenv("QDRANT_API_KEY")
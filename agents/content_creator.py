@@ -1,105 +1,27 @@
-from pathlib import Path
-from textwrap import dedent
-
-from agno.agent import Agent
-
-from agno.models.google import Gemini
-from agno.embedder.google import GeminiEmbedder
-
-from agno.storage.sqlite import SqliteStorage
-
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-
-from agno.vectordb.qdrant import Qdrant
-from agno.vectordb.search import SearchType
-
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.tavily import TavilyTools
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.exa import ExaTools
-
-from agno.tools.website import WebsiteTools
-from agno.tools.firecrawl import FirecrawlTools
-
-from agno.tools.csv_toolkit import CsvTools
-from agno.tools.pandas import PandasTools
-
-from agno.tools.file import FileTools
-from agno.tools.python import PythonTools
-from agno.tools.shell import ShellTools
-
-from agno.knowledge.combined import CombinedKnowledgeBase
-from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
-from agno.knowledge.csv import CSVKnowledgeBase, CSVReader
-from agno.document.chunking.agentic import AgenticChunking
-
-import os
-
-from dotenv import load_dotenv
-load_dotenv()
+from agents import config
+from agents.context import with_context
+from agents.factories import agent_memory, agent_storage, chunking_strategy, gemini_model, vector_db
+from agents.ingestion import incremental_load
+from agents.registry import get_agent
 
 # ************* Paths *************
-cwd = Path(__file__).parent
-knowledge_dir = cwd.joinpath("knowledge/brainspark/")
-output_dir = cwd.joinpath("output")
+knowledge_dir = config.KNOWLEDGE_DIR.joinpath("brainspark")
+output_dir = config.OUTPUT_DIR
 
 # # Create the output directory if it does not exist
 # output_dir.mkdir(parents=True, exist_ok=True)
 # *******************************
-agent_storage_file: str = "tmp/agents.db"
-memory_storage_file: str = "tmp/memory.db"
 
-memory_db = SqliteMemoryDb(table_name="content_creator_memory", 
-                           db_file=memory_storage_file)
-
-# Create Memory object that wraps the database
-memory = Memory(db=memory_db)
-
-# Storage
-agent_storage = SqliteStorage(table_name="content_creator_agent", db_file=agent_storage_file)
-
-
-# Vectordb - Fix URL format and add embedder here
-api_key = os.getenv("QDRANT_API_KEY")
-qdrant_url = os.getenv("QDRANT_URL")
 collection_name = "content_creator_knowledge"
 
-vector_db = Qdrant(
-    collection=collection_name,
-    url=qdrant_url,
-    api_key=api_key,
-    embedder=GeminiEmbedder(id="text-embedding-004", 
-                            dimensions=768, 
-                            api_key=os.getenv("3DCNNGEMINI")),
-)
-
-
-# Configure Gemini models for chunking
-chunking_model = Gemini(id="gemini-2.0-flash-lite", temperature=0.2, api_key=os.getenv("3DCNNGEMINI"))
-
-# Knowledge Base - Configure with Gemini chunking
-pdf_knowledge_base = PDFKnowledgeBase(
-    path=knowledge_dir.joinpath("brainspark.pdf"),
-    vector_db=vector_db,
-    # reader=PDFReader(chunk=True, chunk_size=5000),
-    chunking_strategy=AgenticChunking(model=chunking_model)
-)
-
-
-# Agents
-content_creator = Agent(
-    name="Content Creator",
-    agent_id="content_creator",
-    model=Gemini(id="gemini-2.0-flash", temperature=0.2, api_key=os.getenv("3DCNNGEMINI")),
-    description="""
+DESCRIPTION = """
     The Content Creator agent is responsible for generating various forms of high-quality written content. This includes, 
     but is not limited to, blog posts, website copy, articles, whitepapers, and case studies. Its primary purpose is to translate strategic 
     inputs from the Brandscript Architect and SEO Specialist into compelling, informative, and optimized content that engages the 
     target audience and supports BrainSpark Digital's marketing objectives.
-""",
-    instructions="""
+"""
+
+INSTRUCTIONS = """
     Upon receiving an MVC brief or content request, thoroughly analyze the provided Brandscript elements (Hero, Problem, Solution, etc.) and the target SEO keywords and user intent.
 
     Draft content that compellingly embodies the StoryBrand narrative. Consistently position the intended reader as the Hero of the story, clearly address their Problems (external, internal, philosophical), introduce BrainSpark Digital (or its client) as the trusted Guide offering a viable Plan, and vividly articulate the path to Success while also highlighting the consequences of Failure.
@@ -119,34 +41,75 @@ content_creator = Agent(
     If generating 'Case Studies', structure them as compelling narratives. Highlight the client's journey: their initial Challenge (Problem), how BrainSpark Digital acted as their Guide and implemented a Plan, and the remarkable, quantifiable Results and Transformation (Success) they achieved.
 
     Leverage the Retrieval Augmented Generation (RAG) capability to access and incorporate specific facts, statistics, examples, or company-approved information from the pre-processed 'Data Sources' to enhance the factual accuracy, depth, and credibility of the content.
-""",
-    memory=memory,
-    enable_user_memories=True,
-    knowledge=pdf_knowledge_base,
-    search_knowledge=True,
-    add_references=True,
-    enable_agentic_knowledge_filters=True,
-    storage=agent_storage,
-    add_history_to_messages=True,
-    add_datetime_to_instructions=True,
-    user_id="z4hid",
-    debug_mode=True,
-    markdown=True,
-    role="content_creator",
-    tools=[
+"""
+
+
+def build_knowledge_base():
+    from agno.knowledge.pdf import PDFKnowledgeBase
+
+    # Knowledge Base - Configure with Gemini chunking
+    return PDFKnowledgeBase(
+        path=knowledge_dir.joinpath("brainspark.pdf"),
+        vector_db=vector_db(collection_name, "3DCNNGEMINI"),
+        # reader=PDFReader(chunk=True, chunk_size=5000),
+        chunking_strategy=chunking_strategy("3DCNNGEMINI")
+    )
+
+
+def build_tools():
+    from agno.tools.duckduckgo import DuckDuckGoTools
+    from agno.tools.firecrawl import FirecrawlTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.tavily import TavilyTools
+    from agno.tools.wikipedia import WikipediaTools
+
+    return [
         GoogleSearchTools(fixed_max_results=15),
         DuckDuckGoTools(fixed_max_results=10),
         TavilyTools(),
         WikipediaTools(),
         FirecrawlTools(),
-    ],
-    show_tool_calls=True
-)
+    ]
+
+
+def build_content_creator(model=None, memory=None, knowledge=None, storage=None, tools=None):
+    from agno.agent import Agent
+
+    return Agent(
+        name="Content Creator",
+        agent_id="content_creator",
+        model=model or gemini_model("3DCNNGEMINI"),
+        description=DESCRIPTION,
+        # The BrandScript rides in the static, cacheable part of the system prompt
+        instructions=with_context(INSTRUCTIONS, "brandscript", files="content_creator" in config.BRANDSCRIPT_AGENTS),
+        memory=memory or agent_memory("content_creator_memory"),
+        enable_user_memories=True,
+        knowledge=knowledge or build_knowledge_base(),
+        search_knowledge=True,
+        add_references=True,
+        enable_agentic_knowledge_filters=True,
+        storage=storage or agent_storage("content_creator_agent"),
+        add_history_to_messages=True,
+        add_datetime_to_instructions=True,
+        user_id=config.USER_ID,
+        debug_mode=True,
+        markdown=True,
+        role="content_creator",
+        tools=build_tools() if tools is None else tools,
+        show_tool_calls=True
+    )
+
+
+def __getattr__(name):
+    if name == "content_creator":
+        return get_agent("content_creator")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     try:
-        pdf_knowledge_base.load(recreate=False)
-        # Comment out after first run
+        content_creator = get_agent("content_creator")
+        print(incremental_load(content_creator.knowledge))
         
         content_creator.print_response("Write a 1500-word blog post on the future of AI in web development, targeting the keyword 'AI-driven web design trends", stream=True)
     except Exception as e:
@@ -0,0 +1,121 @@
+"""Named context artifacts shared by agents, such as the BrandScript.
+
+An artifact is registered once by name and agents reference it by name in
+their instructions (``with_context(INSTRUCTIONS, "brandscript")``) instead of
+having it pasted into each user message. Referenced artifacts render into the
+static part of the system prompt, ahead of anything that changes per call, so
+the prefix is identical from call to call and can be cached (see
+``agents.prompt_cache``).
+
+Artifacts resolve from, in order: ``use_context`` overrides for the current
+task (the workflow passes upstream stage outputs this way),
+``register_context``, then, for instructions built with ``files=True``, the
+workflow artifact files (``output/<name>.md``, ``artifacts/<name>.md``).
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Callable, Dict, Optional, Tuple
+
+from agents import config
+
+
+@dataclass(frozen=True)
+class ContextArtifact:
+    name: str
+    text: str
+    digest: str
+
+    @classmethod
+    def create(cls, name: str, text: str) -> "ContextArtifact":
+        return cls(name, text, sha256(text.encode()).hexdigest())
+
+    def render(self) -> str:
+        return f'<context name="{self.name}">\n{self.text.strip()}\n</context>'
+
+
+_registry: Dict[str, ContextArtifact] = {}
+_files: Dict[str, ContextArtifact] = {}
+_lock = threading.Lock()
+_overrides: contextvars.ContextVar = contextvars.ContextVar("context_overrides", default={})
+
+
+def register_context(name: str, text: str) -> ContextArtifact:
+    artifact = ContextArtifact.create(name, text)
+    with _lock:
+        _registry[name] = artifact
+    return artifact
+
+
+def unregister_context(name: str) -> None:
+    with _lock:
+        _registry.pop(name, None)
+
+
+@contextmanager
+def use_context(**texts: str):
+    """Resolve the given artifacts to ``texts`` in the current thread or asyncio task only."""
+    token = _overrides.set({**_overrides.get(), **{name: ContextArtifact.create(name, text)
+                                                     for name, text in texts.items()}})
+    try:
+        yield
+    finally:
+        _overrides.reset(token)
+
+
+def load_artifact(name: str) -> str:
+    """The latest workflow output for ``name``, else the checked-in artifact of that name."""
+    for directory in (config.OUTPUT_DIR, config.ARTIFACTS_DIR):
+        path = directory.joinpath(f"{name}.md")
+        if path.exists():
+            return path.read_text()
+    raise FileNotFoundError(f"No '{name}' artifact in {config.OUTPUT_DIR} or {config.ARTIFACTS_DIR}")
+
+
+def get_context(name: str, files: bool = True) -> Optional[ContextArtifact]:
+    """The artifact called ``name``, or None when nothing provides it; ``files=False`` skips the artifact files."""
+    artifact = _overrides.get().get(name)
+    if artifact is not None:
+        return artifact
+    with _lock:
+        artifact = _registry.get(name) or (_files.get(name) if files else None)
+    if artifact is not None or not files:
+        return artifact
+    try:
+        artifact = ContextArtifact.create(name, load_artifact(name))
+    except FileNotFoundError:
+        return None
+    with _lock:
+        _files[name] = artifact
+    return artifact
+
+
+_rendered: Dict[Tuple[str, ...], str] = {}
+
+
+def with_context(instructions: str, *names: str, files: bool = True) -> Callable[..., str]:
+    """agno ``instructions`` that append the artifacts ``names`` to ``instructions``.
+
+    With ``files=False`` an artifact is only added while something provides it
+    explicitly, like the workflow for its stages. The text is assembled once
+    per combination of artifact versions and reused for every call after that.
+    """
+    base = sha256(instructions.encode()).hexdigest()
+
+    def render(agent=None) -> str:
+        artifacts = [a for a in (get_context(name, files) for name in names) if a is not None]
+        key = (base,) + tuple(a.digest for a in artifacts)
+        text = _rendered.get(key)
+        if text is None:
+            text = "\n\n".join([instructions.rstrip()] + [a.render() for a in artifacts])
+            with _lock:
+                # One entry per artifact version; a long batch of briefs shouldn't grow this forever
+                if len(_rendered) >= 256:
+                    _rendered.clear()
+                _rendered[key] = text
+        return text
+
+    render.context_names = names
+    return render
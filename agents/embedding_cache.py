@@ -0,0 +1,257 @@
+"""Disk-backed embedding cache shared by every agent's embedder.
+
+Vectors are stored as float32 BLOBs in SQLite, keyed by
+``(model, dimensions, sha256(text))``, and the least recently used entries are
+evicted once the cache grows past its size cap.
+"""
+import atexit
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agno.embedder.base import Embedder
+
+from agents import config
+from agents.tracing import span
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, dimensions, text_hash)
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+# Texts per ``SELECT ... IN`` lookup, well under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+# Pending last_used updates are written once this many hits, or this many seconds, have built up
+TOUCH_BATCH = 1000
+TOUCH_INTERVAL = 30.0
+
+
+def _hash(text: str) -> str:
+    return sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    def __init__(self, db_file: Path = config.EMBEDDING_CACHE_FILE, max_bytes: int = config.EMBEDDING_CACHE_MAX_BYTES):
+        self.db_file = Path(db_file)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Hits only bump last_used in memory; the updates are written in bulk with the next write or flush
+        self._touched: Dict[Tuple[str, int, str], float] = {}
+        self._flushed = time.time()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, dimensions: int, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look ``texts`` up with one ``SELECT`` per ``LOOKUP_BATCH`` texts; hits are marked used lazily."""
+        hashes = [_hash(text) for text in texts]
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), LOOKUP_BATCH):
+                chunk = unique[start:start + LOOKUP_BATCH]
+                found.update(self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND dimensions = ? "
+                    f"AND text_hash IN ({', '.join('?' * len(chunk))})", (model, dimensions, *chunk)
+                ).fetchall())
+            now = time.time()
+            for text_hash in found:
+                self._touched[(model, dimensions, text_hash)] = now
+            hits = sum(text_hash in found for text_hash in hashes)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+            if len(self._touched) >= TOUCH_BATCH or now - self._flushed > TOUCH_INTERVAL:
+                self._flush_touched()
+                self._conn.commit()
+        return [unpack(found[text_hash]) if text_hash in found else None for text_hash in hashes]
+
+    def get(self, model: str, dimensions: int, text: str) -> Optional[List[float]]:
+        return self.get_many(model, dimensions, [text])[0]
+
+    def _flush_touched(self) -> None:
+        """Write the pending ``last_used`` updates of cache hits in one statement batch (caller holds the lock)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND dimensions = ? AND text_hash = ?",
+                [(used, *key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._flushed = time.time()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def put(self, model: str, dimensions: int, text: str, vector: Sequence[float]) -> None:
+        key = (model, dimensions, _hash(text))
+        blob = pack(vector)
+        with self._lock:
+            self._flush_touched()
+            old = self._conn.execute(
+                "SELECT LENGTH(vector) FROM embeddings WHERE model = ? AND dimensions = ? AND text_hash = ?", key
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model, dimensions, text_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                (*key, blob, time.time()),
+            )
+            self._bytes += len(blob) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Trim to 90% of the cap so a full cache doesn't evict on every insert
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        victims = []
+        for rowid, size in rows:
+            if self._bytes <= target:
+                break
+            victims.append((rowid,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._touched.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._bytes,
+        }
+
+
+_shared: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> EmbeddingCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = EmbeddingCache()
+            atexit.register(_shared.flush)
+        return _shared
+
+
+@dataclass
+class CachedEmbedder(Embedder):
+    """Embedder that serves repeated texts from an ``EmbeddingCache`` before calling ``embedder``."""
+
+    embedder: Optional[Embedder] = None
+    cache: Optional[EmbeddingCache] = None
+
+    def __post_init__(self):
+        if self.embedder is None:
+            raise ValueError("CachedEmbedder needs an embedder to wrap")
+        self.dimensions = self.embedder.dimensions
+        if self.cache is None:
+            self.cache = shared_cache()
+
+    @property
+    def model_key(self) -> str:
+        model = getattr(self.embedder, "id", None) or type(self.embedder).__name__
+        task_type = getattr(self.embedder, "task_type", None)
+        return f"{model}/{task_type}" if task_type else model
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        with span("embedder.embed", "embedder", model=self.model_key, texts=1, request_bytes=len(text)) as s:
+            cached = self.cache.get(self.model_key, self.dimensions or 0, text)
+            s.set(cache_hits=int(cached is not None))
+            if cached is not None:
+                return cached, None
+            embedding, usage = self.embedder.get_embedding_and_usage(text)
+            if embedding:
+                self.cache.put(self.model_key, self.dimensions or 0, text, embedding)
+            return embedding, usage
+
+    def get_embeddings_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        with span("embedder.embed_batch", "embedder", model=self.model_key, texts=len(texts),
+                  request_bytes=sum(len(t) for t in texts)) as s:
+            embeddings = self.cache.get_many(self.model_key, self.dimensions or 0, texts)
+            missing = [i for i, e in enumerate(embeddings) if e is None]
+            s.set(cache_hits=len(texts) - len(missing))
+            if missing:
+                fresh = embed_many(self.embedder, [texts[i] for i in missing])
+                for i, embedding in zip(missing, fresh):
+                    embeddings[i] = embedding
+                    if embedding:
+                        self.cache.put(self.model_key, self.dimensions or 0, texts[i], embedding)
+            return embeddings
+
+
+GEMINI_BATCH_LIMIT = 100
+
+
+def _gemini_batch(embedder, texts: Sequence[str]) -> List[List[float]]:
+    request_config = {"output_dimensionality": embedder.dimensions}
+    if getattr(embedder, "task_type", None):
+        request_config["task_type"] = embedder.task_type
+    embeddings = []
+    for start in range(0, len(texts), GEMINI_BATCH_LIMIT):
+        response = embedder.client.models.embed_content(
+            model=embedder.id,
+            contents=list(texts[start:start + GEMINI_BATCH_LIMIT]),
+            config=request_config,
+            **(getattr(embedder, "request_params", None) or {}),
+        )
+        embeddings.extend(e.values for e in response.embeddings)
+    return embeddings
+
+
+def embed_many(embedder, texts: Sequence[str]) -> List[List[float]]:
+    """Embed ``texts`` in as few provider calls as ``embedder`` allows."""
+    if not texts:
+        return []
+    batch = getattr(embedder, "get_embeddings_batch", None)
+    if batch is not None:
+        return batch(texts)
+    if type(embedder).__name__ == "GeminiEmbedder":
+        return _gemini_batch(embedder, texts)
+    return [embedder.get_embedding(text) for text in texts]
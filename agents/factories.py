@@ -0,0 +1,116 @@
+"""Lazy builders for the models, embedders, vector DBs and storage used by the agents.
+
+Every agno import lives inside the builder that needs it so that importing an
+agent module costs nothing until an agent is actually constructed.
+"""
+import os
+
+from agents import config
+
+
+def key_pool():
+    """The shared Gemini key pool, or None when KEY_POOL is off or no pooled key is set."""
+    if not config.KEY_POOL:
+        return None
+    from agents.keypool import shared_pool
+
+    return shared_pool()
+
+
+def gemini_model(key_env: str, id: str = config.CHAT_MODEL_ID, temperature: float = 0.2, priority: int = 0):
+    """A Gemini chat model on the shared key pool, or pinned to ``key_env`` without one."""
+    pool = key_pool()
+    if pool is not None:
+        from agents.keypool import PooledGemini
+
+        return _model_class(PooledGemini)(id=id, temperature=temperature, pool=pool, priority=priority)
+    from agents.prompt_cache import CachedPrefixGemini
+
+    return _model_class(CachedPrefixGemini)(id=id, temperature=temperature, api_key=os.getenv(key_env))
+
+
+def _model_class(model_cls):
+    """``model_cls``, answering from the response cache first unless RESPONSE_CACHE is off, traced with TRACING on."""
+    if config.RESPONSE_CACHE != "off":
+        from agents.response_cache import replayable
+
+        model_cls = replayable(model_cls)
+    if config.TRACING:
+        from agents.tracing import traced
+
+        model_cls = traced(model_cls)
+    return model_cls
+
+
+def chunking_model(key_env: str):
+    from agents.keypool import Priority
+
+    return gemini_model(key_env, id=config.CHUNKING_MODEL_ID, priority=Priority.BACKGROUND)
+
+
+def chunking_strategy(key_env: str):
+    """Agentic chunking memoized by page hash, or local semantic chunking with CHUNKING_STRATEGY=semantic."""
+    if config.CHUNKING_STRATEGY == "semantic":
+        from agents.chunking import SemanticChunking
+
+        return SemanticChunking()
+    from agents.chunking import CachedAgenticChunking
+
+    return CachedAgenticChunking(model=chunking_model(key_env))
+
+
+def gemini_embedder(key_env: str):
+    from agents.embedding_cache import CachedEmbedder
+
+    pool = key_pool()
+    if pool is not None:
+        from agents.keypool import PooledGeminiEmbedder
+
+        embedder = PooledGeminiEmbedder(id=config.EMBEDDING_MODEL_ID, dimensions=config.EMBEDDING_DIMENSIONS,
+                                        pool=pool)
+    else:
+        from agno.embedder.google import GeminiEmbedder
+
+        embedder = GeminiEmbedder(id=config.EMBEDDING_MODEL_ID,
+                                  dimensions=config.EMBEDDING_DIMENSIONS,
+                                  api_key=os.getenv(key_env))
+    return CachedEmbedder(embedder=embedder)
+
+
+def vector_db(collection: str, key_env: str):
+    from agents.vectorstores import get_vector_db
+
+    return get_vector_db(collection, gemini_embedder(key_env))
+
+
+def history_summarizer():
+    from agents.history import HistorySummarizer
+    from agents.keypool import Priority
+
+    return HistorySummarizer(lambda: gemini_model(config.GEMINI_KEY_ENVS[0], id=config.HISTORY_SUMMARY_MODEL_ID,
+                                                  priority=Priority.BACKGROUND))
+
+
+def agent_memory(table_name: str, history_tokens: int = None):
+    """Memory with token-bounded, summarized chat history and indexed user memories.
+
+    The history budget defaults to the agent's in config. The memory embedder
+    is only built if retrieval or dedupe will use it.
+    """
+    from agents.memories import IndexedMemory
+    from agents.storage import agent_memory_db
+
+    agent_id = table_name.removesuffix("_memory")
+    indexed = config.MEMORY_TOP_K > 0 or config.MEMORY_DEDUPE_SIMILARITY > 0
+    return IndexedMemory(
+        db=agent_memory_db(table_name),
+        history_tokens=history_tokens or config.HISTORY_TOKEN_BUDGETS.get(agent_id, config.HISTORY_TOKENS),
+        summarizer=history_summarizer() if config.HISTORY_SUMMARIES else None,
+        embedder=gemini_embedder(config.GEMINI_KEY_ENVS[0]) if indexed else None,
+    )
+
+
+def agent_storage(table_name: str):
+    from agents.storage import agent_storage
+
+    return agent_storage(table_name)
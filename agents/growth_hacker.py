@@ -1,100 +1,20 @@
-from pathlib import Path
-from textwrap import dedent
-
-from agno.agent import Agent
-
-from agno.models.google import Gemini
-from agno.embedder.google import GeminiEmbedder
-
-from agno.storage.sqlite import SqliteStorage
-
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-
-from agno.vectordb.qdrant import Qdrant
-from agno.vectordb.search import SearchType
-
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.tavily import TavilyTools
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.exa import ExaTools
-
-from agno.tools.website import WebsiteTools
-from agno.tools.firecrawl import FirecrawlTools
-
-from agno.tools.csv_toolkit import CsvTools
-from agno.tools.pandas import PandasTools
-
-from agno.tools.file import FileTools
-from agno.tools.python import PythonTools
-from agno.tools.shell import ShellTools
-
-from agno.knowledge.combined import CombinedKnowledgeBase
-from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
-from agno.knowledge.csv import CSVKnowledgeBase, CSVReader
-from agno.document.chunking.agentic import AgenticChunking
-
-import os
-
-from dotenv import load_dotenv
-load_dotenv()
+from agents import config
+from agents.context import with_context
+from agents.factories import agent_memory, agent_storage, gemini_model, vector_db
+from agents.ingestion import incremental_load
+from agents.registry import get_agent
 
 # ************* Paths *************
-cwd = Path(__file__).parent
-knowledge_dir = cwd.joinpath("knowledge/brainspark/")
-output_dir = cwd.joinpath("output")
+knowledge_dir = config.KNOWLEDGE_DIR.joinpath("growth")
+output_dir = config.OUTPUT_DIR
 
 # # Create the output directory if it does not exist
 # output_dir.mkdir(parents=True, exist_ok=True)
 # *******************************
-agent_storage_file: str = f"{cwd}/tmp/agents.db"
-memory_storage_file: str = f"{cwd}/tmp/memory.db"
 
-memory_db = SqliteMemoryDb(table_name="growth_hacker_memory", 
-                           db_file=memory_storage_file)
-
-# Create Memory object that wraps the database
-memory = Memory(db=memory_db)
-
-# Storage
-agent_storage = SqliteStorage(table_name="growth_hacker_agent", db_file=agent_storage_file)
-
-
-# Vectordb - Fix URL format and add embedder here
-api_key = os.getenv("QDRANT_API_KEY")
-qdrant_url = os.getenv("QDRANT_URL")
 collection_name = "growth_hacker_knowledge"
 
-vector_db = Qdrant(
-    collection=collection_name,
-    url=qdrant_url,
-    api_key=api_key,
-    embedder=GeminiEmbedder(id="text-embedding-004", 
-                            dimensions=768, 
-                            api_key=os.getenv("3DCNNGEMINI")),
-)
-
-
-# Configure Gemini models for chunking
-chunking_model = Gemini(id="gemini-2.0-flash-lite", temperature=0.2, api_key=os.getenv("3DCNNGEMINI"))
-
-# Knowledge Base - Configure with Gemini chunking
-pdf_knowledge_base = PDFKnowledgeBase(
-    # path=knowledge_dir.joinpath("brainspark.pdf"),
-    path="/home/z4hid/Desktop/githubProjects/brainspark_agentic_workflow/knowledge/growth/growth.pdf",
-    vector_db=vector_db,
-    reader=PDFReader(chunk=True, chunk_size=5000),
-    # chunking_strategy=AgenticChunking(model=chunking_model)
-)
-
-
-# Agents
-growth_hacker = Agent(
-    name="Growth Hacker",
-    agent_id="growth_hacker",
-    model=Gemini(id="gemini-2.0-flash", temperature=0.2, api_key=os.getenv("3DCNNGEMINI")),
-    description="""
+DESCRIPTION = """
     The Growth Hacker agent is designed to systematically design, implement, monitor, and analyze 
     growth experiments across all stages of the AARRR funnel (Acquisition, Activation, Retention, 
     Revenue, Referral). It operates on the principle of "High Tempo Testing", leveraging data-driven 
@@ -106,8 +26,9 @@ growth_hacker = Agent(
     - Monitoring and analyzing the results of growth experiments
     - Scaling effective growth tactics
     - Providing data-driven insights to the team
-""",
-    instructions="""
+"""
+
+INSTRUCTIONS = """
     Conduct a comprehensive analysis of the current state of BrainSpark Digital's AARRR funnel, utilizing all available performance data to identify bottlenecks, underperforming areas, and opportunities for improvement.
 
     Generate a continuous stream of 'High Tempo Testing' ideas tailored for each distinct stage of the AARRR funnel, drawing inspiration from the tactics outlined in the knowledge base.
@@ -135,30 +56,67 @@ growth_hacker = Agent(
     Analyze the results of all completed experiments, providing clear reports on performance against KPIs. Offer data-backed recommendations for scaling successful experiments, iterating on promising but inconclusive ones, or discontinuing ineffective tactics.
 
     Proactively explore 'Engineering as Marketing' opportunities. Propose the development of simple, value-driven AI-powered tools, interactive demos, or free resources that can attract leads and showcase BrainSpark Digital's technical capabilities.
-    """,
-    memory=memory,
-    enable_user_memories=True,
-    knowledge=pdf_knowledge_base,
-    search_knowledge=True,
-    enable_agentic_knowledge_filters=True,
-    storage=agent_storage,
-    add_history_to_messages=True,
-    add_datetime_to_instructions=True,
-    user_id="z4hid",
-    debug_mode=True,
-    markdown=True,
-    role="growth_hacker",
-    tools=[
+    """
+
+
+def build_knowledge_base():
+    from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
+
+    return PDFKnowledgeBase(
+        path=knowledge_dir.joinpath("growth.pdf"),
+        vector_db=vector_db(collection_name, "3DCNNGEMINI"),
+        reader=PDFReader(chunk=True, chunk_size=5000),
+        # chunking_strategy=chunking_strategy("3DCNNGEMINI")
+    )
+
+
+def build_tools():
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.wikipedia import WikipediaTools
+
+    return [
         GoogleSearchTools(fixed_max_results=15),
         WikipediaTools(),
-    ],
-    show_tool_calls=True
-)
+    ]
+
+
+def build_growth_hacker(model=None, memory=None, knowledge=None, storage=None, tools=None):
+    from agno.agent import Agent
+
+    return Agent(
+        name="Growth Hacker",
+        agent_id="growth_hacker",
+        model=model or gemini_model("3DCNNGEMINI"),
+        description=DESCRIPTION,
+        # The BrandScript rides in the static, cacheable part of the system prompt
+        instructions=with_context(INSTRUCTIONS, "brandscript", files="growth_hacker" in config.BRANDSCRIPT_AGENTS),
+        memory=memory or agent_memory("growth_hacker_memory"),
+        enable_user_memories=True,
+        knowledge=knowledge or build_knowledge_base(),
+        search_knowledge=True,
+        enable_agentic_knowledge_filters=True,
+        storage=storage or agent_storage("growth_hacker_agent"),
+        add_history_to_messages=True,
+        add_datetime_to_instructions=True,
+        user_id=config.USER_ID,
+        debug_mode=True,
+        markdown=True,
+        role="growth_hacker",
+        tools=build_tools() if tools is None else tools,
+        show_tool_calls=True
+    )
+
+
+def __getattr__(name):
+    if name == "growth_hacker":
+        return get_agent("growth_hacker")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     try:
-        pdf_knowledge_base.load(recreate=False)
-        # Comment out after first run
+        growth_hacker = get_agent("growth_hacker")
+        print(incremental_load(growth_hacker.knowledge))
         
         growth_hacker.print_response("Conduct a comprehensive analysis of the current state of BrainSpark Digital's AARRR funnel, utilizing all available performance data to identify bottlenecks, underperforming areas, and opportunities for improvement.", stream=True)
     except Exception as e:
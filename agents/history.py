@@ -0,0 +1,231 @@
+"""Token-bounded chat history for the agents.
+
+agno adds the messages of the last ``num_history_runs`` runs to every prompt,
+however long those runs were. ``HistoryMemory`` instead sends the most recent
+runs that fit in the agent's ``history_tokens`` budget and folds older runs
+into a rolling summary of the session. The summary is sent ahead of the
+window and is stored with agno's session summaries in the session table.
+Folding happens on a background thread once the window overflows. Until the
+summary is updated, the runs being folded stay in the prompt verbatim.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from agno.memory.v2.memory import Memory
+from agno.memory.v2.schema import SessionSummary
+from agno.models.message import Message
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant.
+Update the summary with the new messages. Keep every decision, fact, name, number, keyword and open
+question the assistant may need later; drop pleasantries and repetition. Write at most {words} words
+of plain prose or bullet points, and output only the updated summary."""
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+
+def message_tokens(message: Message) -> int:
+    """Rough token count (4 characters per token) of a message's text and tool calls."""
+    size = len(message.get_content_string())
+    if message.tool_calls:
+        size += len(json.dumps(message.tool_calls, default=str))
+    return size // 4 + 4
+
+
+def run_messages(run, skip_role: Optional[str] = None) -> List[Message]:
+    """A run's own messages: no system prompt and nothing it was sent from earlier history."""
+    return [m for m in (run.messages or [])
+            if m.role != "system" and m.role != skip_role and not getattr(m, "from_history", False)]
+
+
+def transcript(messages: List[Message]) -> str:
+    lines = []
+    for message in messages:
+        text = message.get_content_string()
+        if message.tool_calls:
+            calls = ", ".join(c.get("function", {}).get("name", "?") for c in message.tool_calls)
+            text = f"{text}\n[called {calls}]".strip()
+        if message.role == "tool":
+            text = text[:1000]
+        if text:
+            lines.append(f"{message.role}: {text}")
+    return "\n\n".join(lines)
+
+
+def coverage_time(runs, count: int) -> datetime:
+    """``last_updated`` of a summary that covers the first ``count`` runs.
+
+    Runs are stamped in whole seconds, so the microseconds count how many runs of
+    the last covered second the summary covers.
+    """
+    last = runs[count - 1].created_at
+    return datetime.fromtimestamp(last) + timedelta(microseconds=sum(run.created_at == last for run in runs[:count]))
+
+
+def covered_runs(runs, summary: Optional[SessionSummary]) -> int:
+    """How many of the session's runs, oldest first, ``summary`` already covers."""
+    if summary is None or summary.last_updated is None:
+        return 0
+    second = int(summary.last_updated.replace(microsecond=0).timestamp())
+    extra = summary.last_updated.microsecond
+    covered = 0
+    for run in runs:
+        if run.created_at < second:
+            covered += 1
+        elif run.created_at == second and extra > 0:
+            covered += 1
+            extra -= 1
+        else:
+            break
+    return covered
+
+
+class HistorySummarizer:
+    """Folds messages into an existing summary with one call to ``model``.
+
+    ``model`` may also be a zero-argument callable that builds it, called on the first fold.
+    """
+
+    def __init__(self, model, max_words: int = config.HISTORY_SUMMARY_WORDS):
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.max_words = max_words
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if callable(self._model) and not hasattr(self._model, "response"):
+                self._model = self._model()
+            return self._model
+
+    def __call__(self, summary: str, messages: List[Message]) -> str:
+        response = self.model.response(messages=[
+            Message(role="system", content=SUMMARY_PROMPT.format(words=self.max_words)),
+            Message(role="user", content=f"<summary>\n{summary or '(empty)'}\n</summary>\n\n"
+                                         f"<new_messages>\n{transcript(messages)}\n</new_messages>"),
+        ])
+        return (response.content or "").strip()
+
+
+class HistoryMemory(Memory):
+    """agno ``Memory`` whose chat history is a token-bounded window plus a rolling session summary.
+
+    ``summarizer(summary, messages) -> summary`` folds runs that leave the
+    window; without one they are dropped.
+    """
+
+    # Like agno's ``Memory.deep_copy``: copies share the database, managers and summarizer, but not fold state
+    _shared_attributes = ("db", "memory_manager", "summary_manager", "history_summarizer")
+    _local_attributes = ("_folding", "_fold_lock")
+
+    def __init__(self, *args, history_tokens: int = config.HISTORY_TOKENS,
+                 summarizer: Optional[Callable[[str, List[Message]], str]] = None,
+                 user_id: str = config.USER_ID, background: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.history_tokens = history_tokens
+        self.history_summarizer = summarizer
+        self.history_user_id = user_id
+        self.background = background
+        # agno reloads ``summaries`` from storage on every run, which can predate a fold that just finished
+        self._rolling: Dict[str, SessionSummary] = {}
+        self._init_local()
+
+    def _init_local(self) -> None:
+        self._folding: Dict[str, object] = {}
+        self._fold_lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        copied = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copied
+        for name, value in self.__dict__.items():
+            if name in self._shared_attributes:
+                setattr(copied, name, value)
+            elif name not in self._local_attributes:
+                setattr(copied, name, deepcopy(value, memo))
+        copied._init_local()
+        return copied
+
+    def deep_copy(self) -> "HistoryMemory":
+        return deepcopy(self)
+
+    def session_summary(self, session_id: str) -> Optional[SessionSummary]:
+        stored = (self.summaries or {}).get(self.history_user_id, {}).get(session_id)
+        rolling = self._rolling.get(session_id)
+        if rolling is not None and (stored is None or (stored.last_updated or datetime.min) < rolling.last_updated):
+            self.summaries.setdefault(self.history_user_id, {})[session_id] = rolling
+            return rolling
+        return stored
+
+    def _fold(self, session_id: str, previous: str, messages: List[Message], covered_until: datetime) -> None:
+        try:
+            text = self.history_summarizer(previous, messages)
+            if text:
+                self._rolling[session_id] = SessionSummary(summary=text, last_updated=covered_until)
+                self.session_summary(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to summarize history of session {session_id}: {e}")
+        finally:
+            with self._fold_lock:
+                self._folding.pop(session_id, None)
+
+    def get_messages_from_last_n_runs(self, session_id: str, last_n: Optional[int] = None,
+                                      skip_role: Optional[str] = None, skip_history_messages: bool = True,
+                                      agent_id: Optional[str] = None, **kwargs) -> List[Message]:
+        """Summary of the folded runs, then the messages of the runs that fit in the token budget.
+
+        ``last_n`` (agno's ``num_history_runs``) is ignored: the budget bounds the window.
+        ``agent_id`` keeps only that agent's runs, as agno does for memories
+        shared by several agents; other keywords of newer agno are accepted.
+        """
+        all_runs = (self.runs or {}).get(session_id, [])
+        if agent_id is not None:
+            all_runs = [run for run in all_runs if getattr(run, "agent_id", None) == agent_id]
+        summary = self.session_summary(session_id)
+        covered = covered_runs(all_runs, summary)
+        runs = all_runs[covered:]
+        per_run = [run_messages(run, skip_role) for run in runs]
+        tokens = [sum(message_tokens(m) for m in messages) for messages in per_run]
+
+        # Keep the newest runs within the budget; once over it, fold down to half so summaries update in batches
+        keep_from = len(runs)
+        kept = 0
+        limit = self.history_tokens
+        if self.history_summarizer is not None and sum(tokens) > limit:
+            limit //= 2
+        while keep_from > 0 and kept + tokens[keep_from - 1] <= limit:
+            keep_from -= 1
+            kept += tokens[keep_from]
+
+        if keep_from:
+            evicted = [m for messages in per_run[:keep_from] for m in messages]
+            if self.history_summarizer is None:
+                per_run = per_run[keep_from:]
+            else:
+                with self._fold_lock:
+                    start = session_id not in self._folding
+                    if start:
+                        self._folding[session_id] = True
+                if start:
+                    args = (session_id, summary.summary if summary else "", evicted,
+                            coverage_time(all_runs, covered + keep_from))
+                    if self.background:
+                        _executor.submit(self._fold, *args)
+                    else:
+                        self._fold(*args)
+                        if self.session_summary(session_id) is not summary:
+                            summary = self.session_summary(session_id)
+                            per_run = per_run[keep_from:]
+
+        history = []
+        if summary is not None:
+            history.append(Message(role="user", content="Summary of our conversation so far:\n\n" + summary.summary))
+        history += [m for messages in per_run for m in messages]
+        return history
@@ -0,0 +1,150 @@
+"""Streaming ingestion: read pages -> chunk -> batch embed -> bulk upsert.
+
+The stages are connected by bounded asyncio queues and run blocking work in
+threads, so page parsing, embedding requests and vector DB writes overlap and
+memory stays bounded by the queue sizes rather than by the corpus size.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from agents.embedding_cache import embed_many
+from agents.ingestion import chunk_id
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class PipelineConfig:
+    embed_batch_size: int = 64
+    embed_concurrency: int = 4
+    upsert_batch_size: int = 256
+    queue_size: int = 8
+
+
+@dataclass
+class PipelineStats:
+    pages: int = 0
+    chunks: int = 0
+    embed_calls: int = 0
+    upsert_calls: int = 0
+    seconds: float = 0.0
+    chunk_ids: Dict[Hashable, List[str]] = field(default_factory=dict)
+
+    def __str__(self):
+        return (f"{self.pages} pages, {self.chunks} chunks, {self.embed_calls} embed calls, "
+                f"{self.upsert_calls} upserts in {self.seconds:.2f}s")
+
+
+def write_embedded(vector_db, documents: list) -> None:
+    """Write documents whose ``embedding`` is already set.
+
+    Backends with ``upsert_embedded`` store the vectors as-is. agno backends
+    re-embed on upsert, which the shared ``CachedEmbedder`` answers from cache.
+    """
+    if hasattr(vector_db, "upsert_embedded"):
+        vector_db.upsert_embedded(documents)
+    elif vector_db.upsert_available():
+        vector_db.upsert(documents=documents)
+    else:
+        vector_db.insert(documents=documents)
+
+
+async def _read(pages: Iterable[Tuple[Hashable, Any]], out: asyncio.Queue, stats: PipelineStats):
+    iterator = iter(pages)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _DONE)
+        if item is _DONE:
+            break
+        stats.pages += 1
+        await out.put(item)
+    await out.put(_DONE)
+
+
+async def _chunk(inp: asyncio.Queue, out: asyncio.Queue, chunker: Callable, config: PipelineConfig,
+                 stats: PipelineStats):
+    batch = []
+    while True:
+        item = await inp.get()
+        if item is _DONE:
+            break
+        tag, document = item
+        chunks = await asyncio.to_thread(chunker, document)
+        stats.chunks += len(chunks)
+        stats.chunk_ids[tag] = [chunk_id(c.content) for c in chunks]
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= config.embed_batch_size:
+                await out.put(batch)
+                batch = []
+    if batch:
+        await out.put(batch)
+    for _ in range(config.embed_concurrency):
+        await out.put(_DONE)
+
+
+async def _embed(inp: asyncio.Queue, out: asyncio.Queue, embedder, stats: PipelineStats):
+    while True:
+        batch = await inp.get()
+        if batch is _DONE:
+            break
+        embeddings = await asyncio.to_thread(embed_many, embedder, [d.content for d in batch])
+        stats.embed_calls += 1
+        for document, embedding in zip(batch, embeddings):
+            document.embedding = embedding
+        await out.put(batch)
+    await out.put(_DONE)
+
+
+async def _upsert(inp: asyncio.Queue, vector_db, config: PipelineConfig, stats: PipelineStats):
+    pending = []
+    producers = config.embed_concurrency
+    while producers:
+        batch = await inp.get()
+        if batch is _DONE:
+            producers -= 1
+            continue
+        pending.extend(batch)
+        if len(pending) >= config.upsert_batch_size:
+            await asyncio.to_thread(write_embedded, vector_db, pending)
+            stats.upsert_calls += 1
+            pending = []
+    if pending:
+        await asyncio.to_thread(write_embedded, vector_db, pending)
+        stats.upsert_calls += 1
+
+
+async def arun_pipeline(pages: Iterable[Tuple[Hashable, Any]], chunker: Callable, embedder, vector_db,
+                        config: Optional[PipelineConfig] = None) -> PipelineStats:
+    """Ingest ``(tag, page_document)`` pairs; ``stats.chunk_ids[tag]`` lists each page's chunk IDs."""
+    config = config or PipelineConfig()
+    stats = PipelineStats()
+    start = time.perf_counter()
+    page_queue = asyncio.Queue(config.queue_size)
+    embed_queue = asyncio.Queue(config.queue_size)
+    upsert_queue = asyncio.Queue(config.queue_size)
+    tasks = [
+        asyncio.create_task(_read(pages, page_queue, stats)),
+        asyncio.create_task(_chunk(page_queue, embed_queue, chunker, config, stats)),
+        *(asyncio.create_task(_embed(embed_queue, upsert_queue, embedder, stats))
+          for _ in range(config.embed_concurrency)),
+        asyncio.create_task(_upsert(upsert_queue, vector_db, config, stats)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    stats.seconds = time.perf_counter() - start
+    logger.info(f"Ingestion pipeline: {stats}")
+    return stats
+
+
+def run_pipeline(pages: Iterable[Tuple[Hashable, Any]], chunker: Callable, embedder, vector_db,
+                 config: Optional[PipelineConfig] = None) -> PipelineStats:
+    return asyncio.run(arun_pipeline(pages, chunker, embedder, vector_db, config))
@@ -0,0 +1,303 @@
+"""Content-addressed, incremental loading of knowledge bases.
+
+An ``IngestionManifest`` records, per collection, the hash of every source
+file, the hash of every page in it and the chunk IDs that page produced. On
+reload only files whose hash changed are parsed, only pages whose hash changed
+are chunked and embedded, and chunk IDs no page references any more are
+deleted from the vector DB.
+"""
+import asyncio
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from hashlib import md5, sha256
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+
+
+def file_hash(path: Path) -> str:
+    h = sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def chunk_id(content: str) -> str:
+    """ID of a chunk in the vector DB; matches the point IDs agno's Qdrant and LanceDb assign."""
+    return md5(content.replace("\x00", "\ufffd").encode()).hexdigest()
+
+
+def collection_name(vector_db) -> str:
+    for attr in ("collection", "table_name", "collection_name", "name"):
+        value = getattr(vector_db, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(vector_db).__name__
+
+
+class IngestionManifest:
+    """JSON record of what has been ingested into one collection."""
+
+    def __init__(self, collection: str, directory: Path = config.INGESTION_DIR):
+        self.collection = collection
+        self.path = Path(directory).joinpath(f"{collection}.json")
+        self._lock = threading.Lock()
+        self.data = {"format": MANIFEST_FORMAT, "collection": collection, "version": 0, "files": {}}
+        if self.path.exists():
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("format") == MANIFEST_FORMAT:
+                self.data = data
+
+    @property
+    def version(self) -> int:
+        """Incremented every time the collection's contents change."""
+        return self.data["version"]
+
+    @property
+    def files(self) -> Dict[str, dict]:
+        return self.data["files"]
+
+    def live_chunk_ids(self) -> set:
+        return {cid for entry in self.files.values() for page in entry["pages"].values() for cid in page["chunk_ids"]}
+
+    def bump(self) -> None:
+        self.data["version"] += 1
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.data, f, indent=1, sort_keys=True)
+            tmp.replace(self.path)
+
+
+def manifest_for(vector_db) -> IngestionManifest:
+    return IngestionManifest(collection_name(vector_db))
+
+
+@dataclass
+class LoadReport:
+    collection: str
+    files_unchanged: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    pages_embedded: int = 0
+    pages_skipped: int = 0
+    chunks_upserted: int = 0
+    chunks_deleted: int = 0
+    version: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        return (f"{self.collection} v{self.version}: {self.files_changed} changed / {self.files_unchanged} unchanged / "
+                f"{self.files_removed} removed files, {self.pages_embedded} pages embedded, {self.pages_skipped} skipped, "
+                f"+{self.chunks_upserted} -{self.chunks_deleted} chunks")
+
+
+def _sources(knowledge_base) -> list:
+    """Flatten a CombinedKnowledgeBase into the file-backed knowledge bases it wraps."""
+    sources = getattr(knowledge_base, "sources", None)
+    if sources:
+        return [s for source in sources for s in _sources(source)]
+    return [knowledge_base]
+
+
+# Knowledge bases that filter by suffix without declaring ``formats``
+DEFAULT_FORMATS = {"CSVKnowledgeBase": [".csv"]}
+
+
+def source_files(source) -> List[Path]:
+    path = getattr(source, "path", None)
+    if path is None:
+        return []
+    path = Path(path)
+    formats = getattr(source, "formats", None) or DEFAULT_FORMATS.get(type(source).__name__, [])
+    formats = [f.lower() for f in formats]
+    excluded = set(getattr(source, "exclude_files", None) or [])
+    if path.is_dir():
+        files = [p for p in sorted(path.rglob("*")) if p.is_file() and (not formats or p.suffix.lower() in formats)]
+    elif path.exists():
+        files = [path]
+    else:
+        logger.warning(f"Knowledge path does not exist: {path}")
+        files = []
+    return [p for p in files if p.name not in excluded]
+
+
+@contextmanager
+def _unchunked(reader):
+    chunk = getattr(reader, "chunk", None)
+    if chunk is not None:
+        reader.chunk = False
+    try:
+        yield reader
+    finally:
+        if chunk is not None:
+            reader.chunk = chunk
+
+
+def read_pages(reader, path: Path) -> List[Tuple[str, object]]:
+    """Parse ``path`` without chunking and return ``(page_key, document)`` pairs."""
+    with _unchunked(reader):
+        documents = reader.read(path)
+    pages = []
+    for i, document in enumerate(documents, start=1):
+        meta = document.meta_data or {}
+        pages.append((str(meta.get("page", i)), document))
+    return pages
+
+
+def chunk_page(reader, document) -> list:
+    if getattr(reader, "chunk", False):
+        return reader.chunk_document(document)
+    return [document]
+
+
+def delete_chunks(vector_db, ids: Iterable[str]) -> int:
+    """Delete chunks by ID; backends opt in with a ``delete_ids(ids)`` method."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    if hasattr(vector_db, "delete_ids"):
+        vector_db.delete_ids(ids)
+    elif hasattr(vector_db, "client") and hasattr(vector_db, "collection"):
+        from qdrant_client import models
+
+        vector_db.client.delete(collection_name=vector_db.collection,
+                                points_selector=models.PointIdsList(points=ids))
+    else:
+        logger.warning(f"{type(vector_db).__name__} cannot delete by id; {len(ids)} stale chunks left in place")
+        return 0
+    return len(ids)
+
+
+def _changed_files(knowledge_base, manifest: IngestionManifest, report: "LoadReport", pending: dict, seen: set,
+                   readers: dict, reindex: bool = False) -> Iterator[Tuple[str, object, Path]]:
+    """Yield ``(file_key, reader, path)`` for every file whose hash changed, staging its entry in ``pending``.
+
+    Unchanged files are skipped on their hash alone, unless ``reindex`` asks for every file.
+    """
+    for source in _sources(knowledge_base):
+        reader = source.reader
+        for path in source_files(source):
+            key = str(path.resolve())
+            seen.add(key)
+            digest = file_hash(path)
+            previous = manifest.files.get(key)
+            if not reindex and previous is not None and previous["sha256"] == digest:
+                report.files_unchanged += 1
+                continue
+            pending[key] = {"sha256": digest, "pages": {}}
+            readers[key] = reader
+            yield key, reader, path
+
+
+def _changed_pages(knowledge_base, manifest: IngestionManifest, report: "LoadReport", pending: dict, seen: set,
+                   reindex: bool = False):
+    """Yield ``((file_key, page_key), (reader, document))`` for every page that needs embedding.
+
+    Changed files are parsed by ``agents.parsing`` as their pages stream in;
+    the new page table of each is staged in ``pending`` until the pipeline has
+    written it. A file that fails to parse is dropped from ``pending``, so the
+    manifest keeps its previous entry.
+    """
+    from agents.parsing import iter_pages
+
+    readers, embedded = {}, {}
+    for key, pages in iter_pages(_changed_files(knowledge_base, manifest, report, pending, seen, readers, reindex)):
+        if isinstance(pages, Exception):
+            logger.error(f"Failed to read {key}: {pages}", exc_info=pages)
+            report.errors.append(f"{key}: {pages}")
+            report.pages_embedded -= embedded.pop(key, 0)
+            del pending[key]
+            continue
+        previous_pages = manifest.files.get(key, {}).get("pages", {})
+        for page_key, document in pages:
+            digest = text_hash(document.content)
+            old = previous_pages.get(page_key)
+            if not reindex and old is not None and old["hash"] == digest:
+                pending[key]["pages"][page_key] = old
+                report.pages_skipped += 1
+                continue
+            pending[key]["pages"][page_key] = {"hash": digest, "chunk_ids": []}
+            report.pages_embedded += 1
+            embedded[key] = embedded.get(key, 0) + 1
+            yield (key, page_key), (readers[key], document)
+
+
+async def aincremental_load(knowledge_base, manifest: Optional[IngestionManifest] = None,
+                            pipeline_config=None) -> LoadReport:
+    """Bring ``knowledge_base``'s vector DB in line with its source files.
+
+    Replaces ``knowledge_base.load(recreate=False)``: unchanged files are not
+    parsed, unchanged pages are not re-embedded and stale chunks are deleted.
+    Changed pages go through the streaming ingestion pipeline.
+    """
+    from agents.ingest_pipeline import arun_pipeline
+
+    vector_db = knowledge_base.vector_db
+    manifest = manifest or manifest_for(vector_db)
+    report = LoadReport(collection=manifest.collection)
+    if not vector_db.exists():
+        # A fresh collection holds none of what the manifest remembers
+        manifest.files.clear()
+    # An out-of-date keyword index needs every page again; re-embedding is answered by the embedding cache.
+    # The manifest is kept, so the chunks of changed and removed files are still deleted.
+    reindex = getattr(vector_db, "indexed_version", None) not in (None, manifest.version)
+    vector_db.create()
+
+    previous_live = manifest.live_chunk_ids()
+    pending, seen = {}, set()
+    stats = await arun_pipeline(
+        _changed_pages(knowledge_base, manifest, report, pending, seen, reindex),
+        chunker=lambda item: chunk_page(*item),
+        embedder=vector_db.embedder,
+        vector_db=vector_db,
+        config=pipeline_config,
+    )
+    # Chunks of pages from files that failed part-way through
+    orphaned = set()
+    for (key, page_key), ids in stats.chunk_ids.items():
+        if key in pending:
+            pending[key]["pages"][page_key]["chunk_ids"] = ids
+        else:
+            orphaned.update(ids)
+    manifest.files.update(pending)
+    report.files_changed = len(pending)
+    report.chunks_upserted = stats.chunks
+
+    removed = [k for k in manifest.files if k not in seen]
+    for key in removed:
+        del manifest.files[key]
+    report.files_removed = len(removed)
+
+    if pending or removed or orphaned:
+        report.chunks_deleted = delete_chunks(vector_db, (previous_live | orphaned) - manifest.live_chunk_ids())
+        vector_db.optimize()
+        manifest.bump()
+        manifest.save()
+    report.version = manifest.version
+    if hasattr(vector_db, "mark_indexed"):
+        vector_db.mark_indexed(manifest.version)
+    logger.info(str(report))
+    return report
+
+
+def incremental_load(knowledge_base, manifest: Optional[IngestionManifest] = None,
+                     pipeline_config=None) -> LoadReport:
+    return asyncio.run(aincremental_load(knowledge_base, manifest, pipeline_config))
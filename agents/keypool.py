@@ -0,0 +1,424 @@
+"""A shared pool of Gemini API keys with per-key rate-limit budgets.
+
+Every configured key gets a sliding one-minute request and token budget per
+model (the window is configurable so a simulated quota can run in seconds).
+Calls lease the least-loaded key that has room, wait in a per-model priority
+queue when none has, and on a 429 put that key on an exponential backoff and
+retry on another one. ``PooledGemini`` and ``PooledGeminiEmbedder`` route
+agno's chat, chunking and embedding calls through the pool.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from agno.embedder.google import GeminiEmbedder
+
+from agents import config
+from agents.prompt_cache import CachedPrefixGemini
+from agents.tracing import increment, span
+
+logger = logging.getLogger(__name__)
+
+
+class Priority:
+    """Lower runs first among the calls waiting for the same model.
+
+    Budgets are per key and model, so calls to different models never wait on
+    each other; the order only matters where callers share a model, like
+    agentic chunking and history summaries on ``CHUNKING_MODEL_ID``.
+    """
+
+    CHAT = 0
+    EMBEDDING = 1
+    BACKGROUND = 2
+    CHUNKING = BACKGROUND
+
+
+class KeyPoolExhausted(RuntimeError):
+    pass
+
+
+@dataclass
+class KeyBudget:
+    """Usage of one key against one model's limits."""
+
+    key_name: str
+    model: str
+    rpm: int
+    tpm: Optional[int]
+    window: float = 60.0
+    requests: Deque[Tuple[float, int]] = field(default_factory=deque)
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    failures: int = 0
+    calls: int = 0
+    rate_limited: int = 0
+
+    def _trim(self, now: float) -> None:
+        while self.requests and self.requests[0][0] <= now - self.window:
+            self.requests.popleft()
+
+    def load(self, now: float) -> float:
+        self._trim(now)
+        load = (len(self.requests) + self.in_flight) / self.rpm
+        if self.tpm:
+            load = max(load, sum(t for _, t in self.requests) / self.tpm)
+        return load
+
+    def has_room(self, now: float, tokens: int) -> bool:
+        if now < self.cooldown_until:
+            return False
+        self._trim(now)
+        if len(self.requests) + self.in_flight >= self.rpm:
+            return False
+        return not self.tpm or sum(t for _, t in self.requests) + tokens <= self.tpm or not self.requests
+
+    def ready_at(self, now: float) -> float:
+        """When this budget next frees up without a call completing (completions notify waiters)."""
+        if now < self.cooldown_until:
+            return self.cooldown_until
+        self._trim(now)
+        return self.requests[0][0] + self.window if self.requests else now + self.window
+
+
+@dataclass
+class Lease:
+    budget: KeyBudget
+    client: Any
+    tokens: int
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return code == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    # agno wraps the google-genai error, which carries the HTTP response
+    for e in (error, error.__cause__):
+        headers = getattr(getattr(e, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def configured_keys(key_envs: Sequence[str] = config.GEMINI_KEY_ENVS) -> Dict[str, str]:
+    return {env: os.getenv(env) for env in key_envs if os.getenv(env)}
+
+
+def _genai_client(api_key: str):
+    from google import genai
+    from google.genai import types
+
+    http_options = types.HttpOptions(base_url=config.GEMINI_BASE_URL) if config.GEMINI_BASE_URL else None
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+class KeyPool:
+    """Routes calls across API keys by load, with backoff on 429s and a priority queue."""
+
+    def __init__(self, keys: Dict[str, str], limits: Dict[str, Tuple[int, Optional[int]]] = config.MODEL_RATE_LIMITS,
+                 client_factory: Callable[[str], Any] = _genai_client, max_retries: int = 6,
+                 base_backoff: float = 2.0, max_backoff: float = 60.0, timeout: float = 600.0, window: float = 60.0):
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.keys = dict(keys)
+        self.limits = limits
+        self.client_factory = client_factory
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.window = window
+        self._clients: Dict[str, Any] = {}
+        self._budgets: Dict[Tuple[str, str], KeyBudget] = {}
+        self._waiters: Dict[str, List[Tuple[int, int]]] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def client(self, key_name: str):
+        with self._condition:
+            client = self._clients.get(key_name)
+            if client is None:
+                client = self._clients[key_name] = self.client_factory(self.keys[key_name])
+            return client
+
+    def _budget(self, key_name: str, model: str) -> KeyBudget:
+        budget = self._budgets.get((key_name, model))
+        if budget is None:
+            rpm, tpm = self.limits.get(model, self.limits["default"])
+            budget = self._budgets[(key_name, model)] = KeyBudget(key_name, model, rpm, tpm, self.window)
+        return budget
+
+    def _pick(self, model: str, tokens: int, now: float) -> Optional[KeyBudget]:
+        candidates = [b for b in (self._budget(k, model) for k in self.keys) if b.has_room(now, tokens)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda b: (b.load(now), b.in_flight, random.random()))
+
+    def acquire(self, model: str, tokens: int = 0, priority: int = Priority.CHAT) -> Lease:
+        """Block until a key has room for ``model``; higher-priority waiters for the model are served first."""
+        with span("keypool.acquire", "keypool", model=model, priority=priority) as s:
+            lease = self._acquire(model, tokens, priority)
+            s.set(key=lease.budget.key_name)
+            return lease
+
+    def _acquire(self, model: str, tokens: int, priority: int) -> Lease:
+        ticket = (priority, next(self._sequence))
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            waiters = self._waiters.setdefault(model, [])
+            heapq.heappush(waiters, ticket)
+            try:
+                while True:
+                    now = time.time()
+                    if waiters[0] == ticket:
+                        budget = self._pick(model, tokens, now)
+                        if budget is not None:
+                            budget.in_flight += 1
+                            budget.calls += 1
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise KeyPoolExhausted(f"No API key had room for {model} within {self.timeout:.0f}s")
+                    ready = min(self._budget(k, model).ready_at(now) for k in self.keys)
+                    self._condition.wait(min(remaining, max(0.05, ready - now)))
+            finally:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._condition.notify_all()
+        return Lease(budget, self.client(budget.key_name), tokens)
+
+    def release(self, lease: Lease, tokens: Optional[int] = None, error: Optional[BaseException] = None) -> None:
+        budget = lease.budget
+        with self._condition:
+            budget.in_flight -= 1
+            budget.requests.append((time.time(), lease.tokens if tokens is None else tokens))
+            if error is not None and is_rate_limit(error):
+                budget.rate_limited += 1
+                budget.failures += 1
+                increment("rate_limited")
+                delay = retry_after(error) or min(self.max_backoff, self.base_backoff * 2 ** (budget.failures - 1))
+                budget.cooldown_until = time.time() + delay * random.uniform(0.8, 1.2)
+                logger.warning(f"{budget.key_name} rate limited on {budget.model}, backing off {delay:.1f}s")
+            elif error is None:
+                budget.failures = 0
+            self._condition.notify_all()
+
+    def call(self, model: str, fn: Callable[[Any], Any], tokens: int = 0, priority: int = Priority.CHAT,
+             usage: Callable[[Any], Optional[int]] = lambda result: None):
+        """Run ``fn(client)`` on a leased key, retrying rate-limited calls on other keys."""
+        for attempt in range(self.max_retries + 1):
+            lease = self.acquire(model, tokens, priority)
+            try:
+                result = fn(lease.client)
+            except BaseException as e:
+                self.release(lease, error=e)
+                if not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                continue
+            self.release(lease, usage(result))
+            return result
+
+    async def acall(self, model: str, fn: Callable[[Any], Any], tokens: int = 0, priority: int = Priority.CHAT,
+                    usage: Callable[[Any], Optional[int]] = lambda result: None):
+        for attempt in range(self.max_retries + 1):
+            lease = await asyncio.to_thread(self.acquire, model, tokens, priority)
+            try:
+                result = await fn(lease.client)
+            except BaseException as e:
+                self.release(lease, error=e)
+                if not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                continue
+            self.release(lease, usage(result))
+            return result
+
+    def stream(self, model: str, fn: Callable[[Any], Iterator], tokens: int = 0, priority: int = Priority.CHAT):
+        """Like ``call`` for a streaming ``fn``; a 429 is only retried before the first chunk arrives."""
+        for attempt in range(self.max_retries + 1):
+            lease = self.acquire(model, tokens, priority)
+            started = False
+            try:
+                for chunk in fn(lease.client):
+                    started = True
+                    yield chunk
+            except BaseException as e:
+                self.release(lease, error=e)
+                if started or not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                continue
+            self.release(lease)
+            return
+
+    async def astream(self, model: str, fn: Callable[[Any], Any], tokens: int = 0, priority: int = Priority.CHAT):
+        for attempt in range(self.max_retries + 1):
+            lease = await asyncio.to_thread(self.acquire, model, tokens, priority)
+            started = False
+            try:
+                async for chunk in fn(lease.client):
+                    started = True
+                    yield chunk
+            except BaseException as e:
+                self.release(lease, error=e)
+                if started or not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                continue
+            self.release(lease)
+            return
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._condition:
+            now = time.time()
+            return {f"{b.key_name}/{b.model}": {"calls": b.calls, "rate_limited": b.rate_limited,
+                                                 "in_window": len(b.requests), "load_pct": round(100 * b.load(now))}
+                    for b in self._budgets.values()}
+
+
+_shared: Optional[KeyPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> Optional[KeyPool]:
+    """The process-wide pool over every configured key, or None if no key is set."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            keys = configured_keys()
+            if keys:
+                _shared = KeyPool(keys)
+        return _shared
+
+
+# ---------- agno integration ----------
+_client: contextvars.ContextVar = contextvars.ContextVar("gemini_pool_client", default=None)
+
+
+def estimate_tokens(messages) -> int:
+    return sum(len(str(getattr(m, "content", "") or "")) for m in messages) // 4
+
+
+def _usage_tokens(response) -> Optional[int]:
+    metadata = getattr(response, "usage_metadata", None)
+    return getattr(metadata, "total_token_count", None)
+
+
+@dataclass
+class PooledGemini(CachedPrefixGemini):
+    """``Gemini`` whose every request runs on a key leased from a ``KeyPool``."""
+
+    pool: Optional[KeyPool] = None
+    priority: int = Priority.CHAT
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.pool is None:
+            self.pool = shared_pool()
+
+    def get_client(self):
+        client = _client.get()
+        return client if client is not None else super().get_client()
+
+    def _leased(self, fn):
+        def run(client):
+            token = _client.set(client)
+            try:
+                return fn()
+            finally:
+                _client.reset(token)
+        return run
+
+    def invoke(self, messages, *args, **kwargs):
+        return self.pool.call(self.id, self._leased(lambda: super(PooledGemini, self).invoke(messages, *args, **kwargs)),
+                              estimate_tokens(messages), self.priority, _usage_tokens)
+
+    def invoke_stream(self, messages, *args, **kwargs):
+        def chunks(client):
+            token = _client.set(client)
+            try:
+                yield from super(PooledGemini, self).invoke_stream(messages, *args, **kwargs)
+            finally:
+                _client.reset(token)
+        yield from self.pool.stream(self.id, chunks, estimate_tokens(messages), self.priority)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        async def run(client):
+            token = _client.set(client)
+            try:
+                return await super(PooledGemini, self).ainvoke(messages, *args, **kwargs)
+            finally:
+                _client.reset(token)
+        return await self.pool.acall(self.id, run, estimate_tokens(messages), self.priority, _usage_tokens)
+
+    async def ainvoke_stream(self, messages, *args, **kwargs):
+        async def chunks(client):
+            token = _client.set(client)
+            try:
+                async for chunk in super(PooledGemini, self).ainvoke_stream(messages, *args, **kwargs):
+                    yield chunk
+            finally:
+                _client.reset(token)
+        async for chunk in self.pool.astream(self.id, chunks, estimate_tokens(messages), self.priority):
+            yield chunk
+
+    def __deepcopy__(self, memo):
+        # The pool holds locks and clients; copies share it
+        pool, self.pool = self.pool, None
+        try:
+            copied = super().__deepcopy__(memo)
+        finally:
+            self.pool = pool
+        copied.pool = pool
+        return copied
+
+
+@dataclass
+class PooledGeminiEmbedder(GeminiEmbedder):
+    """``GeminiEmbedder`` whose requests, single or batched, run on a leased key."""
+
+    pool: Optional[KeyPool] = None
+    priority: int = Priority.EMBEDDING
+
+    def __post_init__(self):
+        if self.pool is None:
+            self.pool = shared_pool()
+
+    @property
+    def client(self):
+        client = _client.get()
+        return client if client is not None else super().client
+
+    def _run(self, fn, tokens: int):
+        def run(client):
+            token = _client.set(client)
+            try:
+                return fn()
+            finally:
+                _client.reset(token)
+        return self.pool.call(self.id, run, tokens, self.priority)
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self._run(lambda: super(PooledGeminiEmbedder, self).get_embedding(text), len(text) // 4)
+
+    def get_embedding_and_usage(self, text: str):
+        return self._run(lambda: super(PooledGeminiEmbedder, self).get_embedding_and_usage(text), len(text) // 4)
+
+    def get_embeddings_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        from agents.embedding_cache import GEMINI_BATCH_LIMIT, _gemini_batch
+
+        embeddings = []
+        for start in range(0, len(texts), GEMINI_BATCH_LIMIT):
+            batch = texts[start:start + GEMINI_BATCH_LIMIT]
+            embeddings.extend(self._run(lambda: _gemini_batch(self, batch), sum(len(t) for t in batch) // 4))
+        return embeddings
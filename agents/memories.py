@@ -0,0 +1,306 @@
+"""User memories retrieved by relevance instead of loaded in full.
+
+agno's ``Memory`` re-reads every memory of the user on each run and puts all
+of them in the system prompt. Each turn it then asks the model, inline, to
+extract new memories against the full list. ``IndexedMemory`` keeps an
+embedding index over each user's memories instead:
+
+- the system prompt gets the ``top_k`` memories closest to the turn's message
+- extraction runs on a background thread, after the run has returned, and the
+  model only sees the ``top_k`` memories closest to the message
+- a memory it adds or edits that is within ``dedupe_similarity`` cosine of
+  another memory replaces the older of the two
+
+The memories are only re-read when the user's row count or latest
+``updated_at`` in the memory table moves. The index embeds new and edited
+memories in one batched call through the shared embedding cache.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from agno.memory.v2.db.schema import MemoryRow
+from agno.memory.v2.schema import UserMemory
+from agno.models.message import Message
+
+from agents import config
+from agents.history import HistoryMemory
+from agents.vectorstores.compact import normalize, top_k
+
+logger = logging.getLogger(__name__)
+
+# One worker: extractions run in order, so two turns never edit the same memories at once
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-extraction")
+_turn_message: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("turn_message", default=None)
+
+
+def message_text(message=None, messages=None) -> Optional[str]:
+    """The text of a run's input, as agno's ``get_run_messages`` receives it."""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, Message):
+        return message.get_content_string()
+    if isinstance(message, dict):
+        return str(message.get("content") or "")
+    parts = [m.get_content_string() if isinstance(m, Message) else str(m.get("content") or "")
+             for m in messages or [] if (m.role if isinstance(m, Message) else m.get("role")) == "user"]
+    return " ".join(parts) or None
+
+
+class MemoryIndex:
+    """Unit-length embeddings of one user's memories, one row per memory."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.ids: List[str] = []
+        self.texts: Dict[str, str] = {}
+        self.matrix = np.empty((0, embedder.dimensions or config.EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+    def sync(self, memories: Dict[str, UserMemory]) -> List[str]:
+        """Match the index to ``memories``; returns the IDs of the new and edited ones, which it embedded."""
+        from agents.embedding_cache import embed_many
+
+        changed = [memory_id for memory_id, memory in memories.items() if self.texts.get(memory_id) != memory.memory]
+        if not changed and len(memories) == len(self.ids):
+            return []
+        ids = list(memories)
+        rows = {memory_id: row for row, memory_id in enumerate(self.ids)}
+        fresh = {memory_id: n for n, memory_id in enumerate(changed)}
+        matrix = np.empty((len(ids), self.matrix.shape[1]), dtype=np.float32)
+        kept = [(row, rows[memory_id]) for row, memory_id in enumerate(ids) if memory_id not in fresh]
+        if kept:
+            matrix[[new for new, _ in kept]] = self.matrix[[old for _, old in kept]]
+        if changed:
+            vectors = normalize(np.asarray(embed_many(self.embedder, [memories[i].memory for i in changed]),
+                                           dtype=np.float32))
+            for row, memory_id in enumerate(ids):
+                if memory_id in fresh:
+                    matrix[row] = vectors[fresh[memory_id]]
+        self.ids, self.matrix = ids, matrix
+        self.texts = {memory_id: memories[memory_id].memory for memory_id in ids}
+        return changed
+
+    def search(self, text: str, k: int) -> List[Tuple[str, float]]:
+        if not self.ids:
+            return []
+        query = normalize(np.asarray(self.embedder.get_embedding(text), dtype=np.float32))
+        scores = self.matrix @ query
+        return [(self.ids[i], float(scores[i])) for i in top_k(scores, k)]
+
+    def nearest(self, memory_ids: Sequence[str], block: int = 1024) -> Dict[str, Tuple[str, float]]:
+        """The closest other memory to each of ``memory_ids``, ``block`` rows of the similarity matrix at a time."""
+        rows = {memory_id: row for row, memory_id in enumerate(self.ids)}
+        wanted = [rows[memory_id] for memory_id in memory_ids if memory_id in rows]
+        nearest = {}
+        for start in range(0, len(wanted), block):
+            chunk = wanted[start:start + block]
+            scores = self.matrix[chunk] @ self.matrix.T
+            scores[np.arange(len(chunk)), chunk] = -np.inf
+            best = scores.argmax(axis=1)
+            for n, row in enumerate(chunk):
+                nearest[self.ids[row]] = (self.ids[best[n]], float(scores[n, best[n]]))
+        return nearest
+
+
+class IndexedMemory(HistoryMemory):
+    """``HistoryMemory`` whose user memories are retrieved by relevance, extracted in the background and deduplicated.
+
+    ``top_k`` of 0 puts every memory in the prompt, as agno does, and
+    ``dedupe_similarity`` of 0 keeps near-identical memories apart. With both
+    at 0 the index is never used and ``embedder`` may be None.
+    """
+
+    _shared_attributes = HistoryMemory._shared_attributes + ("memory_embedder",)
+    _local_attributes = HistoryMemory._local_attributes + ("_indexes", "_signatures", "_index_lock")
+
+    def __init__(self, *args, embedder=None, top_k: int = config.MEMORY_TOP_K,
+                 dedupe_similarity: float = config.MEMORY_DEDUPE_SIMILARITY,
+                 background_extraction: bool = config.MEMORY_BACKGROUND, **kwargs):
+        if embedder is None and (top_k > 0 or dedupe_similarity > 0):
+            raise ValueError("IndexedMemory needs an embedder for its memory index")
+        self.memory_embedder = embedder
+        self.top_k = top_k
+        self.dedupe_similarity = dedupe_similarity
+        self.background_extraction = background_extraction
+        self.replaced = 0
+        super().__init__(*args, **kwargs)
+
+    def _init_local(self) -> None:
+        super()._init_local()
+        self._indexes: Dict[str, MemoryIndex] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._index_lock = threading.RLock()
+
+    # ---------- loading ----------
+    def _signature(self, user_id: str) -> Optional[tuple]:
+        table = getattr(self.db, "table", None)
+        if table is None:
+            return None
+        from sqlalchemy import func, select
+
+        try:
+            with self.db.Session() as session:
+                return tuple(session.execute(select(func.count(), func.max(table.c.updated_at))
+                                             .where(table.c.user_id == user_id)).one())
+        except Exception:
+            return None
+
+    def refresh_from_db(self, user_id: Optional[str] = None):
+        """Re-read ``user_id``'s memories only if their rows changed since the last read."""
+        if user_id is None:
+            with self._index_lock:
+                self._signatures.clear()
+                return super().refresh_from_db()
+        signature = self._signature(user_id)
+        with self._index_lock:
+            if signature is not None and self._signatures.get(user_id) == signature:
+                return
+            super().refresh_from_db(user_id=user_id)
+            self._signatures = {user_id: signature} if signature is not None else {}
+            for memory_id, memory in self.memories.get(user_id, {}).items():
+                memory.memory_id = memory.memory_id or memory_id
+
+    def index(self, user_id: str) -> MemoryIndex:
+        """``user_id``'s index, in sync with the loaded memories."""
+        with self._index_lock:
+            index = self._indexes.setdefault(user_id, MemoryIndex(self.memory_embedder))
+            index.sync(self.memories.get(user_id, {}))
+            return index
+
+    # ---------- retrieval ----------
+    def relevant_memories(self, text: str, user_id: Optional[str] = None, limit: Optional[int] = None,
+                          refresh_from_db: bool = True) -> List[UserMemory]:
+        """The ``limit`` (default ``top_k``) memories of ``user_id`` closest to ``text``, closest first."""
+        user_id = user_id or "default"
+        limit = limit or self.top_k
+        if refresh_from_db:
+            self.refresh_from_db(user_id=user_id)
+        with self._index_lock:
+            memories = self.memories.get(user_id, {})
+            if limit <= 0 or len(memories) <= limit or not text or self.memory_embedder is None:
+                return list(memories.values())
+            return [memories[memory_id] for memory_id, _ in self.index(user_id).search(text, limit)]
+
+    def get_user_memories(self, user_id: Optional[str] = None, **kwargs) -> List[UserMemory]:
+        """While an attached agent builds its prompt, only the memories relevant to the turn's message."""
+        text = _turn_message.get()
+        if text is None:
+            return super().get_user_memories(user_id=user_id, **kwargs)
+        return self.relevant_memories(text, user_id, refresh_from_db=kwargs.get("refresh_from_db", True))
+
+    # ---------- extraction ----------
+    def _extract(self, messages: List[Message], user_id: str) -> str:
+        try:
+            text = " ".join(m.get_content_string() for m in messages if m.role == "user")
+            existing = [{"memory_id": m.memory_id, "memory": m.memory} for m in self.relevant_memories(text, user_id)]
+            response = self.memory_manager.create_or_update_memories(
+                messages=messages, existing_memories=existing, user_id=user_id, db=self.db,
+                delete_memories=self.delete_memories, clear_memories=self.clear_memories,
+            )
+            with self._index_lock:
+                self._signatures.pop(user_id, None)
+                self.refresh_from_db(user_id=user_id)
+                if self.dedupe_similarity <= 0:
+                    return response
+                index = self._indexes.setdefault(user_id, MemoryIndex(self.memory_embedder))
+                changed = index.sync(self.memories.get(user_id, {}))
+            self.dedupe(user_id, changed)
+            return response
+        except Exception as e:
+            logger.warning(f"Failed to extract memories of user {user_id}: {e}")
+            return f"Error extracting memories: {e}"
+
+    def create_user_memories(self, message: Optional[str] = None, messages: Optional[List[Message]] = None,
+                             user_id: Optional[str] = None, refresh_from_db: bool = True) -> str:
+        if message:
+            messages = [Message(role="user", content=message)]
+        if not messages:
+            raise ValueError("You must provide either a message or a list of messages")
+        if self.memory_manager is None or self.db is None:
+            return super().create_user_memories(messages=messages, user_id=user_id)
+        user_id = user_id or "default"
+        if self.background_extraction:
+            _executor.submit(self._extract, messages, user_id)
+            return "Memory extraction scheduled"
+        return self._extract(messages, user_id)
+
+    async def acreate_user_memories(self, message: Optional[str] = None, messages: Optional[List[Message]] = None,
+                                    user_id: Optional[str] = None, refresh_from_db: bool = True) -> str:
+        if self.background_extraction:
+            return self.create_user_memories(message, messages, user_id)
+        return await asyncio.to_thread(self.create_user_memories, message, messages, user_id)
+
+    # ---------- deduplication ----------
+    def dedupe(self, user_id: Optional[str] = None, memory_ids: Optional[Sequence[str]] = None) -> int:
+        """Collapse each of ``memory_ids`` (default: all) and its nearest memory into one if they are near-identical.
+
+        The newer text replaces the older memory's, which keeps its ID and
+        gains the newer one's topics. Returns the number of memories replaced.
+        """
+        if self.dedupe_similarity <= 0:
+            return 0
+        user_id = user_id or "default"
+        replaced = 0
+        with self._index_lock:
+            memories = self.memories.get(user_id, {})
+            index = self.index(user_id)
+            candidates = index.nearest(list(memories) if memory_ids is None else memory_ids)
+            for memory_id, (other_id, score) in candidates.items():
+                if score < self.dedupe_similarity or memory_id not in memories or other_id not in memories:
+                    continue
+                self._replace(user_id, *sorted((memory_id, other_id), key=lambda i: _updated(memories[i])))
+                replaced += 1
+            if replaced:
+                # The loaded memories already match what was written, so the next refresh needn't re-read them
+                self._signatures[user_id] = self._signature(user_id)
+                index.sync(memories)
+        self.replaced += replaced
+        return replaced
+
+    def _replace(self, user_id: str, older_id: str, newer_id: str) -> None:
+        """Give ``older_id`` the text of ``newer_id`` and both's topics, then delete ``newer_id``."""
+        memories = self.memories[user_id]
+        older, newer = memories[older_id], memories[newer_id]
+        topics = list(dict.fromkeys((older.topics or []) + (newer.topics or []))) or None
+        replacement = UserMemory(memory=newer.memory, topics=topics, input=newer.input, last_updated=datetime.now(),
+                                 memory_id=older_id)
+        self.db.upsert_memory(MemoryRow(id=older_id, user_id=user_id, memory=replacement.to_dict(),
+                                        last_updated=replacement.last_updated))
+        self.db.delete_memory(newer_id)
+        memories[older_id] = replacement
+        del memories[newer_id]
+
+
+def wait_for_extraction() -> None:
+    """Block until every extraction scheduled so far has finished."""
+    _executor.submit(lambda: None).result()
+
+
+def _updated(memory: UserMemory) -> datetime:
+    updated = memory.last_updated
+    if isinstance(updated, str):
+        updated = datetime.fromisoformat(updated)
+    return updated or datetime.min
+
+
+def attach(agent) -> None:
+    """Make ``agent``'s prompt carry the memories relevant to each run's message, if its memory is indexed."""
+    if not isinstance(getattr(agent, "memory", None), IndexedMemory):
+        return
+    get_run_messages = agent.get_run_messages
+
+    @functools.wraps(get_run_messages)
+    def with_relevant_memories(*args, **kwargs):
+        token = _turn_message.set(message_text(kwargs.get("message"), kwargs.get("messages")) or "")
+        try:
+            return get_run_messages(*args, **kwargs)
+        finally:
+            _turn_message.reset(token)
+
+    agent.get_run_messages = with_relevant_memories
@@ -0,0 +1,161 @@
+"""Parse knowledge files in a process pool, a few pages at a time.
+
+PDF and CSV parsing is CPU-bound, so ``iter_pages`` splits each file into
+tasks of ``PARSE_PAGES_PER_TASK`` PDF pages or ``CSV_ROWS_PER_PAGE`` CSV rows
+and runs them on ``PARSE_WORKERS`` processes. Page documents come back in file
+order as tasks finish. At most ``max_pending`` tasks are in flight, so memory
+is bounded by the task size rather than by the file size. Files of other
+readers are read in-process with the reader itself.
+"""
+import csv
+import io
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+# What a task sends back: (page key, document name, content, meta data)
+Page = Tuple[str, str, str, dict]
+
+
+def parse_pdf_pages(path: Path, start: int, stop: int) -> List[Page]:
+    """Pages ``start`` to ``stop`` (0-based, exclusive) of a PDF, as agno's ``PDFReader`` reads them."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    name = path.name.split(".")[0]
+    return [(str(i + 1), name, reader.pages[i].extract_text(), {"page": i + 1}) for i in range(start, stop)]
+
+
+def pdf_tasks(path: Path, pages_per_task: int, rows_per_page: int) -> Iterator[Tuple[Callable, tuple]]:
+    from pypdf import PdfReader
+
+    count = len(PdfReader(path).pages)
+    for start in range(0, count, pages_per_task):
+        yield parse_pdf_pages, (path, start, min(start + pages_per_task, count))
+
+
+def parse_csv_page(path: Path, page: int, start_row: int, text: str) -> List[Page]:
+    """One page of CSV rows, as agno's ``CSVReader.async_read`` pages them."""
+    rows = list(csv.reader(io.StringIO(text)))
+    content = " ".join(", ".join(row) for row in rows)
+    return [(str(page), path.stem, content, {"page": page, "start_row": start_row, "rows": len(rows)})]
+
+
+def csv_blocks(path: Path, rows: int) -> Iterator[Tuple[int, str]]:
+    """Split a CSV into ``(first row, raw text)`` blocks of ``rows`` records without parsing it.
+
+    A line ends a record only when the quotes so far are balanced, so quoted
+    newlines stay inside their record.
+    """
+    block, count, first, quotes = [], 0, 1, 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for line in f:
+            block.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            quotes = 0
+            count += 1
+            if count == rows:
+                yield first, "".join(block)
+                block, first, count = [], first + count, 0
+    if block:
+        yield first, "".join(block)
+
+
+def csv_tasks(path: Path, pages_per_task: int, rows_per_page: int) -> Iterator[Tuple[Callable, tuple]]:
+    for page, (start_row, text) in enumerate(csv_blocks(path, rows_per_page), start=1):
+        yield parse_csv_page, (path, page, start_row, text)
+
+
+# Readers whose files are parsed in the pool, by exact type: a subclass may read differently
+SPLITTERS = {"PDFReader": pdf_tasks, "CSVReader": csv_tasks}
+
+
+def _read_in_process(reader, path: Path) -> List[Page]:
+    from agents.ingestion import read_pages
+
+    return [(key, d.name, d.content, d.meta_data) for key, d in read_pages(reader, path)]
+
+
+def _plan(files: Iterable[Tuple[Hashable, Any, Path]], pages_per_task: int,
+          rows_per_page: int) -> Iterator[Tuple[Hashable, Optional[Callable], tuple, bool]]:
+    """Yield ``(tag, fn, args, pooled)`` tasks; ``fn`` is None when planning the file failed."""
+    for tag, reader, path in files:
+        split = SPLITTERS.get(type(reader).__name__)
+        if split is None:
+            yield tag, _read_in_process, (reader, path), False
+            continue
+        try:
+            for fn, args in split(Path(path), pages_per_task, rows_per_page):
+                yield tag, fn, args, True
+        except Exception as e:
+            yield tag, None, (e,), False
+
+
+def _submit(executor: Optional[ProcessPoolExecutor], fn: Optional[Callable], args: tuple, pooled: bool) -> Future:
+    if executor is not None and pooled:
+        return executor.submit(fn, *args)
+    future = Future()
+    if fn is None:
+        future.set_exception(args[0])
+        return future
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def iter_pages(files: Iterable[Tuple[Hashable, Any, Path]], workers: int = config.PARSE_WORKERS,
+               pages_per_task: int = config.PARSE_PAGES_PER_TASK, rows_per_page: int = config.CSV_ROWS_PER_PAGE,
+               max_pending: Optional[int] = None) -> Iterator[Tuple[Hashable, Union[list, Exception]]]:
+    """Parse ``(tag, reader, path)`` files and yield ``(tag, pages)`` in file order.
+
+    ``pages`` is a list of ``(page_key, document)`` pairs. A file's pages can
+    arrive in several lists. If a file fails, its tag comes with the
+    exception instead, and nothing more follows for that file. ``workers=0``
+    parses in-process.
+    """
+    from agno.document.base import Document
+
+    executor = None
+    if workers > 0:
+        # Spawned, not forked: the ingestion pipeline calls this from a thread
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    max_pending = max_pending or 2 * max(workers, 1)
+    pending, failed = deque(), set()
+
+    def collect():
+        tag, future = pending.popleft()
+        if tag in failed:
+            return
+        try:
+            pages = future.result()
+        except Exception as e:
+            failed.add(tag)
+            yield tag, e
+            return
+        yield tag, [(key, Document(name=name, id=str(uuid4()), content=content, meta_data=meta))
+                    for key, name, content, meta in pages]
+
+    try:
+        for tag, fn, args, pooled in _plan(files, pages_per_task, rows_per_page):
+            if tag in failed:
+                continue
+            pending.append((tag, _submit(executor, fn, args, pooled)))
+            while len(pending) >= max_pending:
+                yield from collect()
+        while pending:
+            yield from collect()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,79 +1,16 @@
-from pathlib import Path
-from textwrap import dedent
+from agents import config
+from agents.context import with_context
+from agents.factories import agent_memory, agent_storage, gemini_model
+from agents.registry import get_agent
 
-from agno.agent import Agent
-
-from agno.models.google import Gemini
-from agno.embedder.google import GeminiEmbedder
-
-from agno.storage.sqlite import SqliteStorage
-
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-
-from agno.vectordb.qdrant import Qdrant
-from agno.vectordb.search import SearchType
-
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.tavily import TavilyTools
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.exa import ExaTools
-
-from agno.tools.yfinance import YFinanceTools
-
-from agno.tools.website import WebsiteTools
-from agno.tools.firecrawl import FirecrawlTools
-
-from agno.tools.csv_toolkit import CsvTools
-from agno.tools.pandas import PandasTools
-
-from agno.tools.file import FileTools
-from agno.tools.python import PythonTools
-from agno.tools.shell import ShellTools
-
-from agno.knowledge.combined import CombinedKnowledgeBase
-from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
-from agno.knowledge.csv import CSVKnowledgeBase, CSVReader
-from agno.document.chunking.agentic import AgenticChunking
-
-import os
-
-from dotenv import load_dotenv
-load_dotenv()
-
-# # ************* Paths *************
-cwd = Path(__file__).parent
-# knowledge_dir = cwd.joinpath("knowledge/brainspark/")
-# output_dir = cwd.joinpath("output")
-
-# # Create the output directory if it does not exist
-# output_dir.mkdir(parents=True, exist_ok=True)
-# *******************************
-agent_storage_file: str = f"{cwd}/tmp/agents.db"
-memory_storage_file: str = f"{cwd}/tmp/memory.db"
-
-memory_db = SqliteMemoryDb(table_name="product_manager_memory", 
-                           db_file=memory_storage_file)
-
-# Create Memory object that wraps the database
-memory = Memory(db=memory_db)
-
-# Storage
-agent_storage = SqliteStorage(table_name="product_manager_agent", db_file=agent_storage_file)
-
-# Agents
-product_manager = Agent(
-    name="Product Manager",
-    agent_id="product_manager",
-    model=Gemini(id="gemini-2.0-flash", temperature=0.2, api_key=os.getenv("5DCNNGEMINI")),
-    description="""
+DESCRIPTION = """
     The Product Manager agent plays a strategic role in defining, refining, and managing BrainSpark Digital's suite of service offerings, 
     which include Web Development, SEO, AI, and Graphic Design. Its purpose is to ensure these services continuously meet evolving market 
     needs, maintain a competitive edge, and align with the company's overall strategic and growth objectives. This agent appears to focus
     on the "Strategy" output that directly influences "Growth" initiatives.
-""",
-    instructions="""
+"""
+
+INSTRUCTIONS = """
     Conduct a thorough analysis of BrainSpark Digital's current service offerings (Web Development, SEO, AI, Graphic Design) in the context of prevailing market trends, technological advancements, and the competitive landscape, particularly focusing on opportunities and challenges for a modern digital agency.
 
     Identify and evaluate opportunities for launching new service packages or refining existing ones. Pay particular attention to 'productizing' services—creating standardized packages with clear deliverables and pricing—to enhance scalability and marketability.
@@ -97,30 +34,61 @@ product_manager = Agent(
     - DuckDuckGo
     - YFinance 
     - Wikipedia
-""",
-    memory=memory,
-    enable_user_memories=True,
-    storage=agent_storage,
-    add_history_to_messages=True,
-    add_datetime_to_instructions=True,
-    user_id="z4hid",
-    debug_mode=True,
-    markdown=True,
-    role="product_manager",
-    tools=[
+"""
+
+
+def build_tools():
+    from agno.tools.duckduckgo import DuckDuckGoTools
+    from agno.tools.firecrawl import FirecrawlTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.tavily import TavilyTools
+    from agno.tools.wikipedia import WikipediaTools
+    from agno.tools.yfinance import YFinanceTools
+
+    return [
         GoogleSearchTools(fixed_max_results=15),
         DuckDuckGoTools(fixed_max_results=10),
         TavilyTools(),
         FirecrawlTools(),
         YFinanceTools(),
         WikipediaTools(),
-    ],
-    show_tool_calls=True
-)
+    ]
+
+
+def build_product_manager(model=None, memory=None, storage=None, tools=None):
+    from agno.agent import Agent
+
+    return Agent(
+        name="Product Manager",
+        agent_id="product_manager",
+        model=model or gemini_model("5DCNNGEMINI"),
+        description=DESCRIPTION,
+        # The BrandScript rides in the static, cacheable part of the system prompt
+        instructions=with_context(INSTRUCTIONS, "brandscript", files="product_manager" in config.BRANDSCRIPT_AGENTS),
+        memory=memory or agent_memory("product_manager_memory"),
+        enable_user_memories=True,
+        storage=storage or agent_storage("product_manager_agent"),
+        add_history_to_messages=True,
+        add_datetime_to_instructions=True,
+        user_id=config.USER_ID,
+        debug_mode=True,
+        markdown=True,
+        role="product_manager",
+        tools=build_tools() if tools is None else tools,
+        show_tool_calls=True
+    )
+
+
+def __getattr__(name):
+    if name == "product_manager":
+        return get_agent("product_manager")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     try:
-        # pdf_knowledge_base.load(recreate=False)
+        product_manager = get_agent("product_manager")
+        # product_manager.knowledge.load(recreate=False)
         # Comment out after first run
         
         product_manager.print_response("Competitor analysis reports detailing services, pricing, and positioning of other digital agencies", stream=True)
@@ -0,0 +1,318 @@
+"""Reuse of the static prefix of agent prompts.
+
+agno renders an agent's system prompt as its description, role and
+instructions (with any ``agents.context`` artifacts they reference), then what
+changes per call: the current time, memories, tool hints. ``CachedPrefixGemini``
+splits the prompt there. With ``CONTEXT_CACHE=provider`` it stores the static
+prefix and the agent's tools as Gemini cached content, once per prefix hash,
+key and model. Requests then reference the cache and send only the dynamic
+remainder. Prefixes Gemini won't cache, and ``CONTEXT_CACHE=local``, keep the
+prefix in the request. It stays byte-identical, so models with implicit
+caching still reuse it.
+
+``track_prompt_usage`` adds up prompt, prefix and cached tokens for the calls
+made inside it.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.exceptions import ModelProviderError
+from agno.models.google import Gemini
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+# agno closes the instructions block before anything that changes per call
+_STATIC_END = "\n</instructions>"
+
+
+def split_system_prompt(text: str) -> Tuple[str, str]:
+    """``(static prefix, dynamic remainder)`` of an agno system prompt."""
+    end = text.find(_STATIC_END)
+    if end < 0:
+        return "", text
+    end += len(_STATIC_END)
+    return text[:end], text[end:].lstrip()
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    digest: str
+    text: str
+    tokens: int
+
+
+@dataclass
+class PromptUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    prefix_tokens: int = 0
+    cached_tokens: int = 0
+    cached_calls: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        """Prompt tokens served from the provider's cache instead of being processed again."""
+        return self.cached_tokens
+
+    def add(self, other: "PromptUsage") -> None:
+        for name in ("calls", "prompt_tokens", "prefix_tokens", "cached_tokens", "cached_calls"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def __str__(self):
+        share = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        return (f"{self.calls} calls, {self.prompt_tokens} prompt tokens, {self.prefix_tokens} in static prefixes, "
+                f"{self.cached_tokens} cached ({share:.0%} saved)")
+
+
+_usage: contextvars.ContextVar = contextvars.ContextVar("prompt_usage", default=None)
+
+
+@contextmanager
+def track_prompt_usage():
+    """Yield a ``PromptUsage`` that the Gemini calls made in this context add to."""
+    usage = PromptUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def _key_id(client) -> str:
+    api_key = getattr(getattr(client, "_api_client", None), "api_key", None)
+    return sha256(api_key.encode()).hexdigest()[:16] if api_key else str(id(client))
+
+
+class PromptCache:
+    """Static prefixes by hash, and the Gemini cached content made from them per key and model."""
+
+    def __init__(self, ttl: int = config.CONTEXT_CACHE_TTL, min_tokens: int = config.CONTEXT_CACHE_MIN_TOKENS,
+                 retry_after: float = 3600.0):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self.created = 0
+        self._prefixes: Dict[str, PromptPrefix] = {}
+        self._caches: Dict[tuple, Tuple[str, float]] = {}
+        self._failed: Dict[tuple, float] = {}
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def prefix(self, text: str) -> PromptPrefix:
+        digest = sha256(text.encode()).hexdigest()
+        prefix = self._prefixes.get(digest)
+        if prefix is None:
+            prefix = PromptPrefix(digest, text, len(text) // 4)
+            with self._lock:
+                self._prefixes[digest] = prefix
+        return prefix
+
+    def cached_content(self, client, model: str, prefix: PromptPrefix,
+                       tools: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """Name of a live cached content holding ``prefix`` and ``tools``, created if needed; None if uncacheable."""
+        tools_json = json.dumps(tools or [], sort_keys=True, default=str)
+        if prefix.tokens + len(tools_json) // 4 < self.min_tokens:
+            return None
+        key = (_key_id(client), model, prefix.digest, sha256(tools_json.encode()).hexdigest())
+        name = self._live(key)
+        if name is not None or self._failed.get(key, 0) > time.time():
+            return name
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            name = self._live(key)
+            if name is not None:
+                return name
+            from agno.utils.gemini import format_function_definitions
+            from google.genai.types import CreateCachedContentConfig
+
+            try:
+                cache = client.caches.create(model=model, config=CreateCachedContentConfig(
+                    system_instruction=prefix.text,
+                    tools=[format_function_definitions(tools)] if tools else None,
+                    ttl=f"{int(self.ttl)}s",
+                    display_name=f"prefix-{prefix.digest[:16]}",
+                ))
+            except Exception as e:
+                logger.warning(f"Not caching a {prefix.tokens}-token prompt prefix for {model}: {e}")
+                self._failed[key] = time.time() + self.retry_after
+                return None
+            expires = cache.expire_time.timestamp() if cache.expire_time else time.time() + self.ttl
+            self._caches[key] = (cache.name, expires)
+            self.created += 1
+            return cache.name
+
+    def _live(self, key: tuple) -> Optional[str]:
+        entry = self._caches.get(key)
+        # Leave a minute of slack so a request never races the cache's expiry
+        if entry is not None and entry[1] - 60 > time.time():
+            return entry[0]
+        return None
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            for key, (cached, _) in list(self._caches.items()):
+                if cached == name:
+                    del self._caches[key]
+
+
+_shared: Optional[PromptCache] = None
+_shared_lock = threading.Lock()
+
+
+def prompt_cache() -> PromptCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PromptCache()
+        return _shared
+
+
+@dataclass
+class _Request:
+    tools: Optional[List[Dict[str, Any]]]
+    prefix: Optional[PromptPrefix] = None
+    cached_content: Optional[str] = None
+    bypass: bool = False
+
+
+_request: contextvars.ContextVar = contextvars.ContextVar("prompt_cache_request", default=None)
+
+
+def _record(request: _Request, usage_metadata) -> None:
+    usage = _usage.get()
+    if usage is None or usage_metadata is None:
+        return
+    usage.calls += 1
+    usage.prompt_tokens += usage_metadata.prompt_token_count or 0
+    usage.cached_tokens += usage_metadata.cached_content_token_count or 0
+    usage.prefix_tokens += request.prefix.tokens if request.prefix else 0
+    usage.cached_calls += request.cached_content is not None
+
+
+def _stale_cache(error: Exception) -> bool:
+    # agno's message is just the HTTP response; the API's reason is on the google-genai error it wraps
+    text = f"{error} {error.__cause__ or ''}".lower().replace("_", "").replace(" ", "")
+    return "cachedcontent" in text
+
+
+@dataclass
+class CachedPrefixGemini(Gemini):
+    """``Gemini`` that sends each agent's static prompt prefix as cached content when it can."""
+
+    context_cache: str = config.CONTEXT_CACHE
+
+    def _format_messages(self, messages):
+        contents, system_message = super()._format_messages(messages)
+        request = _request.get()
+        if request is None or self.context_cache == "off" or not isinstance(system_message, str):
+            return contents, system_message
+        static, dynamic = split_system_prompt(system_message)
+        if not static:
+            return contents, system_message
+        request.prefix = prompt_cache().prefix(static)
+        if self.context_cache != "provider" or request.bypass:
+            return contents, system_message
+        request.cached_content = prompt_cache().cached_content(self.get_client(), self.id, request.prefix,
+                                                               request.tools)
+        if request.cached_content is None:
+            return contents, system_message
+        from google.genai.types import Content, Part
+
+        if dynamic.strip():
+            contents = [Content(role="user", parts=[Part.from_text(text=dynamic)])] + contents
+        return contents, None
+
+    def _get_request_kwargs(self, system_message, response_format=None, tools=None):
+        request = _request.get()
+        if request is None or request.cached_content is None:
+            return super()._get_request_kwargs(system_message, response_format=response_format, tools=tools)
+        from google.genai.types import GenerateContentConfig
+
+        # Cached content carries the system instruction and tools; the request may not repeat them
+        kwargs = super()._get_request_kwargs(None, response_format=response_format, tools=None)
+        kwargs.setdefault("config", GenerateContentConfig())
+        kwargs["config"].cached_content = request.cached_content
+        return kwargs
+
+    def _call(self, tools, call):
+        for attempt in range(2):
+            request = _Request(tools, bypass=attempt > 0)
+            token = _request.set(request)
+            try:
+                response = call()
+                _record(request, getattr(response, "usage_metadata", None))
+                return response
+            except ModelProviderError as e:
+                # The cache expired or was deleted under us: forget it and send the prefix inline
+                if attempt or request.cached_content is None or not _stale_cache(e):
+                    raise
+                prompt_cache().invalidate(request.cached_content)
+            finally:
+                _request.reset(token)
+
+    async def _acall(self, tools, call):
+        for attempt in range(2):
+            request = _Request(tools, bypass=attempt > 0)
+            token = _request.set(request)
+            try:
+                response = await call()
+                _record(request, getattr(response, "usage_metadata", None))
+                return response
+            except ModelProviderError as e:
+                if attempt or request.cached_content is None or not _stale_cache(e):
+                    raise
+                prompt_cache().invalidate(request.cached_content)
+            finally:
+                _request.reset(token)
+
+    def invoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        return self._call(tools, lambda: super(CachedPrefixGemini, self).invoke(
+            messages, response_format=response_format, tools=tools, tool_choice=tool_choice))
+
+    async def ainvoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        return await self._acall(tools, lambda: super(CachedPrefixGemini, self).ainvoke(
+            messages, response_format=response_format, tools=tools, tool_choice=tool_choice))
+
+    def invoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        request = _Request(tools)
+        token = _request.set(request)
+        usage_metadata = None
+        try:
+            for chunk in super().invoke_stream(messages, response_format=response_format, tools=tools,
+                                               tool_choice=tool_choice):
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                yield chunk
+        except ModelProviderError as e:
+            if request.cached_content is not None and _stale_cache(e):
+                prompt_cache().invalidate(request.cached_content)
+            raise
+        finally:
+            _request.reset(token)
+        _record(request, usage_metadata)
+
+    async def ainvoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        request = _Request(tools)
+        token = _request.set(request)
+        usage_metadata = None
+        try:
+            async for chunk in super().ainvoke_stream(messages, response_format=response_format, tools=tools,
+                                                      tool_choice=tool_choice):
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                yield chunk
+        except ModelProviderError as e:
+            if request.cached_content is not None and _stale_cache(e):
+                prompt_cache().invalidate(request.cached_content)
+            raise
+        finally:
+            _request.reset(token)
+        _record(request, usage_metadata)
@@ -0,0 +1,75 @@
+"""Registry of agent factories.
+
+Agents are built on first request and cached, so importing the package never
+opens vector DB clients, storage handles or toolkit modules.
+"""
+import threading
+from importlib import import_module
+from typing import Callable, Dict
+
+from agents import config
+
+AGENT_FACTORIES: Dict[str, str] = {
+    "brandscript_architect": "agents.storybrand:build_brandscript_architect",
+    "seo_specialist": "agents.seo:build_seo_specialist",
+    "content_creator": "agents.content_creator:build_content_creator",
+    "script_writer": "agents.script_writer:build_script_writer",
+    "social_media_manager": "agents.social_media_manager:build_social_media_manager",
+    "growth_hacker": "agents.growth_hacker:build_growth_hacker",
+    "product_manager": "agents.product_manager:build_product_manager",
+}
+
+_agents: Dict[str, object] = {}
+_lock = threading.RLock()
+
+
+def register_agent(agent_id: str, factory: str) -> None:
+    """Register a factory given as ``"package.module:function"``."""
+    with _lock:
+        AGENT_FACTORIES[agent_id] = factory
+        _agents.pop(agent_id, None)
+
+
+def list_agents():
+    return list(AGENT_FACTORIES)
+
+
+def get_factory(agent_id: str) -> Callable:
+    try:
+        target = AGENT_FACTORIES[agent_id]
+    except KeyError:
+        raise KeyError(f"Unknown agent '{agent_id}'. Available: {', '.join(AGENT_FACTORIES)}") from None
+    module_name, func_name = target.split(":")
+    return getattr(import_module(module_name), func_name)
+
+
+def build_agent(agent_id: str, **overrides):
+    """A new, unshared instance of ``agent_id``; ``overrides`` go to its factory."""
+    agent = get_factory(agent_id)(**overrides)
+    if config.MEMORY_TOP_K > 0:
+        from agents.memories import attach as attach_memories
+
+        attach_memories(agent)
+    if config.RESPONSE_CACHE != "off":
+        from agents.response_cache import attach
+
+        attach(agent, agent_id)
+    if config.TRACING:
+        from agents.tracing import instrument
+
+        instrument(agent, agent_id)
+    return agent
+
+
+def get_agent(agent_id: str):
+    """Return the shared instance of ``agent_id``, building it on first use."""
+    with _lock:
+        agent = _agents.get(agent_id)
+        if agent is None:
+            agent = _agents[agent_id] = build_agent(agent_id)
+        return agent
+
+
+def reset() -> None:
+    with _lock:
+        _agents.clear()
@@ -0,0 +1,307 @@
+"""Disk cache and record/replay of model responses.
+
+With ``RESPONSE_CACHE`` on, every model request is keyed by the agent, model
+id, temperature, a hash of the prompt (with the current time masked out), a
+hash of the tool results in it, and the tools and response format on offer.
+Provider responses, and every chunk of streamed ones, are stored under that key
+in ``tmp/responses.db``. An unchanged run, ``print_response(stream=True)``
+included, is then served from disk.
+
+- ``on``: serve cached responses and record misses; tools run live.
+- ``record``: call the model for everything and record the responses and
+  each tool's results.
+- ``replay``: serve responses and tool results from the recordings only. A
+  request that was never recorded raises ``ResponseNotRecorded``.
+"""
+import inspect
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from hashlib import sha256
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from agents import config
+from agents.tracing import annotate
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    agent_id TEXT,
+    model TEXT NOT NULL,
+    chunks BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tool_results (
+    key TEXT PRIMARY KEY,
+    agent_id TEXT,
+    tool TEXT NOT NULL,
+    result BLOB NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+# agno's add_datetime_to_instructions line, which would otherwise make every prompt unique
+_CURRENT_TIME = re.compile(r"The current time is [^\n]*?\.(?=\n|$)")
+
+
+class ResponseNotRecorded(LookupError):
+    """Raised in replay mode for a model request or tool call that has no recording."""
+
+
+def _digest(value: Any) -> str:
+    return sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _message_fingerprint(message) -> Dict[str, Any]:
+    content = message.content
+    if message.role == "system" and isinstance(content, str):
+        content = _CURRENT_TIME.sub("The current time is <now>.", content)
+    # Tool call ids are generated per response, so they never repeat between runs
+    calls = [c.get("function") for c in message.tool_calls] if message.tool_calls else None
+    return {"role": message.role, "content": content, "tool_calls": calls, "tool_name": message.tool_name,
+            "images": len(message.images or []), "files": len(message.files or [])}
+
+
+def _response_format_name(response_format) -> Optional[str]:
+    if response_format is None or isinstance(response_format, dict):
+        return response_format
+    schema = getattr(response_format, "model_json_schema", None)
+    return _digest(schema()) if schema else str(response_format)
+
+
+def response_key(agent_id: Optional[str], model_id: str, temperature: Optional[float], messages,
+                 tools: Optional[List[Dict[str, Any]]] = None, response_format=None, stream: bool = False) -> str:
+    """Cache key of a model request."""
+    fingerprints = [_message_fingerprint(m) for m in messages]
+    return _digest({
+        "agent": agent_id,
+        "model": model_id,
+        "temperature": temperature,
+        "prompt": _digest([f for f in fingerprints if f["role"] != "tool"]),
+        "tool_results": _digest([f for f in fingerprints if f["role"] == "tool"]),
+        "tools": _digest(tools or []),
+        "response_format": _response_format_name(response_format),
+        "stream": stream,
+    })
+
+
+def tool_key(agent_id: Optional[str], tool: str, arguments: Dict[str, Any]) -> str:
+    return _digest({"agent": agent_id, "tool": tool, "arguments": arguments})
+
+
+def dump_response(response) -> Dict[str, Any]:
+    """A provider response as JSON, with the type to rebuild it as."""
+    cls = type(response)
+    return {"type": f"{cls.__module__}:{cls.__qualname__}",
+            "data": response.model_dump(mode="json", exclude_none=True)}
+
+
+def load_response(dumped: Dict[str, Any]):
+    module, name = dumped["type"].split(":")
+    return getattr(import_module(module), name).model_validate(dumped["data"])
+
+
+class ResponseCache:
+    def __init__(self, db_file: Path = config.RESPONSE_CACHE_FILE):
+        self.db_file = Path(db_file)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """The recorded chunks of a response (one for a non-streamed one), or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT chunks FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, agent_id: Optional[str], model: str, chunks: Iterable[Dict[str, Any]]) -> None:
+        blob = zlib.compress(json.dumps(list(chunks)).encode())
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                               (key, agent_id, model, blob, time.time()))
+            self._conn.commit()
+
+    def get_tool(self, key: str) -> Optional[Dict[str, Any]]:
+        """``{"result": ...}`` as recorded, or None; tools may legitimately return None."""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM tool_results WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(zlib.decompress(row[0]))
+
+    def put_tool(self, key: str, agent_id: Optional[str], tool: str, result: Any) -> None:
+        try:
+            blob = json.dumps({"result": result})
+        except TypeError:
+            # agno turns tool results into strings for the model anyway
+            blob = json.dumps({"result": str(result)})
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?, ?)",
+                               (key, agent_id, tool, zlib.compress(blob.encode()), time.time()))
+            self._conn.commit()
+
+    def clear(self, agent_id: Optional[str] = None) -> None:
+        with self._lock:
+            for table in ("responses", "tool_results"):
+                if agent_id is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE agent_id = ?", (agent_id,))
+            self._conn.commit()
+
+
+_shared: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def response_cache() -> ResponseCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResponseCache()
+        return _shared
+
+
+class RecordReplayMixin:
+    """Model mixin that answers ``invoke`` and ``invoke_stream`` (sync and async) from a ``ResponseCache``.
+
+    Responses are cached before agno parses them, so tool calls, content and
+    usage come back exactly as recorded.
+    """
+
+    response_cache_mode: str = config.RESPONSE_CACHE
+    response_cache_agent: Optional[str] = None
+
+    def _response_key(self, messages, response_format, tools, stream: bool) -> str:
+        return response_key(self.response_cache_agent, self.id, getattr(self, "temperature", None), messages,
+                            tools, response_format, stream)
+
+    def _recorded(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if self.response_cache_mode == "record":
+            return None
+        chunks = response_cache().get(key)
+        annotate(response_cache="miss" if chunks is None else "hit")
+        if chunks is None and self.response_cache_mode == "replay":
+            agent = self.response_cache_agent or "the agent"
+            raise ResponseNotRecorded(f"No recorded response of {self.id} for {agent} (key {key[:12]}); "
+                                      f"record it with RESPONSE_CACHE=record")
+        return chunks
+
+    def _record(self, key: str, responses: List[Any]) -> None:
+        response_cache().put(key, self.response_cache_agent, self.id, [dump_response(r) for r in responses])
+
+    def invoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        if self.response_cache_mode == "off":
+            return super().invoke(messages, response_format=response_format, tools=tools, tool_choice=tool_choice)
+        key = self._response_key(messages, response_format, tools, False)
+        recorded = self._recorded(key)
+        if recorded is not None:
+            return load_response(recorded[0])
+        response = super().invoke(messages, response_format=response_format, tools=tools, tool_choice=tool_choice)
+        self._record(key, [response])
+        return response
+
+    async def ainvoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        if self.response_cache_mode == "off":
+            return await super().ainvoke(messages, response_format=response_format, tools=tools,
+                                         tool_choice=tool_choice)
+        key = self._response_key(messages, response_format, tools, False)
+        recorded = self._recorded(key)
+        if recorded is not None:
+            return load_response(recorded[0])
+        response = await super().ainvoke(messages, response_format=response_format, tools=tools,
+                                         tool_choice=tool_choice)
+        self._record(key, [response])
+        return response
+
+    def invoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        if self.response_cache_mode == "off":
+            yield from super().invoke_stream(messages, response_format=response_format, tools=tools,
+                                             tool_choice=tool_choice)
+            return
+        key = self._response_key(messages, response_format, tools, True)
+        recorded = self._recorded(key)
+        if recorded is not None:
+            for chunk in recorded:
+                yield load_response(chunk)
+            return
+        chunks = []
+        for chunk in super().invoke_stream(messages, response_format=response_format, tools=tools,
+                                           tool_choice=tool_choice):
+            chunks.append(chunk)
+            yield chunk
+        # Only a stream that ran to the end is recorded
+        self._record(key, chunks)
+
+    async def ainvoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        if self.response_cache_mode == "off":
+            async for chunk in super().ainvoke_stream(messages, response_format=response_format, tools=tools,
+                                                      tool_choice=tool_choice):
+                yield chunk
+            return
+        key = self._response_key(messages, response_format, tools, True)
+        recorded = self._recorded(key)
+        if recorded is not None:
+            for chunk in recorded:
+                yield load_response(chunk)
+            return
+        chunks = []
+        async for chunk in super().ainvoke_stream(messages, response_format=response_format, tools=tools,
+                                                  tool_choice=tool_choice):
+            chunks.append(chunk)
+            yield chunk
+        self._record(key, chunks)
+
+
+_replayable: Dict[type, type] = {}
+
+
+def replayable(model_cls: type) -> type:
+    """``model_cls`` with ``RecordReplayMixin`` in front of it."""
+    with _shared_lock:
+        cls = _replayable.get(model_cls)
+        if cls is None:
+            cls = type(f"Replayable{model_cls.__name__}", (RecordReplayMixin, model_cls), {})
+            _replayable[model_cls] = cls
+        return cls
+
+
+class ToolRecorder:
+    """agno tool hook that records tool results in ``record`` mode and serves them in ``replay`` mode."""
+
+    def __init__(self, agent_id: Optional[str], mode: str = config.RESPONSE_CACHE):
+        self.agent_id = agent_id
+        self.mode = mode
+
+    def __call__(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        key = tool_key(self.agent_id, function_name, arguments)
+        if self.mode == "replay":
+            recorded = response_cache().get_tool(key)
+            if recorded is None:
+                raise ResponseNotRecorded(f"No recorded result of {function_name}({arguments}) for {self.agent_id}")
+            return recorded["result"]
+        result = function_call(**arguments)
+        # Generators and coroutines (async tools) can't be recorded without consuming them
+        if self.mode == "record" and not (inspect.isgenerator(result) or inspect.isawaitable(result)):
+            response_cache().put_tool(key, self.agent_id, function_name, result)
+        return result
+
+
+def attach(agent, agent_id: str) -> None:
+    """Key ``agent``'s cached responses on ``agent_id`` and record or replay its tool calls."""
+    if isinstance(agent.model, RecordReplayMixin):
+        agent.model.response_cache_agent = agent_id
+    if config.RESPONSE_CACHE in ("record", "replay"):
+        agent.tool_hooks = list(agent.tool_hooks or []) + [ToolRecorder(agent_id)]
@@ -0,0 +1,357 @@
+"""One SQLite database for every agent's sessions and memories.
+
+All agents share a single resolved file (``config.STORAGE_DB_FILE``) and a
+single pooled SQLAlchemy engine with WAL journaling, so concurrent agents read
+while another writes instead of stalling on "database is locked". Session rows
+go through a write-behind ``SessionWriter``: repeated upserts of a session
+coalesce, and pending rows of every agent table are written in one transaction.
+With ``TRACING=on`` every statement on the engine is a ``storage.*`` span.
+"""
+import atexit
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agno.memory.v2.db.sqlite import SqliteMemoryDb
+from agno.storage.session import Session
+from agno.storage.sqlite import SqliteStorage
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from agents import config, tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_connection(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.STORAGE_BUSY_TIMEOUT * 1000)}")
+    cursor.close()
+
+
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    verb = statement.lstrip().split(None, 1)[0].lower()
+    table = _TABLE.search(statement)
+    conn.info.setdefault("spans", []).append(tracing.start_span(
+        f"storage.{verb}", "storage", table=table.group(1) if table else "", executemany=executemany,
+        request_bytes=len(statement) + tracing.payload_bytes(parameters)))
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    spans = conn.info.get("spans")
+    if spans:
+        opened = spans.pop()
+        opened.set(rows=cursor.rowcount)
+        tracing.end_span(opened)
+
+
+def _execute_failed(context) -> None:
+    spans = context.connection.info.get("spans") if context.connection is not None else None
+    if spans:
+        tracing.end_span(spans.pop(), context.original_exception)
+
+
+def trace_engine(engine: Engine) -> None:
+    """Put every statement executed on ``engine`` in a span."""
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _execute_failed)
+
+
+def create_storage_engine(db_file: Path = config.STORAGE_DB_FILE,
+                          pool_size: int = config.STORAGE_POOL_SIZE) -> Engine:
+    db_file = Path(db_file).resolve()
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(
+        f"sqlite:///{db_file}",
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        connect_args={"check_same_thread": False, "timeout": config.STORAGE_BUSY_TIMEOUT},
+    )
+    event.listen(engine, "connect", _configure_connection)
+    if config.TRACING:
+        trace_engine(engine)
+    return engine
+
+
+def _upsert_statement(storage: SqliteStorage, session: Session):
+    """The same ``INSERT ... ON CONFLICT`` agno's ``SqliteStorage.upsert`` runs, for any storage mode.
+
+    The session's own timestamps are written when it has them, so the row
+    matches what ``BatchedSqliteStorage.upsert`` returned. An existing row
+    keeps its ``created_at``.
+    """
+    columns = set(storage.table.c.keys())
+    values = {k: v for k, v in session.to_dict().items()
+              if k in columns and (v is not None or k not in ("created_at", "updated_at"))}
+    updates = {k: v for k, v in values.items() if k not in ("session_id", "created_at")}
+    updates.setdefault("updated_at", int(time.time()))
+    return sqlite.insert(storage.table).values(**values).on_conflict_do_update(
+        index_elements=["session_id"], set_=updates)
+
+
+class SessionWriter:
+    """Write-behind buffer for session rows.
+
+    Pending sessions are keyed by table and session ID, so only the latest
+    state of a session is written. A flush happens once ``max_pending`` rows
+    are buffered, ``flush_interval`` seconds after the first pending write, and
+    at interpreter exit; ``flush_interval=0`` writes through. Rows of a failed
+    write stay pending and are retried ``retry_interval`` seconds later.
+    """
+
+    def __init__(self, engine: Engine, flush_interval: float = config.STORAGE_FLUSH_INTERVAL,
+                 max_pending: int = 64, retry_interval: float = 1.0):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.upserts = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self._pending: Dict[Tuple[str, str], Tuple[SqliteStorage, Session]] = {}
+        self._created = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, storage: SqliteStorage, session: Session) -> None:
+        with self._lock:
+            self.upserts += 1
+            self._pending[(storage.table_name, session.session_id)] = (storage, session)
+            flush_now = self.flush_interval <= 0 or len(self._pending) >= self.max_pending
+            if not flush_now:
+                self._schedule(self.flush_interval)
+        if flush_now:
+            self.flush()
+
+    def _schedule(self, delay: float) -> None:
+        """Arm the flush timer unless one is pending (caller holds the lock)."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self, table_name: str, session_id: str) -> Optional[Session]:
+        with self._lock:
+            entry = self._pending.get((table_name, session_id))
+        return entry[1] if entry else None
+
+    def discard(self, table_name: str, session_id: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._pending if k[0] == table_name and session_id in (None, k[1])]:
+                del self._pending[key]
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = list(self._pending.values()), {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return
+            with tracing.span("storage.flush", "storage", rows=len(batch)):
+                self._write(batch)
+
+    def _write(self, batch: List[Tuple[SqliteStorage, Session]]) -> None:
+        try:
+            for storage, _ in batch:
+                if storage.table_name not in self._created:
+                    if not storage.table_exists():
+                        storage.create()
+                    self._created.add(storage.table_name)
+            with self.engine.begin() as conn:
+                for storage, session in batch:
+                    conn.execute(_upsert_statement(storage, session))
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} sessions: {e}")
+            with self._lock:
+                # Retry unless a newer state of the session arrived meanwhile
+                for storage, session in batch:
+                    self._pending.setdefault((storage.table_name, session.session_id), (storage, session))
+                self._schedule(max(self.flush_interval, self.retry_interval))
+            return
+        self.flushes += 1
+        self.rows_written += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        return {"upserts": self.upserts, "flushes": self.flushes, "rows_written": self.rows_written}
+
+
+# agno 1.x's SQLite classes replace a passed ``db_engine`` with an in-memory engine,
+# so the shared engine is bound after construction.
+class SharedSqliteStorage(SqliteStorage):
+    """``SqliteStorage`` bound to a shared engine."""
+
+    def __init__(self, table_name: str, db_engine: Engine, **kwargs):
+        super().__init__(table_name=table_name, db_url="sqlite://", **kwargs)
+        self.db_engine = db_engine
+        self.inspector = inspect(db_engine)
+        self.SqlSession = sessionmaker(bind=db_engine)
+
+
+class SharedSqliteMemoryDb(SqliteMemoryDb):
+    """``SqliteMemoryDb`` bound to a shared engine."""
+
+    def __init__(self, table_name: str, db_engine: Engine):
+        super().__init__(table_name=table_name, db_url="sqlite://")
+        self.db_engine = db_engine
+        self.inspector = inspect(db_engine)
+        self.Session = scoped_session(sessionmaker(bind=db_engine))
+
+
+class BatchedSqliteStorage(SharedSqliteStorage):
+    """``SqliteStorage`` whose upserts go through a ``SessionWriter``.
+
+    Reads see pending writes; listing sessions flushes first, and deleting or
+    dropping discards the pending rows it would otherwise resurrect.
+
+    ``upsert`` returns the session it was given rather than re-reading the row,
+    which isn't written yet. It stamps ``updated_at``, and ``created_at`` if
+    unset, on that session first, so the return value carries timestamps as
+    agno's does. A new session's ``created_at`` is the time of its first
+    upsert, not of the flush.
+    """
+
+    def __init__(self, table_name: str, db_engine: Engine, writer: SessionWriter, **kwargs):
+        super().__init__(table_name, db_engine, **kwargs)
+        self.writer = writer
+
+    def __deepcopy__(self, memo):
+        # The writer holds locks and timers; copies share it like they share the engine
+        writer = self.__dict__.pop("writer")
+        try:
+            copied = super().__deepcopy__(memo)
+        finally:
+            self.writer = writer
+        copied.writer = writer
+        return copied
+
+    def upsert(self, session: Session, create_and_retry: bool = True) -> Optional[Session]:
+        now = int(time.time())
+        if session.created_at is None:
+            pending = self.writer.pending(self.table_name, session.session_id)
+            session.created_at = pending.created_at if pending is not None and pending.created_at else now
+        session.updated_at = now
+        self.writer.add(self, session)
+        return session
+
+    def read(self, session_id: str, user_id: Optional[str] = None) -> Optional[Session]:
+        session = self.writer.pending(self.table_name, session_id)
+        if session is not None and (user_id is None or session.user_id == user_id):
+            return session
+        return super().read(session_id, user_id)
+
+    def get_all_session_ids(self, user_id: Optional[str] = None, entity_id: Optional[str] = None):
+        self.writer.flush()
+        return super().get_all_session_ids(user_id, entity_id)
+
+    def get_all_sessions(self, user_id: Optional[str] = None, entity_id: Optional[str] = None):
+        self.writer.flush()
+        return super().get_all_sessions(user_id, entity_id)
+
+    def get_recent_sessions(self, *args, **kwargs):
+        self.writer.flush()
+        return super().get_recent_sessions(*args, **kwargs)
+
+    def delete_session(self, session_id: Optional[str] = None):
+        self.writer.discard(self.table_name, session_id)
+        return super().delete_session(session_id)
+
+    def drop(self) -> None:
+        self.writer.discard(self.table_name)
+        super().drop()
+
+
+_engine: Optional[Engine] = None
+_writer: Optional[SessionWriter] = None
+_shared_lock = threading.Lock()
+
+
+def storage_engine() -> Engine:
+    """The process-wide engine every agent's storage and memory DB is bound to."""
+    global _engine
+    with _shared_lock:
+        if _engine is None:
+            _engine = create_storage_engine()
+        return _engine
+
+
+def session_writer() -> SessionWriter:
+    global _writer
+    engine = storage_engine()
+    with _shared_lock:
+        if _writer is None:
+            _writer = SessionWriter(engine)
+        return _writer
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _writer is not None:
+        _writer.flush()
+
+
+def agent_storage(table_name: str) -> SqliteStorage:
+    if config.STORAGE_FLUSH_INTERVAL < 0:
+        return SharedSqliteStorage(table_name, storage_engine())
+    return BatchedSqliteStorage(table_name, storage_engine(), session_writer())
+
+
+def import_legacy_memories(memory_db: SqliteMemoryDb, legacy_file: Path = config.LEGACY_MEMORY_DB_FILE) -> int:
+    """Copy ``memory_db``'s table out of the old per-agent memory file, once; returns the rows copied.
+
+    Rows whose ID is already in the table are kept as they are. The copy is
+    recorded in a ``legacy_memory_imports`` table, so it isn't repeated.
+    """
+    from sqlalchemy import select, text
+
+    legacy_file = Path(legacy_file)
+    if not legacy_file.exists():
+        return 0
+    engine, table_name = memory_db.db_engine, memory_db.table_name
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS legacy_memory_imports "
+                          "(table_name TEXT PRIMARY KEY, rows INTEGER, imported_at REAL)"))
+        if conn.execute(text("SELECT 1 FROM legacy_memory_imports WHERE table_name = :t"), {"t": table_name}).first():
+            return 0
+    legacy = create_engine(f"sqlite:///file:{legacy_file.resolve()}?mode=ro&uri=true")
+    try:
+        rows = []
+        if inspect(legacy).has_table(table_name):
+            with legacy.connect() as conn:
+                rows = [dict(row._mapping) for row in conn.execute(select(memory_db.table))]
+    finally:
+        legacy.dispose()
+    if rows and not memory_db.table_exists():
+        memory_db.create()
+    with engine.begin() as conn:
+        if rows:
+            conn.execute(memory_db.table.insert().prefix_with("OR IGNORE"), rows)
+        conn.execute(text("INSERT OR IGNORE INTO legacy_memory_imports VALUES (:t, :n, :at)"),
+                     {"t": table_name, "n": len(rows), "at": time.time()})
+    if rows:
+        logger.warning(f"Copied {len(rows)} memories of {table_name} from {legacy_file} into {engine.url.database}")
+    return len(rows)
+
+
+def agent_memory_db(table_name: str) -> SqliteMemoryDb:
+    memory_db = SharedSqliteMemoryDb(table_name, storage_engine())
+    try:
+        import_legacy_memories(memory_db)
+    except Exception as e:
+        logger.warning(f"Could not copy the memories of {table_name} from {config.LEGACY_MEMORY_DB_FILE}: {e}")
+    return memory_db
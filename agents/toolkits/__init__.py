@@ -0,0 +1 @@
+"""Toolkits the agents share on top of agno's."""
@@ -0,0 +1,514 @@
+"""Crawl a site once, analyze it many times.
+
+``CrawlStore`` keeps every fetched page on disk: bodies are content-addressed
+zstd blobs (zlib when ``zstandard`` isn't installed) and a SQLite index holds
+each URL's status, ETag, Last-Modified, content hash and an SEO summary parsed
+at fetch time. Re-crawling a site skips pages checked within
+``CRAWL_MAX_AGE`` seconds and revalidates the rest with conditional requests,
+so an unchanged site costs a round of 304s. ``CrawlTools`` gives the agent one
+crawl and several reports that read the index, not the pages.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from agno.tools import Toolkit
+
+from agents import config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "BrainSparkSEO/1.0 (+https://github.com/z4hid)"
+_SKIPPED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".pdf", ".zip", ".mp4", ".mp3",
+                       ".css", ".js", ".woff", ".woff2")
+
+
+def normalize_url(url: str) -> str:
+    url, _ = urldefrag(url.strip())
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    path = parts.path or "/"
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}" + (f"?{parts.query}" if parts.query else "")
+
+
+def site_of(url: str) -> str:
+    host = urlsplit(normalize_url(url)).netloc
+    return host[4:] if host.startswith("www.") else host
+
+
+class PageParser(HTMLParser):
+    """The on-page SEO elements of an HTML page, and its visible text."""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ""
+        self.meta: Dict[str, str] = {}
+        self.canonical = ""
+        self.lang = ""
+        self.headings: List[Tuple[int, str]] = []
+        self.links: List[str] = []
+        self.images = 0
+        self.images_without_alt = 0
+        self.text: List[str] = []
+        self._open: List[str] = []
+        self._heading: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        if tag == "html":
+            self.lang = attrs.get("lang", "")
+        elif tag == "meta" and (attrs.get("name") or attrs.get("property")):
+            self.meta[(attrs.get("name") or attrs.get("property")).lower()] = attrs.get("content", "")
+        elif tag == "link" and "canonical" in attrs.get("rel", "").lower().split():
+            self.canonical = urljoin(self.base_url, attrs.get("href", ""))
+        elif tag == "a" and attrs.get("href") and not attrs["href"].startswith(("mailto:", "tel:", "javascript:")):
+            self.links.append(normalize_url(urljoin(self.base_url, attrs["href"])))
+        elif tag == "img":
+            self.images += 1
+            self.images_without_alt += not attrs.get("alt", "").strip()
+        elif tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._heading = []
+        if tag not in ("meta", "link", "img", "br", "hr", "input"):
+            self._open.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6") and self._heading is not None:
+            self.headings.append((int(tag[1]), " ".join("".join(self._heading).split())))
+            self._heading = None
+        if tag in self._open:
+            while self._open and self._open.pop() != tag:
+                pass
+
+    def handle_data(self, data):
+        if "script" in self._open or "style" in self._open:
+            return
+        if self._open and self._open[-1] == "title":
+            self.title += data
+            return
+        if self._heading is not None:
+            self._heading.append(data)
+        if data.strip():
+            self.text.append(data.strip())
+
+    def summary(self) -> dict:
+        site = site_of(self.base_url)
+        internal = sorted({link for link in self.links if site_of(link) == site})
+        return {
+            "title": " ".join(self.title.split()),
+            "description": self.meta.get("description", ""),
+            "robots": self.meta.get("robots", ""),
+            "viewport": self.meta.get("viewport", ""),
+            "canonical": self.canonical,
+            "lang": self.lang,
+            "headings": self.headings,
+            "internal_links": internal,
+            "external_links": len({link for link in self.links if site_of(link) != site}),
+            "images": self.images,
+            "images_without_alt": self.images_without_alt,
+            "words": sum(len(chunk.split()) for chunk in self.text),
+        }
+
+
+def parse_page(body: bytes, url: str) -> PageParser:
+    parser = PageParser(url)
+    parser.feed(body.decode("utf-8", errors="replace"))
+    parser.close()
+    return parser
+
+
+@dataclass
+class Page:
+    url: str
+    site: str
+    status: int
+    final_url: str
+    content_type: str
+    etag: str
+    last_modified: str
+    content_hash: str
+    size: int
+    elapsed: float
+    fetched: float
+    checked: float
+    summary: dict = field(default_factory=dict)
+
+
+_COLUMNS = ("url", "site", "status", "final_url", "content_type", "etag", "last_modified", "content_hash", "size",
+            "elapsed", "fetched", "checked", "summary")
+
+
+class CrawlStore:
+    """SQLite index of crawled pages plus a content-addressed, compressed archive of their bodies."""
+
+    def __init__(self, root: Path = config.CRAWL_DIR):
+        self.root = Path(root)
+        self.blob_dir = self.root.joinpath("blobs")
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root.joinpath("index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, site TEXT NOT NULL, status INTEGER NOT NULL, "
+            "final_url TEXT NOT NULL, content_type TEXT NOT NULL, etag TEXT NOT NULL, last_modified TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, size INTEGER NOT NULL, elapsed REAL NOT NULL, fetched REAL NOT NULL, "
+            "checked REAL NOT NULL, summary TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_site ON pages (site)")
+
+    def _blob_path(self, content_hash: str) -> Path:
+        suffix = ".zst" if zstandard is not None else ".zz"
+        return self.blob_dir.joinpath(content_hash[:2], content_hash + suffix)
+
+    def write_body(self, content_hash: str, body: bytes) -> None:
+        path = self._blob_path(content_hash)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        data = zstandard.ZstdCompressor(level=10).compress(body) if zstandard is not None else zlib.compress(body, 6)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def read_body(self, content_hash: str) -> Optional[bytes]:
+        for path in (self.blob_dir.joinpath(content_hash[:2], content_hash + ".zst"),
+                     self.blob_dir.joinpath(content_hash[:2], content_hash + ".zz")):
+            if not path.exists():
+                continue
+            if path.suffix == ".zz":
+                return zlib.decompress(path.read_bytes())
+            if zstandard is None:
+                raise RuntimeError(f"{path} is zstd-compressed; install `zstandard` to read it")
+            return zstandard.ZstdDecompressor().decompress(path.read_bytes())
+        return None
+
+    def get(self, url: str) -> Optional[Page]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM pages WHERE url = ?", (url,)).fetchone()
+        return self._page(row) if row else None
+
+    def put(self, page: Page) -> None:
+        values = [getattr(page, column) for column in _COLUMNS[:-1]] + [json.dumps(page.summary)]
+        with self._lock:
+            self._conn.execute(f"INSERT OR REPLACE INTO pages ({', '.join(_COLUMNS)}) "
+                               f"VALUES ({', '.join('?' * len(_COLUMNS))})", values)
+            self._conn.commit()
+
+    def touch(self, url: str, checked: float, etag: str, last_modified: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE pages SET checked = ?, etag = ?, last_modified = ? WHERE url = ?",
+                               (checked, etag, last_modified, url))
+            self._conn.commit()
+
+    def pages(self, site: str, urls: Optional[Collection[str]] = None) -> Iterator[Page]:
+        """Index rows of a site, or only of ``urls``, read one at a time."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM pages WHERE site = ? ORDER BY url",
+                                      (site,)).fetchall()
+        for row in rows:
+            if urls is None or row[0] in urls:
+                yield self._page(row)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pages, raw = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        blobs = [p.stat().st_size for p in self.blob_dir.glob("*/*") if not p.name.endswith(".tmp")]
+        return {"pages": pages, "raw_bytes": raw, "blobs": len(blobs), "archive_bytes": sum(blobs)}
+
+    @staticmethod
+    def _page(row) -> Page:
+        return Page(*row[:-1], summary=json.loads(row[-1]))
+
+
+@dataclass
+class CrawlResult:
+    site: str
+    outcomes: Counter = field(default_factory=Counter)
+    pages: List[str] = field(default_factory=list)
+    # robots.txt and sitemap.xml as fetched by this crawl
+    files: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+    max_pages: int = 0
+    finished: float = 0.0
+
+    @property
+    def urls(self) -> set:
+        return set(self.pages) | set(self.files)
+
+
+class SiteCrawler:
+    """Same-site breadth-first crawler that revalidates pages it already has instead of refetching them."""
+
+    def __init__(self, store: Optional[CrawlStore] = None, max_age: float = config.CRAWL_MAX_AGE,
+                 concurrency: int = config.CRAWL_CONCURRENCY, timeout: float = config.CRAWL_TIMEOUT, client=None):
+        import httpx
+
+        self.store = store if store is not None else CrawlStore()
+        self.max_age = max_age
+        self.concurrency = concurrency
+        self.client = client or httpx.Client(follow_redirects=True, timeout=timeout,
+                                             headers={"User-Agent": USER_AGENT})
+        self.bytes_downloaded = 0
+
+    def fetch(self, url: str, max_age: Optional[float] = None) -> Tuple[Optional[Page], str]:
+        """Return the stored page and how it was obtained: fresh, not_modified, unchanged, changed or new."""
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        stored = self.store.get(url)
+        if stored and now - stored.checked < max_age:
+            return stored, "fresh"
+        headers = {}
+        if stored and stored.etag:
+            headers["If-None-Match"] = stored.etag
+        if stored and stored.last_modified:
+            headers["If-Modified-Since"] = stored.last_modified
+        start = time.perf_counter()
+        response = self.client.get(url, headers=headers)
+        elapsed = time.perf_counter() - start
+        etag, last_modified = response.headers.get("etag", ""), response.headers.get("last-modified", "")
+        if response.status_code == 304 and stored:
+            self.store.touch(url, now, etag or stored.etag, last_modified or stored.last_modified)
+            return stored, "not_modified"
+        body = response.content
+        self.bytes_downloaded += len(body)
+        content_hash = hashlib.sha256(body).hexdigest()
+        if stored and stored.content_hash == content_hash and stored.status == response.status_code:
+            self.store.touch(url, now, etag, last_modified)
+            return stored, "unchanged"
+        content_type = response.headers.get("content-type", "").split(";")[0].strip()
+        final_url = normalize_url(str(response.url))
+        summary = parse_page(body, final_url).summary() if content_type == "text/html" else {}
+        if final_url != url:
+            summary["redirects"] = len(response.history)
+        self.store.write_body(content_hash, body)
+        page = Page(url, site_of(url), response.status_code, final_url, content_type, etag, last_modified,
+                    content_hash, len(body), elapsed, now, now, summary)
+        self.store.put(page)
+        return page, "changed" if stored else "new"
+
+    def crawl(self, url: str, max_pages: int = config.CRAWL_MAX_PAGES, max_age: Optional[float] = None) -> CrawlResult:
+        start = time.perf_counter()
+        root = normalize_url(url)
+        origin = f"{urlsplit(root).scheme}://{urlsplit(root).netloc}"
+        result = CrawlResult(site_of(root), max_pages=max_pages)
+        robots = RobotFileParser()
+        # An unparsed RobotFileParser disallows everything; a missing robots.txt allows everything
+        robots.parse([])
+        frontier = deque([root])
+        seen = {root}
+
+        def follow(link: str) -> None:
+            """Queue ``link`` unless it was seen, isn't a page or robots.txt disallows it."""
+            if (link not in seen and not urlsplit(link).path.lower().endswith(_SKIPPED_EXTENSIONS)
+                    and robots.can_fetch(USER_AGENT, link)):
+                seen.add(link)
+                frontier.append(link)
+
+        # robots.txt and sitemap.xml are pages of the site too; the technical report reads them from the store.
+        # robots.txt goes first, so the sitemap's URLs are checked against it.
+        for path in ("/robots.txt", "/sitemap.xml"):
+            try:
+                page, outcome = self.fetch(origin + path, max_age)
+            except Exception as e:
+                result.errors[origin + path] = f"{type(e).__name__}: {e}"
+                continue
+            result.outcomes[outcome] += 1
+            result.files.append(origin + path)
+            body = self.store.read_body(page.content_hash) if page.status == 200 else None
+            if body and path == "/robots.txt":
+                robots.parse(body.decode("utf-8", errors="replace").splitlines())
+            elif body:
+                for loc in sitemap_urls(body):
+                    if site_of(loc) == result.site:
+                        follow(normalize_url(loc))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawl") as executor:
+            while frontier and len(result.pages) < max_pages:
+                batch = []
+                while frontier and len(batch) < max_pages - len(result.pages):
+                    batch.append(frontier.popleft())
+                futures = {u: executor.submit(self.fetch, u, max_age) for u in batch}
+                for page_url, future in futures.items():
+                    try:
+                        page, outcome = future.result()
+                    except Exception as e:
+                        result.errors[page_url] = f"{type(e).__name__}: {e}"
+                        logger.warning(f"Failed to crawl {page_url}: {result.errors[page_url]}")
+                        continue
+                    result.outcomes[outcome] += 1
+                    result.pages.append(page_url)
+                    for link in page.summary.get("internal_links", []):
+                        follow(link)
+        result.seconds = time.perf_counter() - start
+        result.finished = time.time()
+        return result
+
+
+def sitemap_urls(body: bytes) -> List[str]:
+    import xml.etree.ElementTree as ET
+
+    try:
+        tree = ET.fromstring(body)
+    except ET.ParseError:
+        return []
+    return [el.text.strip() for el in tree.iter() if el.tag.endswith("loc") and el.text]
+
+
+def _examples(urls: List[str], limit: int = 5) -> str:
+    shown = ", ".join(urls[:limit])
+    return shown + (f" (+{len(urls) - limit} more)" if len(urls) > limit else "")
+
+
+def technical_report(store: CrawlStore, site: str, urls: Optional[Collection[str]] = None) -> str:
+    """Report on the stored pages of ``site``, or only on ``urls``, e.g. those of the latest crawl."""
+    pages = list(store.pages(site, urls))
+    by_path = {urlsplit(p.url).path: p for p in pages}
+    html = [p for p in pages if p.content_type == "text/html"]
+    statuses = {p.url: p.status for p in pages}
+    robots, sitemap = by_path.get("/robots.txt"), by_path.get("/sitemap.xml")
+    lines = [f"# Technical SEO: {site}", f"Pages crawled: {len(html)}",
+             f"robots.txt: {'found' if robots and robots.status == 200 else 'missing'}",
+             f"sitemap.xml: {'found' if sitemap and sitemap.status == 200 else 'missing'}",
+             "Status codes: " + ", ".join(f"{code}: {n}" for code, n in sorted(Counter(p.status for p in html).items()))]
+    broken = sorted({f"{link} (from {p.url})" for p in html for link in p.summary.get("internal_links", [])
+                     if statuses.get(link, 200) >= 400})
+    checks = [
+        ("Error pages", [p.url for p in html if p.status >= 400]),
+        ("Broken internal links", broken),
+        ("Redirected URLs", [f"{p.url} -> {p.final_url}" for p in html if p.summary.get("redirects")]),
+        ("No mobile viewport meta tag", [p.url for p in html if p.status == 200 and not p.summary.get("viewport")]),
+        ("noindex pages", [p.url for p in html if "noindex" in p.summary.get("robots", "").lower()]),
+        ("No canonical link", [p.url for p in html if p.status == 200 and not p.summary.get("canonical")]),
+        ("No lang attribute", [p.url for p in html if p.status == 200 and not p.summary.get("lang")]),
+        ("Slow responses (>1s)", [f"{p.url} ({p.elapsed:.1f}s)" for p in html if p.elapsed > 1.0]),
+        ("Heavy HTML (>500 KB)", [f"{p.url} ({p.size // 1024} KB)" for p in html if p.size > 500 * 1024]),
+    ]
+    if html:
+        lines.append(f"Median response time: {sorted(p.elapsed for p in html)[len(html) // 2]:.2f}s")
+    lines += [f"- {name}: {len(urls)}" + (f" — {_examples(urls)}" if urls else "") for name, urls in checks]
+    return "\n".join(lines)
+
+
+def on_page_report(store: CrawlStore, site: str, urls: Optional[Collection[str]] = None) -> str:
+    html = [p for p in store.pages(site, urls) if p.content_type == "text/html" and p.status == 200]
+    titles = Counter(p.summary.get("title", "") for p in html)
+    descriptions = Counter(p.summary.get("description", "") for p in html)
+
+    def skips_levels(headings) -> bool:
+        levels = [level for level, _ in headings]
+        return any(b > a + 1 for a, b in zip([0] + levels, levels))
+
+    checks = [
+        ("Missing title", [p.url for p in html if not p.summary.get("title")]),
+        ("Duplicate titles", [p.url for p in html if p.summary.get("title") and titles[p.summary["title"]] > 1]),
+        ("Title outside 30-60 characters", [f"{p.url} ({len(p.summary['title'])})" for p in html
+                                            if p.summary.get("title") and not 30 <= len(p.summary["title"]) <= 60]),
+        ("Missing meta description", [p.url for p in html if not p.summary.get("description")]),
+        ("Duplicate meta descriptions", [p.url for p in html if p.summary.get("description")
+                                         and descriptions[p.summary["description"]] > 1]),
+        ("Meta description outside 70-160 characters", [
+            f"{p.url} ({len(p.summary['description'])})" for p in html
+            if p.summary.get("description") and not 70 <= len(p.summary["description"]) <= 160]),
+        ("Not exactly one H1", [f"{p.url} ({sum(1 for level, _ in p.summary.get('headings', []) if level == 1)})"
+                                for p in html if sum(1 for level, _ in p.summary.get("headings", []) if level == 1) != 1]),
+        ("Skipped heading levels", [p.url for p in html if skips_levels(p.summary.get("headings", []))]),
+        ("Thin content (<300 words)", [f"{p.url} ({p.summary.get('words', 0)})" for p in html
+                                       if p.summary.get("words", 0) < 300]),
+        ("Images without alt text", [f"{p.url} ({p.summary['images_without_alt']}/{p.summary['images']})"
+                                     for p in html if p.summary.get("images_without_alt")]),
+        ("URLs with uppercase, underscores, parameters or >100 characters", [
+            p.url for p in html if any(c.isupper() or c == "_" for c in urlsplit(p.url).path)
+            or urlsplit(p.url).query or len(p.url) > 100]),
+    ]
+    lines = [f"# On-page SEO: {site}", f"Pages analyzed: {len(html)}"]
+    if html:
+        lines.append(f"Average internal links per page: {sum(len(p.summary.get('internal_links', [])) for p in html) / len(html):.1f}, "
+                     f"external: {sum(p.summary.get('external_links', 0) for p in html) / len(html):.1f}")
+    lines += [f"- {name}: {len(urls)}" + (f" — {_examples(urls)}" if urls else "") for name, urls in checks]
+    return "\n".join(lines)
+
+
+class CrawlTools(Toolkit):
+    def __init__(self, crawler: Optional[SiteCrawler] = None, max_pages: int = config.CRAWL_MAX_PAGES, **kwargs):
+        self.crawler = crawler or SiteCrawler()
+        self.max_pages = max_pages
+        self._crawled: Dict[str, CrawlResult] = {}
+        super().__init__(name="crawl_tools", tools=[self.crawl_website, self.technical_seo_report,
+                                                    self.on_page_seo_report, self.get_page_text], **kwargs)
+
+    def _ensure_crawled(self, url: str, max_pages: Optional[int] = None) -> CrawlResult:
+        """The site's last crawl, unless it is ``max_age`` old or stopped short of ``max_pages``."""
+        site = site_of(url)
+        last = self._crawled.get(site)
+        if (last is None or time.time() - last.finished >= self.crawler.max_age
+                or (max_pages and last.max_pages < max_pages and len(last.pages) >= last.max_pages)):
+            self._crawled[site] = last = self.crawler.crawl(url, max_pages or self.max_pages)
+        return last
+
+    def crawl_website(self, url: str, max_pages: Optional[int] = None) -> str:
+        """Crawl a website once so its technical and on-page SEO can be analyzed.
+
+        Pages crawled recently are reused and the rest are re-fetched only if
+        they changed, so calling this again is cheap.
+
+        Args:
+            url (str): The website's home page.
+            max_pages (int): Maximum number of pages to crawl. Defaults to the toolkit's limit.
+
+        Returns:
+            str: JSON with the crawled pages and how many were new, changed or unchanged.
+        """
+        result = self._ensure_crawled(url, max_pages)
+        return json.dumps({"site": result.site, "pages": result.pages, "outcomes": dict(result.outcomes),
+                           "errors": result.errors}, indent=2)
+
+    def technical_seo_report(self, url: str) -> str:
+        """Technical SEO health of a crawled website: robots.txt, sitemap.xml, status codes, broken links,
+        redirects, mobile viewport, canonical tags and response times. Crawls the site first if needed.
+
+        Args:
+            url (str): Any URL of the website.
+        """
+        result = self._ensure_crawled(url)
+        return technical_report(self.crawler.store, result.site, result.urls)
+
+    def on_page_seo_report(self, url: str) -> str:
+        """On-page SEO of a crawled website: titles, meta descriptions, heading hierarchy, content length,
+        image alt text and URL structure. Crawls the site first if needed.
+
+        Args:
+            url (str): Any URL of the website.
+        """
+        result = self._ensure_crawled(url)
+        return on_page_report(self.crawler.store, result.site, result.urls)
+
+    def get_page_text(self, url: str, max_chars: int = 8000) -> str:
+        """Headings and visible text of one page, from the crawl archive when available.
+
+        Args:
+            url (str): The page URL.
+            max_chars (int): Maximum number of characters to return. Default is 8000.
+        """
+        page, _ = self.crawler.fetch(normalize_url(url))
+        body = self.crawler.store.read_body(page.content_hash) or b""
+        parser = parse_page(body, page.final_url)
+        headings = "\n".join(f"{'#' * level} {text}" for level, text in parser.headings)
+        return f"Title: {' '.join(parser.title.split())}\n{headings}\n\n{' '.join(parser.text)}"[:max_chars]
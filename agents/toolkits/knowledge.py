@@ -0,0 +1,61 @@
+"""One knowledge-base tool call for several questions.
+
+``KnowledgeSearchTools.search_knowledge_questions`` embeds all the questions in
+one batched call and searches them with one batched vector search
+(``agents.vectorstores.search_many``). Chunks found by more than one question
+come back once, and each question lists the chunks it found by number.
+"""
+import json
+from typing import List, Optional, Sequence
+
+from agno.document.base import Document
+from agno.tools import Toolkit
+
+from agents.ingestion import chunk_id
+
+
+def group_references(questions: Sequence[str], results: Sequence[List[Document]]) -> dict:
+    """Number each distinct chunk once, in the order the questions found them."""
+    chunks, numbers, groups = [], {}, []
+    for question, documents in zip(questions, results):
+        references = []
+        for document in documents:
+            key = chunk_id(document.content)
+            if key not in numbers:
+                numbers[key] = len(chunks) + 1
+                chunks.append({"ref": numbers[key], "name": document.name, "content": document.content,
+                               "meta_data": document.meta_data})
+            if numbers[key] not in references:
+                references.append(numbers[key])
+        groups.append({"question": question, "references": references})
+    return {"questions": groups, "chunks": chunks}
+
+
+class KnowledgeSearchTools(Toolkit):
+    def __init__(self, knowledge, num_documents: Optional[int] = None, max_questions: int = 10, **kwargs):
+        self.knowledge = knowledge
+        self.num_documents = num_documents or getattr(knowledge, "num_documents", None) or 5
+        self.max_questions = max_questions
+        super().__init__(name="knowledge_search", tools=[self.search_knowledge_questions], **kwargs)
+
+    def search(self, questions: Sequence[str], num_documents: Optional[int] = None) -> dict:
+        from agents.vectorstores import search_many
+
+        questions = list(dict.fromkeys(q.strip() for q in questions if q and q.strip()))[:self.max_questions]
+        results = search_many(self.knowledge.vector_db, questions, num_documents or self.num_documents)
+        return group_references(questions, results)
+
+    def search_knowledge_questions(self, questions: List[str], num_documents: Optional[int] = None) -> str:
+        """Ask the knowledge base several questions at once.
+
+        Use this instead of searching the knowledge base one question at a
+        time. Chunks relevant to more than one question are returned once.
+
+        Args:
+            questions (List[str]): The questions to search the knowledge base for.
+            num_documents (int): Maximum number of chunks per question. Defaults to the knowledge base's setting.
+
+        Returns:
+            str: JSON with each question's chunk ``references`` and the ``chunks`` they refer to.
+        """
+        return json.dumps(self.search(questions, num_documents), indent=2)
@@ -0,0 +1,246 @@
+"""One web search tool that fans out to every configured search engine.
+
+``MetaSearchTools.meta_search`` queries all providers concurrently, each with
+its own timeout, and merges their rankings by URL with reciprocal rank fusion.
+Provider results are cached on disk by (provider, normalized query) for
+``SEARCH_CACHE_TTL`` seconds, so repeated keyword research doesn't re-hit every
+engine; a provider that times out still fills the cache when it returns.
+Errors and empty results are not cached.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from agno.tools import Toolkit
+
+from agents import config
+from agents.bm25 import reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref"}
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def canonical_url(url: str) -> str:
+    """Scheme, ``www.``, fragments, tracking parameters and trailing slashes don't make a different page."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query)
+                             if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS))
+    path = parts.path.rstrip("/") or ""
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+@dataclass
+class SearchProvider:
+    """A search engine: ``search(query, max_results)`` returns dicts with ``url``, ``title`` and ``snippet``."""
+
+    name: str
+    search: Callable[[str, int], List[dict]]
+    timeout: float = config.SEARCH_TIMEOUT
+
+
+def parse_results(text: str) -> List[dict]:
+    """Normalize the JSON the agno search toolkits return into ``url``/``title``/``snippet`` dicts.
+
+    The toolkits report failures as plain-text or ``{"error": ...}`` replies;
+    those raise ``ValueError`` so they count as a failed provider.
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        raise ValueError(f"unparseable reply: {str(text)[:200]!r}") from None
+    if isinstance(data, dict):
+        if data.get("error"):
+            raise ValueError(f"provider error: {str(data['error'])[:200]}")
+        data = data.get("results", [data])
+    results = []
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        url = item.get("url") or item.get("href") or item.get("link")
+        if not url and item.get("name") and item.get("content"):
+            # WikipediaTools returns a Document for the page titled like the query
+            url = f"https://en.wikipedia.org/wiki/{item['name'].replace(' ', '_')}"
+        if not url:
+            continue
+        snippet = item.get("description") or item.get("body") or item.get("content") or item.get("text") or ""
+        results.append({"url": url, "title": item.get("title") or item.get("name") or "", "snippet": snippet[:500]})
+    return results
+
+
+def default_providers() -> List[SearchProvider]:
+    """The search engines the agents were given individually, as meta search providers."""
+    from agno.tools.duckduckgo import DuckDuckGoTools
+    from agno.tools.exa import ExaTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.tavily import TavilyTools
+    from agno.tools.wikipedia import WikipediaTools
+
+    google = GoogleSearchTools(fixed_max_results=15)
+    duckduckgo = DuckDuckGoTools(fixed_max_results=10)
+    tavily = TavilyTools(format="json")
+    wikipedia = WikipediaTools()
+    exa = ExaTools()
+    return [
+        SearchProvider("google", lambda q, n: parse_results(google.google_search(q, n))),
+        SearchProvider("duckduckgo", lambda q, n: parse_results(duckduckgo.duckduckgo_search(q, n))),
+        SearchProvider("tavily", lambda q, n: parse_results(tavily.web_search_using_tavily(q, n))),
+        SearchProvider("exa", lambda q, n: parse_results(exa.search_exa(q, n))),
+        SearchProvider("wikipedia", lambda q, n: parse_results(wikipedia.search_wikipedia(q))),
+    ]
+
+
+class SearchCache:
+    """SQLite map of ``(provider, normalized query, max results)`` to that provider's results."""
+
+    def __init__(self, db_file: Path = config.SEARCH_CACHE_FILE, ttl: float = config.SEARCH_CACHE_TTL):
+        self.db_file = Path(db_file)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results (provider TEXT NOT NULL, query TEXT NOT NULL, "
+            "max_results INTEGER NOT NULL, created REAL NOT NULL, results TEXT NOT NULL, "
+            "PRIMARY KEY (provider, query, max_results))"
+        )
+
+    def get(self, provider: str, query: str, max_results: int) -> Optional[List[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM search_results WHERE provider = ? AND query = ? AND max_results = ? "
+                "AND created > ?",
+                (provider, normalize_query(query), max_results, time.time() - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, provider: str, query: str, max_results: int, results: List[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (provider, query, max_results, created, results) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (provider, normalize_query(query), max_results, time.time(), json.dumps(results)),
+            )
+            self._conn.commit()
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_shared: Optional[SearchCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_search_cache() -> SearchCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SearchCache()
+        return _shared
+
+
+def merge_results(rankings: Dict[str, List[dict]], limit: int, rrf_k: int = 60) -> List[dict]:
+    """Deduplicate by canonical URL and order by reciprocal rank fusion of the providers' rankings."""
+    merged: Dict[str, dict] = {}
+    ranked_ids = []
+    for provider, results in rankings.items():
+        ids = []
+        for result in results:
+            key = canonical_url(result["url"])
+            if key in ids:
+                continue
+            ids.append(key)
+            entry = merged.setdefault(key, {"url": result["url"], "title": result.get("title", ""),
+                                            "snippet": result.get("snippet", ""), "providers": []})
+            entry["providers"].append(provider)
+            if len(result.get("snippet", "")) > len(entry["snippet"]):
+                entry["snippet"] = result["snippet"]
+            entry["title"] = entry["title"] or result.get("title", "")
+        ranked_ids.append(ids)
+    return [merged[key] for key, _ in reciprocal_rank_fusion(ranked_ids, k=rrf_k)[:limit]]
+
+
+class MetaSearchTools(Toolkit):
+    def __init__(self, providers: Optional[Sequence[SearchProvider]] = None, cache: Optional[SearchCache] = None,
+                 max_results: int = 10, per_provider_results: int = 10, **kwargs):
+        self.providers = list(providers) if providers is not None else default_providers()
+        self.cache = cache if cache is not None else shared_search_cache()
+        self.max_results = max_results
+        self.per_provider_results = per_provider_results
+        self.errors: Dict[str, int] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.providers)),
+                                            thread_name_prefix="meta-search")
+        super().__init__(name="meta_search", tools=[self.meta_search], **kwargs)
+
+    def _search(self, provider: SearchProvider, query: str, count: int) -> List[dict]:
+        results = provider.search(query, count)
+        # An empty reply is as likely a transient provider hiccup as a real "no results"; don't keep it for a day
+        if results:
+            self.cache.put(provider.name, query, count, results)
+        return results
+
+    def search_all(self, query: str, max_results: Optional[int] = None) -> dict:
+        count = self.per_provider_results
+        rankings: Dict[str, List[dict]] = {}
+        failed: Dict[str, str] = {}
+        pending = {}
+        for provider in self.providers:
+            cached = self.cache.get(provider.name, query, count)
+            if cached is not None:
+                rankings[provider.name] = cached
+            else:
+                pending[provider.name] = (provider, self._executor.submit(self._search, provider, query, count),
+                                          time.monotonic() + provider.timeout)
+        for name, (provider, future, deadline) in pending.items():
+            try:
+                rankings[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                failed[name] = f"timed out after {provider.timeout:g}s"
+            except Exception as e:
+                failed[name] = f"{type(e).__name__}: {e}"
+            if name in failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                logger.warning(f"Search provider {name} failed for {query!r}: {failed[name]}")
+        # Keep the configured provider order so fusion ties break the same way on every run
+        rankings = {p.name: rankings[p.name] for p in self.providers if p.name in rankings}
+        return {"query": query, "results": merge_results(rankings, max_results or self.max_results),
+                "providers": list(rankings), "failed": failed}
+
+    def meta_search(self, query: str, max_results: int = 10) -> str:
+        """Search every configured web search engine at once and get their merged results.
+
+        Use this instead of querying search engines one at a time. Results are
+        deduplicated by URL, ranked by agreement between engines, and list the
+        engines that returned each page.
+
+        Args:
+            query (str): The search query.
+            max_results (int): Maximum number of merged results to return. Default is 10.
+
+        Returns:
+            str: JSON with the merged ``results`` and any ``failed`` providers.
+        """
+        return json.dumps(self.search_all(query, max_results), indent=2)
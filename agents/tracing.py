@@ -0,0 +1,582 @@
+"""Spans around the hot paths of an agent run.
+
+With ``TRACING=on`` every agent run is a trace. Its spans cover the run
+itself, each model call (tokens, request and response bytes, cache hits),
+key-pool waits, tool calls, embedder calls, vector searches and the SQLite
+statements of session and memory storage. Spans nest through a context
+variable, so calls made from ``asyncio.to_thread`` keep their parent.
+
+A trace is exported on a background thread when its root span ends, to the
+formats in ``TRACE_EXPORT``:
+
+- ``jsonl``: one span per line in ``tmp/traces/spans.jsonl``;
+- ``otlp``: one OTLP/JSON ``ExportTraceServiceRequest`` per line in
+  ``tmp/traces/otlp.jsonl``, the OpenTelemetry collector's file format.
+
+With ``OTEL_EXPORTER_OTLP_ENDPOINT`` set, traces are also POSTed to its
+``/v1/traces``. ``python -m agents.tracing`` prints where the time of the
+last trace went.
+"""
+import argparse
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds; everything not listed is SPAN_KIND_INTERNAL
+_OTLP_KINDS = {"model": 3, "embedder": 3, "vector": 3}
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error",
+                 "_start", "_token")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._start = time.perf_counter_ns()
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+                "name": self.name, "kind": self.kind, "start_ns": self.start_ns, "end_ns": self.end_ns,
+                "duration_ms": round(self.duration_ms, 3), "attributes": self.attributes, "error": self.error}
+
+
+class _NoSpan:
+    """What ``span`` yields with tracing off."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def increment(self, name: str, value: float = 1) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_request(spans: List[Span], service_name: str = config.TRACE_SERVICE_NAME) -> Dict[str, Any]:
+    """``spans`` as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": _OTLP_KINDS.get(s.kind, 1),
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)}
+                               for k, v in {"span.kind": s.kind, **s.attributes}.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            } for s in spans],
+        }],
+    }]}
+
+
+class Tracer:
+    """Collects finished spans per trace and exports a trace once its root span ends."""
+
+    def __init__(self, directory: Path = config.TRACE_DIR, exports=config.TRACE_EXPORT,
+                 endpoint: Optional[str] = config.OTLP_ENDPOINT, max_pending: int = 10_000, max_queued: int = 1000):
+        self.directory = Path(directory)
+        self.exports = set(exports)
+        self.endpoint = endpoint
+        self.max_pending = max_pending
+        self.max_queued = max_queued
+        self.exported = 0
+        self.dropped = 0
+        self._traces: Dict[str, List[Span]] = defaultdict(list)
+        self._pending = 0
+        self._queued = 0
+        # File writes and the collector POST run here, off the thread that ended the root span
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def spans_file(self) -> Path:
+        return self.directory.joinpath("spans.jsonl")
+
+    @property
+    def otlp_file(self) -> Path:
+        return self.directory.joinpath("otlp.jsonl")
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self._traces[span.trace_id].append(span)
+            self._pending += 1
+            if span.parent_id is not None and self._pending < self.max_pending:
+                return
+            # A root span closes its trace; a runaway trace is exported in pieces rather than held forever
+            spans = self._traces.pop(span.trace_id)
+            self._pending -= len(spans)
+            if self._queued >= self.max_queued:
+                # A stalled collector shouldn't grow the backlog without bound
+                self.dropped += len(spans)
+                return
+            self._queued += 1
+        self._executor.submit(self._export, spans)
+
+    def flush(self) -> None:
+        """Block until every trace handed over so far has been exported."""
+        self._executor.submit(lambda: None).result()
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            with self._file_lock:
+                if "jsonl" in self.exports:
+                    with open(self.spans_file, "a") as f:
+                        f.writelines(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+                if "otlp" in self.exports:
+                    with open(self.otlp_file, "a") as f:
+                        f.write(json.dumps(otlp_request(spans), default=str) + "\n")
+            if self.endpoint:
+                import httpx
+
+                httpx.post(f"{self.endpoint.rstrip('/')}/v1/traces", json=otlp_request(spans), timeout=5)
+            self.exported += len(spans)
+        except Exception as e:
+            logger.warning(f"Could not export {len(spans)} spans: {e}")
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+
+_shared: Optional[Tracer] = None
+_shared_lock = threading.Lock()
+
+
+def tracer() -> Optional[Tracer]:
+    """The process-wide tracer, or None with TRACING off."""
+    global _shared
+    if not config.TRACING:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = Tracer()
+        return _shared
+
+
+def start_span(name: str, kind: str = "internal", **attributes):
+    """Open a span under the current one (a new trace if there is none) and make it current."""
+    if not config.TRACING:
+        return _NO_SPAN
+    parent = _current.get()
+    span = Span(name, kind, parent.trace_id if parent else os.urandom(16).hex(), parent.span_id if parent else None,
+                attributes)
+    span._token = _current.set(span)
+    return span
+
+
+def end_span(span, error: Optional[BaseException] = None) -> None:
+    if span is _NO_SPAN or span.end_ns:
+        return
+    span.end_ns = span.start_ns + time.perf_counter_ns() - span._start
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    detach(span)
+    traces = tracer()
+    if traces is not None:
+        traces.finish(span)
+
+
+def detach(span) -> None:
+    """Stop ``span`` being the current span without ending it."""
+    if span is _NO_SPAN or span._token is None:
+        return
+    try:
+        _current.reset(span._token)
+    except ValueError:
+        # Ended from another context (e.g. a generator garbage collected elsewhere)
+        pass
+    span._token = None
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """``with span("vector.search", "vector", limit=5) as s: ...; s.set(results=3)``"""
+    opened = start_span(name, kind, **attributes)
+    try:
+        yield opened
+    except GeneratorExit:
+        # A stream closed early by its consumer
+        end_span(opened)
+        raise
+    except BaseException as e:
+        end_span(opened, e)
+        raise
+    else:
+        end_span(opened)
+
+
+def iterate(opened, items: Iterator, on_item: Optional[Callable[[Any], None]] = None) -> Iterator:
+    """Stream ``items`` in ``opened``, which ends with the stream.
+
+    The span is current only while the next item is produced. The consumer
+    runs between items and must not find it current, or its own spans (and
+    later runs, if it abandons the stream) would nest under it.
+    """
+    if opened is _NO_SPAN:
+        return items
+    detach(opened)
+    return _iterate(opened, items, on_item)
+
+
+def _iterate(opened, items: Iterator, on_item) -> Iterator:
+    while True:
+        token = _current.set(opened)
+        try:
+            item = next(items)
+        except StopIteration:
+            end_span(opened)
+            return
+        except BaseException as e:
+            end_span(opened, e)
+            raise
+        finally:
+            _current.reset(token)
+        if on_item is not None:
+            on_item(item)
+        try:
+            yield item
+        except GeneratorExit:
+            # Closed early by its consumer
+            end_span(opened)
+            raise
+
+
+def aiterate(opened, items: AsyncIterator, on_item: Optional[Callable[[Any], None]] = None) -> AsyncIterator:
+    """``iterate`` for async streams."""
+    if opened is _NO_SPAN:
+        return items
+    detach(opened)
+    return _aiterate(opened, items, on_item)
+
+
+async def _aiterate(opened, items: AsyncIterator, on_item) -> AsyncIterator:
+    while True:
+        token = _current.set(opened)
+        try:
+            item = await items.__anext__()
+        except StopAsyncIteration:
+            end_span(opened)
+            return
+        except BaseException as e:
+            end_span(opened, e)
+            raise
+        finally:
+            _current.reset(token)
+        if on_item is not None:
+            on_item(item)
+        try:
+            yield item
+        except GeneratorExit:
+            end_span(opened)
+            raise
+
+
+def current_span():
+    return _current.get() if config.TRACING else None
+
+
+def annotate(**attributes) -> None:
+    """Set attributes on the current span, if any."""
+    current = current_span()
+    if current is not None:
+        current.set(**attributes)
+
+
+def increment(name: str, value: float = 1) -> None:
+    current = current_span()
+    if current is not None:
+        current.increment(name, value)
+
+
+def payload_bytes(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    dump = getattr(value, "model_dump_json", None)
+    if dump is not None:
+        return len(dump(exclude_none=True))
+    return len(json.dumps(value, default=str))
+
+
+# ---------- models ----------
+def _request_attributes(model, messages, tools) -> Dict[str, Any]:
+    return {"model": model.id, "messages": len(messages), "tools": len(tools or []),
+            "request_bytes": sum(payload_bytes(m.content) for m in messages)}
+
+
+def _record_usage(span, response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    span.set(input_tokens=usage.prompt_token_count or 0, output_tokens=usage.candidates_token_count or 0,
+             cached_tokens=usage.cached_content_token_count or 0)
+
+
+class _ChunkRecorder:
+    def __init__(self, opened):
+        self.span = opened
+        self.start = time.perf_counter()
+        self.chunks = 0
+
+    def __call__(self, chunk) -> None:
+        if not self.chunks:
+            self.span.set(ttft_ms=(time.perf_counter() - self.start) * 1000)
+        self.chunks += 1
+        _record_usage(self.span, chunk)
+        self.span.set(chunks=self.chunks)
+        self.span.increment("response_bytes", payload_bytes(chunk))
+
+
+class TracedModelMixin:
+    """Model mixin that puts every provider call, streamed or not, in a ``model.*`` span."""
+
+    def invoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        with span("model.invoke", "model", **_request_attributes(self, messages, tools)) as s:
+            response = super().invoke(messages, response_format=response_format, tools=tools,
+                                      tool_choice=tool_choice)
+            _record_usage(s, response)
+            s.set(response_bytes=payload_bytes(response))
+            return response
+
+    async def ainvoke(self, messages, response_format=None, tools=None, tool_choice=None):
+        with span("model.invoke", "model", **_request_attributes(self, messages, tools)) as s:
+            response = await super().ainvoke(messages, response_format=response_format, tools=tools,
+                                             tool_choice=tool_choice)
+            _record_usage(s, response)
+            s.set(response_bytes=payload_bytes(response))
+            return response
+
+    def invoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        opened = start_span("model.invoke_stream", "model", **_request_attributes(self, messages, tools))
+        chunks = super().invoke_stream(messages, response_format=response_format, tools=tools,
+                                       tool_choice=tool_choice)
+        return iterate(opened, chunks, _ChunkRecorder(opened))
+
+    def ainvoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        opened = start_span("model.invoke_stream", "model", **_request_attributes(self, messages, tools))
+        chunks = super().ainvoke_stream(messages, response_format=response_format, tools=tools,
+                                        tool_choice=tool_choice)
+        return aiterate(opened, chunks, _ChunkRecorder(opened))
+
+
+_traced: Dict[type, type] = {}
+
+
+def traced(model_cls: type) -> type:
+    """``model_cls`` with ``TracedModelMixin`` in front of it."""
+    with _shared_lock:
+        cls = _traced.get(model_cls)
+        if cls is None:
+            cls = type(f"Traced{model_cls.__name__}", (TracedModelMixin, model_cls), {})
+            _traced[model_cls] = cls
+        return cls
+
+
+# ---------- tools and runs ----------
+class ToolTracer:
+    """agno tool hook that puts each tool call in a ``tool.<name>`` span."""
+
+    def __call__(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        with span(f"tool.{function_name}", "tool", tool=function_name,
+                  arguments_bytes=payload_bytes(arguments)) as s:
+            result = function_call(**arguments)
+            if not (inspect.isgenerator(result) or inspect.isawaitable(result)):
+                s.set(result_bytes=payload_bytes(result))
+            return result
+
+
+# Memory calls agno runs on a thread pool, where the run's span isn't current
+_MEMORY_CALLS = ("create_user_memories", "create_session_summary")
+
+
+def _under(parent, fn):
+    """``fn`` with ``parent`` as the current span in whichever thread calls it."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def _run_attributes(agent, agent_id: str, args, kwargs) -> Dict[str, Any]:
+    message = kwargs.get("message", args[0] if args else None)
+    return {"agent": agent_id, "session_id": kwargs.get("session_id") or agent.session_id or "",
+            "input_bytes": payload_bytes(message) if isinstance(message, str) else 0}
+
+
+def instrument(agent, agent_id: str) -> None:
+    """Make each run of ``agent`` a trace, with its tool calls as spans.
+
+    ``print_response`` goes through ``run`` and ``arun``, so it is traced too.
+    Streamed runs are traced until their stream is exhausted. Memory and
+    summary updates are an ``agent.memory`` span of the run.
+    """
+    run, arun = agent.run, agent.arun
+
+    @functools.wraps(run)
+    def traced_run(*args, **kwargs):
+        opened = start_span("agent.run", "agent", **_run_attributes(agent, agent_id, args, kwargs))
+        try:
+            result = run(*args, **kwargs)
+        except BaseException as e:
+            end_span(opened, e)
+            raise
+        if inspect.isgenerator(result):
+            return iterate(opened, result)
+        end_span(opened)
+        return result
+
+    @functools.wraps(arun)
+    async def traced_arun(*args, **kwargs):
+        opened = start_span("agent.run", "agent", **_run_attributes(agent, agent_id, args, kwargs))
+        try:
+            result = await arun(*args, **kwargs)
+        except BaseException as e:
+            end_span(opened, e)
+            raise
+        if inspect.isasyncgen(result):
+            return aiterate(opened, result)
+        end_span(opened)
+        return result
+
+    make_memories, amake_memories = agent._make_memories_and_summaries, agent._amake_memories_and_summaries
+
+    @functools.wraps(make_memories)
+    def traced_memories(*args, **kwargs):
+        with span("agent.memory", "agent") as s:
+            memory = agent.memory
+            if s is _NO_SPAN or memory is None:
+                return make_memories(*args, **kwargs)
+            for name in _MEMORY_CALLS:
+                setattr(memory, name, _under(s, getattr(memory, name)))
+            try:
+                return make_memories(*args, **kwargs)
+            finally:
+                for name in _MEMORY_CALLS:
+                    delattr(memory, name)
+
+    @functools.wraps(amake_memories)
+    async def traced_amemories(*args, **kwargs):
+        with span("agent.memory", "agent"):
+            return await amake_memories(*args, **kwargs)
+
+    agent.run, agent.arun = traced_run, traced_arun
+    agent._make_memories_and_summaries, agent._amake_memories_and_summaries = traced_memories, traced_amemories
+    agent.tool_hooks = [ToolTracer()] + list(agent.tool_hooks or [])
+
+
+# ---------- report ----------
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def breakdown(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Calls, total and self time (total minus child spans) per span name, slowest first."""
+    children: Dict[str, float] = defaultdict(float)
+    for s in spans:
+        if s["parent_id"]:
+            children[s["parent_id"]] += s["duration_ms"]
+    rows: Dict[str, Dict[str, Any]] = {}
+    for s in spans:
+        row = rows.setdefault(s["name"], {"name": s["name"], "calls": 0, "total_ms": 0.0, "self_ms": 0.0,
+                                          "input_tokens": 0, "output_tokens": 0, "cached_tokens": 0})
+        row["calls"] += 1
+        row["total_ms"] += s["duration_ms"]
+        # Children running in parallel can add up to more than their parent
+        row["self_ms"] += max(0.0, s["duration_ms"] - children[s["span_id"]])
+        for name in ("input_tokens", "output_tokens", "cached_tokens"):
+            row[name] += s["attributes"].get(name, 0)
+    return sorted(rows.values(), key=lambda r: r["self_ms"], reverse=True)
+
+
+def print_breakdown(spans: List[Dict[str, Any]]) -> None:
+    roots = [s for s in spans if not s["parent_id"]]
+    wall = sum(s["duration_ms"] for s in roots)
+    print(f"trace {spans[0]['trace_id']}: {len(spans)} spans, {wall / 1000:.2f} s")
+    print(f"{'span':<32}{'calls':>7}{'total (ms)':>12}{'self (ms)':>11}{'self %':>8}{'tokens in/out/cached':>24}")
+    for row in breakdown(spans):
+        tokens = f"{row['input_tokens']}/{row['output_tokens']}/{row['cached_tokens']}" if row["input_tokens"] else ""
+        share = row["self_ms"] / wall if wall else 0.0
+        print(f"{row['name'][:31]:<32}{row['calls']:>7}{row['total_ms']:>12.1f}{row['self_ms']:>11.1f}"
+              f"{share:>8.1%}{tokens:>24}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Where the time of a recorded trace went.")
+    parser.add_argument("trace_id", nargs="?", help="defaults to the last agent run")
+    parser.add_argument("--file", type=Path, default=config.TRACE_DIR.joinpath("spans.jsonl"))
+    args = parser.parse_args()
+
+    spans = load_spans(args.file)
+    trace_id = args.trace_id
+    if trace_id is None:
+        runs = [s for s in spans if s["name"] == "agent.run"] or [s for s in spans if not s["parent_id"]]
+        if not runs:
+            parser.error(f"no spans in {args.file}")
+        trace_id = max(runs, key=lambda s: s["end_ns"])["trace_id"]
+    spans = [s for s in spans if s["trace_id"] == trace_id]
+    if not spans:
+        parser.error(f"no trace {trace_id} in {args.file}")
+    print_breakdown(spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Vector DB backends for the agents' knowledge collections.
+
+The backend is chosen with ``VECTOR_BACKEND``:
+
+- ``qdrant`` (default): the remote Qdrant at ``QDRANT_URL``
+- ``lancedb``: an embedded, on-disk LanceDB under ``tmp/lancedb``
+- ``flat``: an in-process, memory-mapped NumPy matrix under ``tmp/flat``,
+  searched by brute force; for collections of a few thousand chunks
+- ``compact``: int8 or PQ codes in memory, float32 vectors shared across
+  collections under ``tmp/compact`` (``COMPACT_QUANTIZATION``)
+
+With ``RETRIEVAL_MODE=hybrid`` (the default) the backend is wrapped in a
+``HybridVectorDb`` that adds a local BM25 index, and with ``QUERY_CACHE=on``
+(the default) in a ``CachedSearchVectorDb`` that caches search results.
+With ``TRACING=on`` the outermost wrapper is a ``TracedVectorDb``.
+
+``search_many`` answers several queries at once through any of them.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from agents import config
+
+
+def qdrant(collection: str, embedder):
+    from agno.vectordb.qdrant import Qdrant
+
+    return Qdrant(
+        collection=collection,
+        url=config.qdrant_url(),
+        api_key=config.qdrant_api_key(),
+        embedder=embedder,
+    )
+
+
+def lancedb(collection: str, embedder):
+    from agents.vectorstores.lance import LocalLanceDb
+
+    return LocalLanceDb(table_name=collection, uri=str(config.LANCEDB_URI), embedder=embedder)
+
+
+def flat(collection: str, embedder):
+    from agents.vectorstores.flat import FlatVectorDb
+
+    return FlatVectorDb(collection, embedder)
+
+
+def compact(collection: str, embedder):
+    from agents.vectorstores.compact import CompactVectorDb
+
+    return CompactVectorDb(collection, embedder)
+
+
+BACKENDS = {
+    "qdrant": qdrant,
+    "lancedb": lancedb,
+    "flat": flat,
+    "compact": compact,
+}
+
+
+def get_vector_db(collection: str, embedder, backend: str = None, retrieval_mode: str = None):
+    backend = backend or config.VECTOR_BACKEND
+    retrieval_mode = retrieval_mode or config.RETRIEVAL_MODE
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}'. Available: {', '.join(BACKENDS)}")
+    vector_db = BACKENDS[backend](collection, embedder)
+    if retrieval_mode == "hybrid":
+        from agents.vectorstores.hybrid import HybridVectorDb
+
+        vector_db = HybridVectorDb(vector_db, exact_match=config.HYBRID_EXACT_MATCH)
+    elif retrieval_mode != "dense":
+        raise ValueError(f"Unknown RETRIEVAL_MODE '{retrieval_mode}'. Use 'hybrid' or 'dense'")
+    if config.QUERY_CACHE:
+        from agents.vectorstores.query_cache import CachedSearchVectorDb
+
+        vector_db = CachedSearchVectorDb(vector_db)
+    if config.TRACING:
+        from agents.vectorstores.wrapper import TracedVectorDb
+
+        vector_db = TracedVectorDb(vector_db)
+    return vector_db
+
+
+def _qdrant_search_many(vector_db, queries: List[str], vectors: List[List[float]], limit: int,
+                        filters: Optional[Dict[str, Any]]):
+    from qdrant_client import models
+
+    query_filter = vector_db._format_filters(filters or {})
+    using = vector_db.dense_vector_name if getattr(vector_db, "use_named_vectors", False) else None
+    responses = vector_db.client.query_batch_points(
+        collection_name=vector_db.collection,
+        requests=[models.QueryRequest(query=vector, filter=query_filter, limit=limit, with_payload=True, using=using)
+                  for vector in vectors],
+    )
+    return [vector_db._build_search_results(response.points, query) for response, query in zip(responses, queries)]
+
+
+def search_many(vector_db, queries: Sequence[str], limit: int = 5, filters: Optional[Dict[str, Any]] = None):
+    """Search each of ``queries``, embedding them all in one batched call.
+
+    Backends opt in with ``search_many`` (the flat backend and every wrapper
+    here) or ``search_by_vectors``. Qdrant gets one ``query_batch_points``
+    request and the compact backend one ``search_by_vector`` per query.
+    Anything else searches query by query, its embeddings already in the
+    embedding cache.
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    if hasattr(vector_db, "search_many"):
+        return vector_db.search_many(queries, limit, filters)
+    from agents.embedding_cache import embed_many
+
+    vectors = embed_many(vector_db.embedder, queries)
+    if hasattr(vector_db, "search_by_vectors"):
+        return vector_db.search_by_vectors(vectors, limit, filters)
+    if hasattr(vector_db, "search_by_vector"):
+        return [vector_db.search_by_vector(vector, limit, filters) for vector in vectors]
+    if hasattr(vector_db, "client") and hasattr(vector_db, "collection") and vector_db.search_type == "vector":
+        return _qdrant_search_many(vector_db, queries, vectors, limit, filters)
+    return [vector_db.search(query, limit, filters) for query in queries]
@@ -0,0 +1,590 @@
+"""Compact local vector store: quantized codes per collection, full vectors shared.
+
+A collection holds only quantized codes in memory. With ``int8`` these are
+per-dimension scalar codes, a byte per dimension and 4x smaller than float32.
+With ``pq`` they are product-quantization codes of ``pq_subvectors`` bytes per
+vector (16x smaller at 192 for 768 dims). With ``matryoshka`` they are the
+leading ``coarse_dimensions`` of each vector in float32, for embeddings trained
+to front-load their ranking. A search scores every code, then re-ranks the
+best ``limit * rerank`` candidates by exact cosine against their full float32
+vectors, read from ``<collection>.vectors.npy``. That file is memory-mapped,
+so the page cache, not the process, holds it and a re-rank costs a few page
+reads rather than a SQLite query.
+
+The float32 vectors, and the chunks' payloads, live in one SQLite store under
+``tmp/compact/`` that every collection shares. A vector is keyed by its hash,
+so a chunk embedded into several collections (``seo.py`` writes lean_seo into
+three) is stored once. Codes are rebuilt from the store whenever the
+collection has changed, and are saved next to it as ``<collection>.<mode>.npz``
+along with the re-rank file.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from hashlib import sha1
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from agno.document.base import Document
+from agno.vectordb.base import VectorDb
+
+from agents import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    digest TEXT PRIMARY KEY,
+    vector BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS points (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    name TEXT,
+    content TEXT NOT NULL,
+    meta_data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE INDEX IF NOT EXISTS points_digest ON points (digest);
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+class VectorStore:
+    """Float32 vectors by hash, and each collection's points referring to them."""
+
+    def __init__(self, db_file: Path = config.COMPACT_DIR.joinpath("vectors.db")):
+        self.db_file = Path(db_file)
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def version(self, collection: str) -> Optional[int]:
+        """Bumped by every write to ``collection``; None until it is created."""
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM collections WHERE name = ?", (collection,)).fetchone()
+        return row[0] if row else None
+
+    def _bump(self, collection: str) -> None:
+        self._conn.execute("INSERT INTO collections (name, version) VALUES (?, 1) "
+                           "ON CONFLICT (name) DO UPDATE SET version = version + 1", (collection,))
+
+    def create(self, collection: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO collections (name, version) VALUES (?, 0)", (collection,))
+            self._conn.commit()
+
+    def put(self, collection: str, points: Sequence[Tuple[str, np.ndarray, Optional[str], str, dict]]) -> None:
+        """Upsert ``(id, vector, name, content, meta_data)`` points."""
+        vectors, rows = {}, []
+        for point_id, vector, name, content, meta_data in points:
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            digest = sha1(blob).hexdigest()
+            vectors[digest] = blob
+            rows.append((collection, point_id, digest, name, content, json.dumps(meta_data or {}, default=str)))
+        with self._lock:
+            replaced = self._digests(collection, [r[1] for r in rows])
+            self._conn.executemany("INSERT OR IGNORE INTO vectors (digest, vector) VALUES (?, ?)", vectors.items())
+            self._conn.executemany("INSERT OR REPLACE INTO points (collection, id, digest, name, content, meta_data) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._prune(replaced - vectors.keys())
+            self._bump(collection)
+            self._conn.commit()
+
+    def _digests(self, collection: str, ids: Sequence[str]) -> set:
+        digests = set()
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            digests.update(d for (d,) in self._conn.execute(
+                f"SELECT digest FROM points WHERE collection = ? AND id IN ({','.join('?' * len(batch))})",
+                (collection, *batch)))
+        return digests
+
+    def _prune(self, digests) -> None:
+        """Drop vectors that no point of any collection refers to any more."""
+        self._conn.executemany("DELETE FROM vectors WHERE digest = ? AND NOT EXISTS "
+                               "(SELECT 1 FROM points WHERE points.digest = vectors.digest)", [(d,) for d in digests])
+
+    def delete(self, collection: str, ids: Sequence[str]) -> None:
+        ids = list(ids)
+        with self._lock:
+            digests = self._digests(collection, ids)
+            self._conn.executemany("DELETE FROM points WHERE collection = ? AND id = ?", [(collection, i) for i in ids])
+            self._prune(digests)
+            self._bump(collection)
+            self._conn.commit()
+
+    def drop(self, collection: str) -> None:
+        with self._lock:
+            digests = {d for (d,) in self._conn.execute("SELECT digest FROM points WHERE collection = ?",
+                                                        (collection,))}
+            self._conn.execute("DELETE FROM points WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM collections WHERE name = ?", (collection,))
+            self._prune(digests)
+            self._conn.commit()
+
+    def points(self, collection: str, with_vectors: bool = True) -> Tuple[List[str], List[str], List[dict], np.ndarray]:
+        """``(ids, digests, meta_data, vectors)`` of every point in ``collection``."""
+        with self._lock:
+            if with_vectors:
+                rows = self._conn.execute(
+                    "SELECT p.id, p.digest, p.meta_data, v.vector FROM points p JOIN vectors v USING (digest) "
+                    "WHERE p.collection = ? ORDER BY p.rowid", (collection,)).fetchall()
+            else:
+                rows = [(*row, None) for row in self._conn.execute(
+                    "SELECT id, digest, meta_data FROM points WHERE collection = ? ORDER BY rowid", (collection,))]
+        ids = [r[0] for r in rows]
+        digests = [r[1] for r in rows]
+        metas = [json.loads(r[2]) for r in rows]
+        if not with_vectors or not rows:
+            return ids, digests, metas, np.empty((0, 0), dtype=np.float32)
+        return ids, digests, metas, np.frombuffer(b"".join(r[3] for r in rows), dtype=np.float32).reshape(len(rows), -1)
+
+    def vectors(self, digests: Sequence[str]) -> np.ndarray:
+        with self._lock:
+            found = dict(self._conn.execute(
+                f"SELECT digest, vector FROM vectors WHERE digest IN ({','.join('?' * len(digests))})", list(digests)))
+        return np.frombuffer(b"".join(found[d] for d in digests), dtype=np.float32).reshape(len(digests), -1)
+
+    def documents(self, collection: str, ids: Sequence[str]) -> Dict[str, Tuple[Optional[str], str, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, name, content, meta_data FROM points WHERE collection = ? "
+                f"AND id IN ({','.join('?' * len(ids))})", (collection, *ids)).fetchall()
+        return {r[0]: (r[1], r[2], json.loads(r[3])) for r in rows}
+
+    def has(self, collection: str, column: str, value: str) -> bool:
+        with self._lock:
+            return self._conn.execute(f"SELECT 1 FROM points WHERE collection = ? AND {column} = ? LIMIT 1",
+                                      (collection, value)).fetchone() is not None
+
+    def stats(self) -> Dict[str, int]:
+        """Points across collections, distinct vectors and their bytes."""
+        with self._lock:
+            points = self._conn.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+            vectors, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM vectors").fetchone()
+        return {"points": points, "vectors": vectors, "vector_bytes": size}
+
+
+_shared: Optional[VectorStore] = None
+_shared_lock = threading.Lock()
+
+
+def shared_store() -> VectorStore:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = VectorStore()
+        return _shared
+
+
+# ---------- quantizers ----------
+class ScalarQuantizer:
+    """Per-dimension int8 codes between the training data's min and max."""
+
+    kind = "int8"
+
+    def __init__(self, low: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.low = low
+        self.scale = scale
+
+    def train(self, x: np.ndarray) -> None:
+        self.low = x.min(axis=0)
+        self.scale = np.maximum(x.max(axis=0) - self.low, 1e-12) / 255
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint((x - self.low) / self.scale), 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scale + self.low
+
+    def scores(self, query: np.ndarray, codes: np.ndarray, block: int = 2048) -> np.ndarray:
+        # q . (c * scale + low) == c . (q * scale) + q . low, a block of codes at a time
+        weights, offset = (query * self.scale).astype(np.float32), float(query @ self.low)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block):
+            out[start:start + block] = codes[start:start + block].astype(np.float32) @ weights
+        return out + offset
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"low": self.low, "scale": self.scale}
+
+
+class ProductQuantizer:
+    """``subvectors`` k-means codebooks of up to 256 centroids, one byte per sub-vector."""
+
+    kind = "pq"
+
+    def __init__(self, subvectors: int = 192, centroids: Optional[np.ndarray] = None, iterations: int = 12,
+                 train_size: int = 20000):
+        self.subvectors = subvectors
+        self.centroids = centroids
+        self.iterations = iterations
+        self.train_size = train_size
+
+    def _split(self, x: np.ndarray) -> np.ndarray:
+        if x.shape[-1] % self.subvectors:
+            raise ValueError(f"{x.shape[-1]} dimensions don't split into {self.subvectors} sub-vectors")
+        return x.reshape(*x.shape[:-1], self.subvectors, x.shape[-1] // self.subvectors)
+
+    @staticmethod
+    def _nearest(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = (centroids * centroids).sum(axis=1) - 2 * x @ centroids.T
+        return distances.argmin(axis=1)
+
+    def train(self, x: np.ndarray) -> None:
+        rng = np.random.default_rng(0)
+        if len(x) > self.train_size:
+            x = x[rng.choice(len(x), self.train_size, replace=False)]
+        parts = self._split(x)
+        k = min(256, len(x))
+        self.centroids = np.empty((self.subvectors, k, parts.shape[-1]), dtype=np.float32)
+        for m in range(self.subvectors):
+            sub = parts[:, m]
+            centroids = sub[rng.choice(len(sub), k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignment = self._nearest(sub, centroids)
+                counts = np.bincount(assignment, minlength=k)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sub)
+                filled = counts > 0
+                centroids[filled] = sums[filled] / counts[filled, None]
+            self.centroids[m] = centroids
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        parts = self._split(x)
+        codes = np.empty((len(x), self.subvectors), dtype=np.uint8)
+        for m in range(self.subvectors):
+            codes[:, m] = self._nearest(parts[:, m], self.centroids[m])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = self.centroids[np.arange(self.subvectors), codes]
+        return parts.reshape(len(codes), -1)
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # Asymmetric distance: one lookup table of query . centroid per sub-vector
+        table = np.einsum("ms,mks->mk", self._split(query), self.centroids)
+        out = np.zeros(len(codes), dtype=np.float32)
+        for m in range(self.subvectors):
+            out += table[m][codes[:, m]]
+        return out
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids}
+
+
+class MatryoshkaQuantizer:
+    """The leading ``dimensions`` of each vector, re-normalized, as float32.
+
+    Matryoshka-trained embeddings such as ``text-embedding-004`` keep most of
+    their ranking in the first dimensions, so a coarse pass over 128 or 256
+    of them finds the shortlist that the re-rank then scores at full width.
+    """
+
+    kind = "matryoshka"
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def train(self, x: np.ndarray) -> None:
+        pass
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(normalize(x[:, :self.dimensions]), dtype=np.float32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return codes @ normalize(query[:self.dimensions])
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+
+def quantizer(kind: str, subvectors: int = config.COMPACT_PQ_SUBVECTORS,
+              dimensions: int = config.COMPACT_COARSE_DIMENSIONS):
+    if kind == "int8":
+        return ScalarQuantizer()
+    if kind == "pq":
+        return ProductQuantizer(subvectors)
+    if kind == "matryoshka":
+        return MatryoshkaQuantizer(dimensions)
+    raise ValueError(f"Unknown quantization '{kind}'. Use 'int8', 'pq' or 'matryoshka'")
+
+
+@dataclass
+class CompactIndex:
+    version: int
+    ids: List[str]
+    digests: List[str]
+    metas: List[dict]
+    codes: np.ndarray
+    quantizer: Any
+    # Unit-length float32 vectors in ``ids`` order, memory-mapped for the re-rank
+    vectors: Optional[np.ndarray] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of codes and codebooks held in memory; the memory-mapped vectors aren't counted."""
+        return self.codes.nbytes + sum(a.nbytes for a in self.quantizer.state().values())
+
+
+class CompactVectorDb(VectorDb):
+    """Quantized search over a collection of the shared ``VectorStore``."""
+
+    def __init__(self, collection: str, embedder=None, quantization: str = config.COMPACT_QUANTIZATION,
+                 pq_subvectors: int = config.COMPACT_PQ_SUBVECTORS, rerank: int = config.COMPACT_RERANK,
+                 coarse_dimensions: int = config.COMPACT_COARSE_DIMENSIONS, store: Optional[VectorStore] = None,
+                 directory: Optional[Path] = None):
+        if embedder is None:
+            from agno.embedder.google import GeminiEmbedder
+
+            embedder = GeminiEmbedder(dimensions=config.EMBEDDING_DIMENSIONS)
+        self.collection = collection
+        self.embedder = embedder
+        self.quantization = quantization
+        self.pq_subvectors = pq_subvectors
+        self.coarse_dimensions = coarse_dimensions
+        self.rerank = rerank
+        self.store = store or shared_store()
+        self.directory = Path(directory) if directory else self.store.db_file.parent
+        self._index: Optional[CompactIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def index_file(self) -> Path:
+        mode = {"pq": f"pq{self.pq_subvectors}", "matryoshka": f"matryoshka{self.coarse_dimensions}"}.get(
+            self.quantization, self.quantization)
+        return self.directory.joinpath(f"{self.collection}.{mode}.npz")
+
+    @property
+    def vectors_file(self) -> Path:
+        """Normalized full vectors for the re-rank, shared by every mode of the collection."""
+        return self.directory.joinpath(f"{self.collection}.vectors.npy")
+
+    def _map_vectors(self, count: int) -> Optional[np.ndarray]:
+        try:
+            vectors = np.load(self.vectors_file, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.vectors_file}: {e}")
+            return None
+        return vectors if len(vectors) == count else None
+
+    # ---------- index ----------
+    def _load(self, version: int) -> Optional[CompactIndex]:
+        if not self.index_file.exists():
+            return None
+        try:
+            with np.load(self.index_file) as data:
+                if int(data["version"]) != version:
+                    return None
+                state = {k[len("q_"):]: data[k] for k in data.files if k.startswith("q_")}
+                codes, ids = data["codes"], data["ids"].tolist()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable {self.index_file}: {e}")
+            return None
+        stored_ids, digests, metas, _ = self.store.points(self.collection, with_vectors=False)
+        if stored_ids != ids:
+            return None
+        vectors = None
+        if self.rerank:
+            vectors = self._map_vectors(len(ids)) if self.vectors_file.exists() else None
+            if vectors is None:
+                return None
+        q = quantizer(self.quantization, self.pq_subvectors, self.coarse_dimensions)
+        for name, value in state.items():
+            setattr(q, name, value)
+        return CompactIndex(version, ids, digests, metas, codes, q, vectors)
+
+    def _build(self, version: int) -> CompactIndex:
+        ids, digests, metas, vectors = self.store.points(self.collection)
+        q = quantizer(self.quantization, self.pq_subvectors, self.coarse_dimensions)
+        if len(ids):
+            vectors = normalize(vectors)
+            q.train(vectors)
+            codes = q.encode(vectors)
+        else:
+            codes = np.empty((0, 0), dtype=np.uint8)
+        index = CompactIndex(version, ids, digests, metas, codes, q)
+        if len(ids):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self.rerank:
+                # The vectors go first, so a saved index never points at an older re-rank file
+                tmp = self.vectors_file.with_suffix(".tmp.npy")
+                np.save(tmp, np.ascontiguousarray(vectors, dtype=np.float32))
+                tmp.replace(self.vectors_file)
+                mapped = self._map_vectors(len(ids))
+                index.vectors = mapped if mapped is not None else vectors
+            else:
+                # Nothing keeps it current without a re-rank
+                self.vectors_file.unlink(missing_ok=True)
+            tmp = self.index_file.with_suffix(".tmp.npz")
+            np.savez(tmp, version=version, ids=np.array(ids), codes=codes,
+                     **{f"q_{k}": v for k, v in q.state().items()})
+            tmp.replace(self.index_file)
+        logger.debug(f"{self.collection}: {len(ids)} points quantized ({self.quantization}) into {index.nbytes} bytes")
+        return index
+
+    def index(self) -> CompactIndex:
+        """The collection's codes, rebuilt if the collection changed since they were made."""
+        version = self.store.version(self.collection) or 0
+        with self._lock:
+            if self._index is None or self._index.version != version:
+                self._index = self._load(version) or self._build(version)
+            return self._index
+
+    def memory_bytes(self) -> int:
+        return self.index().nbytes
+
+    # ---------- writes ----------
+    def _write(self, documents: List[Document], embed: bool) -> None:
+        from agents.ingestion import chunk_id
+
+        points = []
+        for document in documents:
+            if embed or not document.embedding:
+                document.embed(embedder=self.embedder)
+            points.append((chunk_id(document.content), document.embedding, document.name, document.content,
+                           document.meta_data))
+        self.store.put(self.collection, points)
+
+    def upsert_embedded(self, documents: List[Document]) -> None:
+        self._write(documents, embed=False)
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.upsert(documents, filters)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        self.store.delete(self.collection, ids)
+
+    # ---------- search ----------
+    def search_by_vector(self, vector: Sequence[float], limit: int = 5,
+                         filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        index = self.index()
+        if not index.ids:
+            return []
+        query = normalize(np.asarray(vector, dtype=np.float32))
+        scores = index.quantizer.scores(query, index.codes)
+        if filters:
+            allowed = np.array([all(meta.get(k) == v for k, v in filters.items()) for meta in index.metas])
+            scores[~allowed] = -np.inf
+        candidates = top_k(scores, limit * max(self.rerank, 1))
+        if filters:
+            candidates = candidates[np.isfinite(scores[candidates])]
+        if self.rerank:
+            exact = index.vectors[candidates] @ query
+            order = np.argsort(-exact)[:limit]
+            candidates, final = candidates[order], exact[order]
+        else:
+            candidates, final = candidates[:limit], scores[candidates[:limit]]
+        ids = [index.ids[i] for i in candidates]
+        if not ids:
+            return []
+        payloads = self.store.documents(self.collection, ids)
+        documents = []
+        for point_id, score in zip(ids, final):
+            name, content, meta_data = payloads[point_id]
+            documents.append(Document(name=name, id=point_id, content=content, meta_data=meta_data,
+                                      embedder=self.embedder, reranking_score=float(score)))
+        return documents
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        vector = self.embedder.get_embedding(query)
+        if not vector:
+            logger.error(f"Error getting embedding for query: {query}")
+            return []
+        return self.search_by_vector(vector, limit, filters)
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        import asyncio
+
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    # ---------- lifecycle ----------
+    def create(self) -> None:
+        self.store.create(self.collection)
+
+    async def async_create(self) -> None:
+        self.create()
+
+    def exists(self) -> bool:
+        return self.store.version(self.collection) is not None
+
+    async def async_exists(self) -> bool:
+        return self.exists()
+
+    def doc_exists(self, document: Document) -> bool:
+        from agents.ingestion import chunk_id
+
+        return self.store.has(self.collection, "id", chunk_id(document.content))
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return self.doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return self.store.has(self.collection, "name", name)
+
+    async def async_name_exists(self, name: str) -> bool:
+        return self.name_exists(name)
+
+    def id_exists(self, id: str) -> bool:
+        return self.store.has(self.collection, "id", id)
+
+    def optimize(self) -> None:
+        self.index()
+
+    def drop(self) -> None:
+        self.store.drop(self.collection)
+        self.index_file.unlink(missing_ok=True)
+        self.vectors_file.unlink(missing_ok=True)
+        with self._lock:
+            self._index = None
+
+    async def async_drop(self) -> None:
+        self.drop()
+
+    def delete(self) -> bool:
+        self.drop()
+        return True
@@ -0,0 +1,262 @@
+"""In-process flat index: a collection as one memory-mapped float32 matrix.
+
+The knowledge collections are a few thousand chunks, so a brute-force scan in
+process beats a network round trip to Qdrant. A collection is persisted as
+``tmp/flat/<collection>.npy`` (unit-length float32 rows) plus a
+``<collection>.json`` sidecar with each row's ID, name, content and metadata.
+On startup the matrix is memory-mapped, not read. A search is one matmul plus
+``argpartition``, and ``search_many`` answers a batch of queries with a
+single matrix product.
+
+Writes change the collection in memory and only mark it dirty. ``optimize()``,
+which ``incremental_load`` calls once the load is done, writes both files in
+one go. So does ``flush()``, which also runs at exit. A load of N chunks in
+batches therefore writes the matrix once rather than once per batch.
+"""
+import atexit
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from agno.document.base import Document
+from agno.vectordb.base import VectorDb
+
+from agents import config
+from agents.vectorstores.compact import normalize, top_k
+
+logger = logging.getLogger(__name__)
+
+
+class FlatVectorDb(VectorDb):
+    def __init__(self, collection: str, embedder=None, directory: Path = config.FLAT_DIR):
+        if embedder is None:
+            from agno.embedder.google import GeminiEmbedder
+
+            embedder = GeminiEmbedder(dimensions=config.EMBEDDING_DIMENSIONS)
+        self.collection = collection
+        self.embedder = embedder
+        self.directory = Path(directory)
+        self.matrix = np.empty((0, embedder.dimensions or config.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self.ids: List[str] = []
+        self.rows: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        # Rows added since the matrix was last stacked, and whether memory is ahead of disk
+        self._pending: List[np.ndarray] = []
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        atexit.register(self.flush)
+
+    @property
+    def matrix_file(self) -> Path:
+        return self.directory.joinpath(f"{self.collection}.npy")
+
+    @property
+    def sidecar_file(self) -> Path:
+        return self.directory.joinpath(f"{self.collection}.json")
+
+    # ---------- persistence ----------
+    def _load(self) -> None:
+        if not (self.matrix_file.exists() and self.sidecar_file.exists()):
+            return
+        with open(self.sidecar_file) as f:
+            sidecar = json.load(f)
+        matrix = np.load(self.matrix_file, mmap_mode="r")
+        if len(matrix) != len(sidecar["ids"]):
+            logger.warning(f"{self.collection}: {self.matrix_file.name} and {self.sidecar_file.name} disagree; "
+                           f"starting empty")
+            return
+        self.matrix, self.ids, self.rows = matrix, sidecar["ids"], sidecar["rows"]
+        self._positions = {point_id: i for i, point_id in enumerate(self.ids)}
+
+    def _save(self, matrix: np.ndarray, ids: List[str], rows: List[dict]) -> None:
+        """Write both files and switch to them; a reader of the old mapping keeps its inode."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_matrix = self.matrix_file.with_suffix(".tmp.npy")
+        tmp_sidecar = self.sidecar_file.with_suffix(".json.tmp")
+        np.save(tmp_matrix, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(tmp_sidecar, "w") as f:
+            json.dump({"ids": ids, "rows": rows}, f)
+        tmp_matrix.replace(self.matrix_file)
+        tmp_sidecar.replace(self.sidecar_file)
+        self.matrix = np.load(self.matrix_file, mmap_mode="r")
+        self.ids, self.rows = ids, rows
+        self._positions = {point_id: i for i, point_id in enumerate(ids)}
+        self._pending, self._dirty = [], False
+
+    def _stacked(self) -> np.ndarray:
+        """The matrix with pending rows appended; call with the lock held."""
+        if self._pending:
+            self.matrix = np.vstack([np.asarray(self.matrix).reshape(-1, self._pending[0].shape[0]),
+                                     np.stack(self._pending)])
+            self._pending = []
+        return self.matrix
+
+    def flush(self) -> None:
+        """Write the collection to disk if it changed since the last write."""
+        with self._lock:
+            if self._dirty:
+                self._save(self._stacked(), self.ids, self.rows)
+
+    # ---------- writes ----------
+    def _write(self, documents: List[Document], embed: bool) -> None:
+        from agents.ingestion import chunk_id
+
+        for document in documents:
+            if embed or not document.embedding:
+                document.embed(embedder=self.embedder)
+        with self._lock:
+            # Readers hold on to the lists they were handed, so changes go to copies
+            ids, rows, positions = list(self.ids), list(self.rows), dict(self._positions)
+            updates = {}
+            for document in documents:
+                point_id = chunk_id(document.content)
+                row = {"name": document.name, "content": document.content, "meta_data": document.meta_data or {}}
+                vector = normalize(np.asarray(document.embedding, dtype=np.float32))
+                if point_id in positions:
+                    updates[positions[point_id]] = vector
+                    rows[positions[point_id]] = row
+                    continue
+                positions[point_id] = len(ids)
+                ids.append(point_id)
+                rows.append(row)
+                self._pending.append(vector)
+            if updates:
+                matrix = np.array(self._stacked())
+                for position, vector in updates.items():
+                    matrix[position] = vector
+                self.matrix = matrix
+            self.ids, self.rows, self._positions = ids, rows, positions
+            self._dirty = True
+
+    def upsert_embedded(self, documents: List[Document]) -> None:
+        self._write(documents, embed=False)
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.upsert(documents, filters)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        with self._lock:
+            drop = {self._positions[i] for i in ids if i in self._positions}
+            if not drop:
+                return
+            keep = [i for i in range(len(self.ids)) if i not in drop]
+            self.matrix = np.asarray(self._stacked())[keep]
+            self.ids, self.rows = [self.ids[i] for i in keep], [self.rows[i] for i in keep]
+            self._positions = {point_id: i for i, point_id in enumerate(self.ids)}
+            self._dirty = True
+
+    # ---------- search ----------
+    def _allowed(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        return np.array([all(row["meta_data"].get(k) == v for k, v in filters.items()) for row in self.rows],
+                        dtype=bool)
+
+    def search_by_vectors(self, vectors: Sequence[Sequence[float]], limit: int = 5,
+                          filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Top ``limit`` documents for each query vector, from one matrix product."""
+        with self._lock:
+            matrix, ids, rows = self._stacked(), self.ids, self.rows
+        if not ids or not len(vectors):
+            return [[] for _ in vectors]
+        queries = normalize(np.asarray(vectors, dtype=np.float32))
+        scores = queries @ matrix.T
+        allowed = self._allowed(filters)
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+        results = []
+        for query_scores in scores:
+            best = [i for i in top_k(query_scores, limit) if np.isfinite(query_scores[i])]
+            results.append([Document(name=rows[i]["name"], id=ids[i], content=rows[i]["content"],
+                                     meta_data=rows[i]["meta_data"], embedder=self.embedder,
+                                     reranking_score=float(query_scores[i])) for i in best])
+        return results
+
+    def search_many(self, queries: Sequence[str], limit: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Embed ``queries`` in one batched call and search them with one matrix product."""
+        from agents.embedding_cache import embed_many
+
+        return self.search_by_vectors(embed_many(self.embedder, list(queries)), limit, filters)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        vector = self.embedder.get_embedding(query)
+        if not vector:
+            logger.error(f"Error getting embedding for query: {query}")
+            return []
+        return self.search_by_vectors([vector], limit, filters)[0]
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        import asyncio
+
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    # ---------- lifecycle ----------
+    def create(self) -> None:
+        if not self.exists():
+            with self._lock:
+                self._save(self._stacked(), self.ids, self.rows)
+
+    async def async_create(self) -> None:
+        self.create()
+
+    def exists(self) -> bool:
+        return self.matrix_file.exists() and self.sidecar_file.exists()
+
+    async def async_exists(self) -> bool:
+        return self.exists()
+
+    def doc_exists(self, document: Document) -> bool:
+        from agents.ingestion import chunk_id
+
+        return chunk_id(document.content) in self._positions
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return self.doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return any(row["name"] == name for row in self.rows)
+
+    async def async_name_exists(self, name: str) -> bool:
+        return self.name_exists(name)
+
+    def id_exists(self, id: str) -> bool:
+        return id in self._positions
+
+    def optimize(self) -> None:
+        """A flat scan has no index to build; persist the writes of the load instead."""
+        self.flush()
+
+    def drop(self) -> None:
+        with self._lock:
+            self.matrix_file.unlink(missing_ok=True)
+            self.sidecar_file.unlink(missing_ok=True)
+            self.matrix = np.empty((0, self.matrix.shape[1]), dtype=np.float32)
+            self.ids, self.rows, self._positions = [], [], {}
+            self._pending, self._dirty = [], False
+
+    async def async_drop(self) -> None:
+        self.drop()
+
+    def delete(self) -> bool:
+        self.drop()
+        return True
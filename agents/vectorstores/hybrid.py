@@ -0,0 +1,166 @@
+"""Hybrid keyword + vector retrieval over any vector DB backend."""
+from typing import Any, Dict, List, Optional
+
+from agno.document.base import Document
+from agno.vectordb.base import VectorDb
+
+from agents import config
+from agents.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+from agents.ingestion import chunk_id, collection_name
+from agents.tracing import annotate, span
+from agents.vectorstores.wrapper import VectorDbWrapper
+
+
+class HybridVectorDb(VectorDbWrapper):
+    """Wraps a vector DB with a local BM25 index built at ingestion time.
+
+    Searches fuse the dense and BM25 rankings with reciprocal rank fusion.
+    With ``exact_match`` set to ``"quoted"`` a quoted query, and with
+    ``"auto"`` also a short query whose exact phrase occurs in the collection,
+    is answered from the BM25 index alone without an embedding call.
+    """
+
+    def __init__(self, vector_db: VectorDb, index: Optional[BM25Index] = None, exact_match: str = "quoted",
+                 candidates: int = 4, rrf_k: int = 60, max_exact_terms: int = 4):
+        super().__init__(vector_db)
+        if index is None:
+            index = BM25Index(config.BM25_DIR.joinpath(f"{collection_name(vector_db)}.json"))
+        self.index = index
+        self.exact_match = exact_match
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.max_exact_terms = max_exact_terms
+        self.exact_hits = 0
+        self.fused_searches = 0
+
+    # ---------- ingestion ----------
+    @property
+    def indexed_version(self) -> int:
+        return self.index.version
+
+    def mark_indexed(self, version: int) -> None:
+        self.index.version = version
+        self.index.save()
+
+    def _index(self, documents: List[Document]) -> None:
+        for document in documents:
+            self.index.add(chunk_id(document.content), document.content, document.name, document.meta_data)
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.vector_db.insert(documents, filters)
+        self._index(documents)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await self.vector_db.async_insert(documents, filters)
+        self._index(documents)
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.vector_db.upsert(documents, filters)
+        self._index(documents)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await self.vector_db.async_upsert(documents, filters)
+        self._index(documents)
+
+    def upsert_embedded(self, documents: List[Document]) -> None:
+        super().upsert_embedded(documents)
+        self._index(documents)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        super().delete_ids(ids)
+        self.index.remove(ids)
+
+    # ---------- search ----------
+    def _exact_query(self, query: str) -> Optional[str]:
+        stripped = query.strip()
+        if self.exact_match in ("quoted", "auto") and len(stripped) > 2 and stripped[0] == stripped[-1] == '"':
+            return stripped[1:-1]
+        if self.exact_match == "auto" and 0 < len(tokenize(stripped)) <= self.max_exact_terms:
+            return stripped
+        return None
+
+    def _documents(self, ids: List[str], scores: Dict[str, float], dense: Dict[str, Document]) -> List[Document]:
+        documents = []
+        for doc_id in ids:
+            document = dense.get(doc_id)
+            if document is None:
+                stored = self.index.docs[doc_id]
+                document = Document(content=stored["content"], name=stored["name"], meta_data=stored["meta_data"])
+            document.reranking_score = scores.get(doc_id)
+            documents.append(document)
+        return documents
+
+    def keyword_search(self, query: str, limit: int = 5) -> List[Document]:
+        hits = self.index.search(query, limit)
+        return self._documents([d for d, _ in hits], dict(hits), {})
+
+    def exact_search(self, query: str, limit: int = 5) -> Optional[List[Document]]:
+        """Answer an exact-term query from BM25 alone, or return None if the query needs dense search."""
+        exact = self._exact_query(query)
+        if exact is None:
+            return None
+        keyword_hits = self.index.search(query, limit * self.candidates)
+        matches = self.index.phrase_matches(exact, [d for d, _ in keyword_hits])
+        if not matches:
+            return None
+        self.exact_hits += 1
+        annotate(retrieval="exact")
+        return self._documents(matches[:limit], dict(keyword_hits), {})
+
+    def _fuse(self, query: str, limit: int, dense: List[Document], filters: Optional[Dict[str, Any]]) -> List[Document]:
+        keyword_hits = self.index.search(query, limit * self.candidates)
+        if not keyword_hits or filters:
+            # BM25 doesn't know the vector DB's filters; don't let it leak filtered-out chunks
+            annotate(retrieval="dense")
+            return dense[:limit]
+        self.fused_searches += 1
+        annotate(retrieval="fused")
+        dense_by_id = {chunk_id(d.content): d for d in dense}
+        fused = reciprocal_rank_fusion([list(dense_by_id), [d for d, _ in keyword_hits]], k=self.rrf_k)[:limit]
+        return self._documents([d for d, _ in fused], dict(fused), dense_by_id)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if not filters:
+            documents = self.exact_search(query, limit)
+            if documents is not None:
+                return documents
+
+        pool = limit * self.candidates
+        with span("vector.dense_search", "vector", backend=type(self.unwrap()).__name__, limit=pool):
+            dense = self.vector_db.search(query, pool, filters)
+        return self._fuse(query, limit, dense, filters)
+
+    def search_many(self, queries: List[str], limit: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        from agents.vectorstores import search_many
+
+        results = [None if filters else self.exact_search(query, limit) for query in queries]
+        dense_queries = [query for query, documents in zip(queries, results) if documents is None]
+        pool = limit * self.candidates
+        with span("vector.dense_search", "vector", backend=type(self.unwrap()).__name__, limit=pool,
+                  queries=len(dense_queries)):
+            dense = iter(search_many(self.vector_db, dense_queries, pool, filters))
+        return [documents if documents is not None else self._fuse(query, limit, next(dense), filters)
+                for query, documents in zip(queries, results)]
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.vector_db.search(query, limit)
+
+    def hybrid_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    # ---------- lifecycle ----------
+    def drop(self) -> None:
+        self.vector_db.drop()
+        self.index.clear()
+        self.mark_indexed(-1)
+
+    async def async_drop(self) -> None:
+        await self.vector_db.async_drop()
+        self.index.clear()
+        self.mark_indexed(-1)
+
+    def delete(self) -> bool:
+        self.index.clear()
+        self.mark_indexed(-1)
+        return self.vector_db.delete()
@@ -0,0 +1,52 @@
+"""Embedded LanceDB backend with IVF-PQ indexing."""
+import logging
+import math
+from typing import List
+
+from agno.vectordb.lancedb import LanceDb
+
+logger = logging.getLogger(__name__)
+
+# PQ training needs enough rows per centroid; below this a flat scan is faster anyway
+MIN_ROWS_FOR_INDEX = 5000
+
+
+class LocalLanceDb(LanceDb):
+    """agno's LanceDb plus delete-by-ID and an IVF-PQ index built by ``optimize()``.
+
+    LanceDB reads its local Lance files through memory-mapped I/O, so queries
+    never leave the process and only the pages a search touches are loaded.
+    """
+
+    def __init__(self, *args, nprobes: int = 20, sub_vector_width: int = 16, **kwargs):
+        super().__init__(*args, nprobes=nprobes, **kwargs)
+        self.sub_vector_width = sub_vector_width
+
+    def row_count(self) -> int:
+        return self.table.count_rows() if self.exists() else 0
+
+    def index_params(self, rows: int) -> dict:
+        dimensions = self.embedder.dimensions
+        width = self.sub_vector_width
+        while dimensions % width:
+            width //= 2
+        return {
+            "metric": "cosine",
+            "num_partitions": max(1, min(256, int(math.sqrt(rows)))),
+            "num_sub_vectors": dimensions // width,
+        }
+
+    def optimize(self) -> None:
+        rows = self.row_count()
+        if rows < MIN_ROWS_FOR_INDEX:
+            logger.debug(f"{self.table_name}: {rows} rows, skipping IVF-PQ index")
+            return
+        params = self.index_params(rows)
+        logger.info(f"{self.table_name}: building IVF-PQ index over {rows} rows {params}")
+        self.table.create_index(vector_column_name="vector", replace=True, **params)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        if not ids or not self.exists():
+            return
+        quoted = ", ".join("'" + i.replace("'", "''") + "'" for i in ids)
+        self.table.delete(f"id IN ({quoted})")
@@ -0,0 +1,262 @@
+"""Cache of knowledge-base search results.
+
+Results are keyed by collection, normalized query text, limit and filters,
+expire after a TTL and are invalidated whenever the collection's ingestion
+manifest version moves on. A semantic tier answers paraphrased queries whose
+embedding is within a cosine threshold of a cached query, scoring every cached
+embedding with one matrix product. Empty results aren't cached, so a query
+that found nothing is searched again.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.document.base import Document
+from agno.vectordb.base import VectorDb
+
+from agents import config
+from agents.embedding_cache import pack
+from agents.ingestion import IngestionManifest, collection_name
+from agents.tracing import annotate
+from agents.vectorstores.compact import normalize
+from agents.vectorstores.wrapper import VectorDbWrapper
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_cache (
+    collection TEXT NOT NULL,
+    query TEXT NOT NULL,
+    params TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    created REAL NOT NULL,
+    embedding BLOB,
+    results TEXT NOT NULL,
+    PRIMARY KEY (collection, query, params)
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s'-]", " ", query.lower()).split())
+
+
+def search_params(limit: int, filters: Optional[Dict[str, Any]]) -> str:
+    return json.dumps({"limit": limit, "filters": filters or None}, sort_keys=True, default=str)
+
+
+def _dumps(documents: List[Document]) -> str:
+    return json.dumps([{"content": d.content, "name": d.name, "id": d.id, "meta_data": d.meta_data,
+                        "reranking_score": d.reranking_score} for d in documents], default=str)
+
+
+def _loads(results: str) -> List[Document]:
+    return [Document(content=r["content"], name=r["name"], id=r["id"], meta_data=r["meta_data"] or {},
+                     reranking_score=r["reranking_score"]) for r in json.loads(results)]
+
+
+class QueryCache:
+    """SQLite store shared by every collection's ``CachedSearchVectorDb``."""
+
+    def __init__(self, db_file: Path = config.QUERY_CACHE_FILE):
+        self.db_file = Path(db_file)
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, collection: str, query: str, params: str, version: int, ttl: float) -> Optional[List[Document]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM query_cache WHERE collection = ? AND query = ? AND params = ? AND version = ? "
+                "AND created > ?",
+                (collection, query, params, version, time.time() - ttl),
+            ).fetchone()
+        return _loads(row[0]) if row else None
+
+    def embedded_queries(self, collection: str, params: str, version: int,
+                         ttl: float) -> Tuple[List[str], np.ndarray]:
+        """Live cached queries with an embedding, and those embeddings as unit-length rows."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, embedding FROM query_cache WHERE collection = ? AND params = ? AND version = ? "
+                "AND created > ? AND embedding IS NOT NULL",
+                (collection, params, version, time.time() - ttl),
+            ).fetchall()
+        if not rows:
+            return [], np.empty((0, 0), dtype=np.float32)
+        # Rows from another embedder, if any, can't be compared with this one's
+        rows = [(query, blob) for query, blob in rows if len(blob) == len(rows[0][1])]
+        matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32).reshape(len(rows), -1)
+        return [query for query, _ in rows], normalize(matrix)
+
+    def put(self, collection: str, query: str, params: str, version: int, documents: List[Document],
+            embedding: Optional[List[float]] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_cache (collection, query, params, version, created, embedding, results) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (collection, query, params, version, time.time(), pack(embedding) if embedding else None,
+                 _dumps(documents)),
+            )
+            self._conn.commit()
+
+    def invalidate(self, collection: str, keep_version: Optional[int] = None) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache WHERE collection = ? AND version IS NOT ?",
+                               (collection, keep_version))
+            self._conn.commit()
+
+
+_shared: Optional[QueryCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_query_cache() -> QueryCache:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = QueryCache()
+        return _shared
+
+
+class CachedSearchVectorDb(VectorDbWrapper):
+    """Serves repeated and paraphrased searches from a ``QueryCache``.
+
+    ``similarity`` is the cosine threshold of the semantic tier; set it to
+    ``None`` to cache exact (normalized) queries only.
+    """
+
+    def __init__(self, vector_db: VectorDb, cache: Optional[QueryCache] = None, ttl: float = config.QUERY_CACHE_TTL,
+                 similarity: Optional[float] = config.QUERY_CACHE_SIMILARITY):
+        super().__init__(vector_db)
+        self.cache = cache if cache is not None else shared_query_cache()
+        self.ttl = ttl
+        self.similarity = similarity
+        self.collection_key = collection_name(vector_db)
+        self._manifest_path = IngestionManifest(self.collection_key).path
+        self._manifest_mtime = None
+        self._version = 0
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        """The collection's ingestion version, re-read whenever its manifest file changes."""
+        try:
+            mtime = self._manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self._version
+        if mtime != self._manifest_mtime:
+            self._manifest_mtime = mtime
+            self._version = IngestionManifest(self.collection_key).version
+        return self._version
+
+    def mark_indexed(self, version: int) -> None:
+        super().mark_indexed(version)
+        self._manifest_mtime = None
+        self.cache.invalidate(self.collection_key, keep_version=version)
+
+    def _embed(self, query: str) -> Optional[List[float]]:
+        embedder = getattr(self.vector_db, "embedder", None)
+        return embedder.get_embedding(query) if embedder is not None else None
+
+    def _cached(self, query: str, normalized: str, params: str, version: int, limit: int,
+                filters: Optional[Dict[str, Any]]) -> Optional[List[Document]]:
+        """The exact cache tier, then the wrapped DB's exact-term lookup, which needs no embedding."""
+        documents = self.cache.get(self.collection_key, normalized, params, version, self.ttl)
+        if documents is not None:
+            self.hits += 1
+            annotate(query_cache="hit")
+            return documents
+
+        exact_search = getattr(self.vector_db, "exact_search", None)
+        if exact_search is not None and not filters:
+            # Exact-term lookups don't need an embedding for the semantic tier either
+            documents = exact_search(query, limit)
+            if documents is not None:
+                self.misses += 1
+                annotate(query_cache="miss")
+                if documents:
+                    self.cache.put(self.collection_key, normalized, params, version, documents)
+        return documents
+
+    def _semantic(self, embedding: Optional[List[float]], params: str, version: int,
+                  embedded_queries: Optional[Tuple[List[str], np.ndarray]] = None) -> Optional[List[Document]]:
+        if not embedding:
+            return None
+        if embedded_queries is None:
+            embedded_queries = self.cache.embedded_queries(self.collection_key, params, version, self.ttl)
+        cached_queries, matrix = embedded_queries
+        if not cached_queries or matrix.shape[1] != len(embedding):
+            return None
+        scores = matrix @ normalize(np.asarray(embedding, dtype=np.float32))
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        documents = self.cache.get(self.collection_key, cached_queries[best], params, version, self.ttl)
+        if documents is not None:
+            self.semantic_hits += 1
+            annotate(query_cache="semantic_hit")
+        return documents
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        version = self.version
+        normalized = normalize_query(query)
+        params = search_params(limit, filters)
+        documents = self._cached(query, normalized, params, version, limit, filters)
+        if documents is not None:
+            return documents
+
+        embedding = None
+        if self.similarity is not None:
+            # The embedding cache makes this free when the wrapped search embeds the same text
+            embedding = self._embed(query)
+            documents = self._semantic(embedding, params, version)
+            if documents is not None:
+                return documents
+
+        self.misses += 1
+        annotate(query_cache="miss")
+        documents = self.vector_db.search(query, limit, filters)
+        if documents:
+            self.cache.put(self.collection_key, normalized, params, version, documents, embedding)
+        return documents
+
+    def search_many(self, queries: List[str], limit: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Like ``search`` per query, with every query that gets past the exact tiers embedded in one call."""
+        from agents.embedding_cache import embed_many
+        from agents.vectorstores import search_many
+
+        version = self.version
+        params = search_params(limit, filters)
+        normalized = [normalize_query(query) for query in queries]
+        results = [self._cached(query, key, params, version, limit, filters) for query, key in zip(queries, normalized)]
+        pending = [i for i, documents in enumerate(results) if documents is None]
+        embeddings = [None] * len(pending)
+        embedder = getattr(self.vector_db, "embedder", None)
+        if pending and self.similarity is not None and embedder is not None:
+            embeddings = embed_many(embedder, [queries[i] for i in pending])
+            embedded_queries = self.cache.embedded_queries(self.collection_key, params, version, self.ttl)
+            for i, embedding in zip(pending, embeddings):
+                results[i] = self._semantic(embedding, params, version, embedded_queries)
+
+        misses = [(i, embedding) for i, embedding in zip(pending, embeddings) if results[i] is None]
+        if misses:
+            self.misses += len(misses)
+            annotate(query_cache="miss")
+            fresh = search_many(self.vector_db, [queries[i] for i, _ in misses], limit, filters)
+            for (i, embedding), documents in zip(misses, fresh):
+                results[i] = documents
+                if documents:
+                    self.cache.put(self.collection_key, normalized[i], params, version, documents, embedding)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "semantic_hits": self.semantic_hits, "misses": self.misses}
@@ -0,0 +1,143 @@
+"""Base class for vector DBs that decorate another vector DB."""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from agno.document.base import Document
+from agno.vectordb.base import VectorDb
+
+from agents.ingestion import collection_name, delete_chunks
+from agents.tracing import span
+
+
+class VectorDbWrapper(VectorDb):
+    """Forwards every VectorDb call, and any other attribute, to ``vector_db``."""
+
+    def __init__(self, vector_db: VectorDb):
+        self.vector_db = vector_db
+
+    def __getattr__(self, name):
+        # Anything not overridden here (embedder, collection, client, table...) is the wrapped DB's
+        if name == "vector_db":
+            raise AttributeError(name)
+        return getattr(self.vector_db, name)
+
+    def unwrap(self) -> VectorDb:
+        inner = self.vector_db
+        return inner.unwrap() if isinstance(inner, VectorDbWrapper) else inner
+
+    # ---------- writes ----------
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.vector_db.insert(documents, filters)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await self.vector_db.async_insert(documents, filters)
+
+    def upsert_available(self) -> bool:
+        return self.vector_db.upsert_available()
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.vector_db.upsert(documents, filters)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await self.vector_db.async_upsert(documents, filters)
+
+    def upsert_embedded(self, documents: List[Document]) -> None:
+        from agents.ingest_pipeline import write_embedded
+
+        write_embedded(self.vector_db, documents)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        delete_chunks(self.vector_db, ids)
+
+    # ---------- search ----------
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return self.vector_db.search(query, limit, filters)
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def search_many(self, queries: List[str], limit: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        from agents.vectorstores import search_many
+
+        return search_many(self.vector_db, queries, limit, filters)
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.vector_db.vector_search(query, limit)
+
+    def keyword_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.vector_db.keyword_search(query, limit)
+
+    def hybrid_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.vector_db.hybrid_search(query, limit)
+
+    # ---------- ingestion hooks ----------
+    @property
+    def indexed_version(self) -> int:
+        return getattr(self.vector_db, "indexed_version", None)
+
+    def mark_indexed(self, version: int) -> None:
+        if hasattr(self.vector_db, "mark_indexed"):
+            self.vector_db.mark_indexed(version)
+
+    # ---------- lifecycle ----------
+    def create(self) -> None:
+        self.vector_db.create()
+
+    async def async_create(self) -> None:
+        await self.vector_db.async_create()
+
+    def doc_exists(self, document: Document) -> bool:
+        return self.vector_db.doc_exists(document)
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return await self.vector_db.async_doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return self.vector_db.name_exists(name)
+
+    async def async_name_exists(self, name: str) -> bool:
+        return await self.vector_db.async_name_exists(name)
+
+    def id_exists(self, id: str) -> bool:
+        return self.vector_db.id_exists(id)
+
+    def drop(self) -> None:
+        self.vector_db.drop()
+
+    async def async_drop(self) -> None:
+        await self.vector_db.async_drop()
+
+    def exists(self) -> bool:
+        return self.vector_db.exists()
+
+    async def async_exists(self) -> bool:
+        return await self.vector_db.async_exists()
+
+    def optimize(self) -> None:
+        self.vector_db.optimize()
+
+    def delete(self) -> bool:
+        return self.vector_db.delete()
+
+
+class TracedVectorDb(VectorDbWrapper):
+    """Puts each search of ``vector_db`` in a ``vector.search`` span; the wrappers inside annotate it."""
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        with span("vector.search", "vector", collection=collection_name(self.vector_db),
+                  backend=type(self.unwrap()).__name__, limit=limit, filtered=bool(filters),
+                  request_bytes=len(query)) as s:
+            documents = self.vector_db.search(query, limit, filters)
+            s.set(results=len(documents), response_bytes=sum(len(d.content) for d in documents))
+            return documents
+
+    def search_many(self, queries: List[str], limit: int = 5,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        with span("vector.search_many", "vector", collection=collection_name(self.vector_db),
+                  backend=type(self.unwrap()).__name__, queries=len(queries), limit=limit, filtered=bool(filters),
+                  request_bytes=sum(len(q) for q in queries)) as s:
+            results = super().search_many(queries, limit, filters)
+            documents = [d for found in results for d in found]
+            s.set(results=len(documents), response_bytes=sum(len(d.content) for d in documents))
+            return results
@@ -0,0 +1,262 @@
+"""The BrainSpark workflow as a DAG of agent stages.
+
+BrandScript -> SEO keyword clusters -> content -> (video script, social posts)
+-> (growth review, product review). Each stage's prompt is rendered from the
+workflow inputs and its upstream artifacts, stages whose dependencies are done
+run concurrently, and every output is cached by the hash of the stage's agent
+and rendered prompt, so a rerun only recomputes stages whose inputs changed.
+Upstream artifacts named in a stage's ``context`` (the BrandScript) go to the
+agent as ``agents.context`` artifacts rather than in the prompt, so they sit in
+the cacheable part of its system prompt.
+
+    python -m agents.workflow --artifact brandscript=artifacts/brandscript.md
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from hashlib import sha256
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agents import config
+from agents.context import ContextArtifact, load_artifact, use_context
+from agents.registry import AGENT_FACTORIES, get_agent
+
+if TYPE_CHECKING:
+    from agents.prompt_cache import PromptUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUTS = {
+    "brief": "Our new AI-driven analytics service. We are BrainSpark Digital. We are targeting small businesses.",
+    "keywords": "Website Development, AI, AI Agents",
+}
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    agent_id: str
+    prompt: str
+    depends_on: Tuple[str, ...] = ()
+    # Upstream outputs the agent receives as context artifacts instead of in the prompt
+    context: Tuple[str, ...] = ()
+
+
+STAGES: List[Stage] = [
+    Stage("brandscript", "brandscript_architect",
+          "Develop a comprehensive Brandscript for the following brief:\n\n{brief}"),
+    Stage("seo", "seo_specialist",
+          "DO an extensive keyword research and develop keyword clusters for the following keywords: {keywords}",
+          ("brandscript",), ("brandscript",)),
+    Stage("content", "content_creator",
+          "Write a pillar blog post for the brief below. Build the narrative on the BrandScript and target the "
+          "primary keyword cluster.\n\nBrief: {brief}\n\nKeyword clusters:\n{seo}",
+          ("brandscript", "seo"), ("brandscript",)),
+    Stage("script", "script_writer",
+          "Write a 60 second video script that adapts the blog post below, following the BrandScript and the SEO "
+          "guidelines.\n\nSEO guidelines:\n{seo}\n\nBlog post:\n{content}",
+          ("brandscript", "seo", "content"), ("brandscript",)),
+    Stage("social", "social_media_manager",
+          "Write LinkedIn, Twitter and Instagram posts that promote the blog post below.\n\n"
+          "Keyword clusters:\n{seo}\n\nBlog post:\n{content}",
+          ("seo", "content")),
+    Stage("growth_review", "growth_hacker",
+          "Review this campaign as AARRR funnel experiments: identify bottlenecks, propose experiments with "
+          "hypotheses and metrics.\n\nBlog post:\n{content}\n\n"
+          "Video script:\n{script}\n\nSocial posts:\n{social}",
+          ("brandscript", "content", "script", "social"), ("brandscript",)),
+    Stage("product_review", "product_manager",
+          "Review how this campaign positions our service offering: value proposition, packaging and pricing "
+          "tiers to test.\n\nBlog post:\n{content}\n\n"
+          "Video script:\n{script}\n\nSocial posts:\n{social}",
+          ("brandscript", "content", "script", "social"), ("brandscript",)),
+]
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    by_name = {stage.name: stage for stage in stages}
+    order, state = [], {}
+
+    def visit(stage: Stage, path: Tuple[str, ...]):
+        if state.get(stage.name) == "done":
+            return
+        if state.get(stage.name) == "visiting":
+            raise ValueError(f"Workflow has a cycle: {' -> '.join(path + (stage.name,))}")
+        state[stage.name] = "visiting"
+        for dep in stage.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+            visit(by_name[dep], path + (stage.name,))
+        state[stage.name] = "done"
+        order.append(stage)
+
+    for stage in stages:
+        visit(stage, ())
+    return order
+
+
+def agent_fingerprint(agent_id: str) -> str:
+    """Hash of what shapes an agent's answers besides the prompt: its description, instructions and model."""
+    module = import_module(AGENT_FACTORIES[agent_id].split(":")[0])
+    parts = [getattr(module, "DESCRIPTION", ""), getattr(module, "INSTRUCTIONS", ""), config.CHAT_MODEL_ID]
+    return sha256("\x00".join(parts).encode()).hexdigest()
+
+
+def input_hash(stage: Stage, prompt: str, context: Optional[Dict[str, str]] = None) -> str:
+    digests = {name: ContextArtifact.create(name, text).digest for name, text in (context or {}).items()}
+    return sha256(json.dumps({"stage": stage.name, "agent": stage.agent_id,
+                              "fingerprint": agent_fingerprint(stage.agent_id), "prompt": prompt,
+                              "context": digests},
+                             sort_keys=True).encode()).hexdigest()
+
+
+class StageCache:
+    """Stage outputs as JSON files under ``<directory>/<stage>/<input hash>.json``."""
+
+    def __init__(self, directory: Path = config.WORKFLOW_DIR):
+        self.directory = Path(directory)
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.directory.joinpath(stage, f"{key}.json")
+
+    def get(self, stage: str, key: str) -> Optional[str]:
+        path = self.path(stage, key)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)["content"]
+
+    def put(self, stage: str, key: str, content: str) -> None:
+        path = self.path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"stage": stage, "input_hash": key, "created": time.time(), "content": content}, f)
+        tmp.replace(path)
+
+
+@dataclass
+class StageResult:
+    name: str
+    agent_id: Optional[str]
+    content: str
+    status: str  # "ran", "cached" or "provided"
+    input_hash: Optional[str] = None
+    seconds: float = 0.0
+    usage: Optional["PromptUsage"] = None
+
+
+@dataclass
+class WorkflowResult:
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def __getitem__(self, name: str) -> str:
+        return self.stages[name].content
+
+    def __str__(self):
+        lines = [f"{r.name:<16}{r.status:<10}{r.seconds:>8.1f}s" + (f"   {r.usage}" if r.usage and r.usage.calls else "")
+                 for r in self.stages.values()]
+        return "\n".join(lines + [f"{'total':<26}{self.seconds:>8.1f}s"])
+
+
+async def run_agent(agent_id: str, prompt: str) -> str:
+    agent = await asyncio.to_thread(get_agent, agent_id)
+    response = await agent.arun(prompt)
+    return response.content
+
+
+async def arun_workflow(inputs: Optional[Dict[str, str]] = None, stages: Sequence[Stage] = STAGES,
+                        artifacts: Optional[Dict[str, str]] = None, cache: Optional[StageCache] = None,
+                        force: Iterable[str] = (),
+                        runner: Callable[[str, str], Awaitable[str]] = run_agent) -> WorkflowResult:
+    """Run ``stages`` as a DAG.
+
+    ``artifacts`` supplies stage outputs up front (those stages don't run), and
+    stages named in ``force`` ignore their cached output.
+    """
+    inputs = {**DEFAULT_INPUTS, **(inputs or {})}
+    artifacts = artifacts or {}
+    cache = cache or StageCache()
+    force = set(force)
+    result = WorkflowResult()
+    tasks: Dict[str, asyncio.Task] = {}
+    start = time.perf_counter()
+
+    async def run_stage(stage: Stage) -> str:
+        upstream = await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        if stage.name in artifacts:
+            result.stages[stage.name] = StageResult(stage.name, None, artifacts[stage.name], "provided")
+            return artifacts[stage.name]
+        outputs = dict(zip(stage.depends_on, upstream))
+        prompt = stage.prompt.format(**inputs, **outputs)
+        context = {name: outputs[name] for name in stage.context}
+        key = input_hash(stage, prompt, context)
+        content = None if stage.name in force else cache.get(stage.name, key)
+        if content is not None:
+            result.stages[stage.name] = StageResult(stage.name, stage.agent_id, content, "cached", key)
+            return content
+        # Imported here: it pulls in google-genai, which the cached and provided paths never need
+        from agents.prompt_cache import track_prompt_usage
+
+        stage_start = time.perf_counter()
+        logger.info(f"Running stage '{stage.name}' with {stage.agent_id}")
+        with use_context(**context), track_prompt_usage() as usage:
+            content = await runner(stage.agent_id, prompt)
+        cache.put(stage.name, key, content)
+        result.stages[stage.name] = StageResult(stage.name, stage.agent_id, content, "ran", key,
+                                                time.perf_counter() - stage_start, usage)
+        return content
+
+    for stage in topological_order(stages):
+        tasks[stage.name] = asyncio.create_task(run_stage(stage))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    # Report stages in DAG order rather than completion order
+    result.stages = {s.name: result.stages[s.name] for s in topological_order(stages)}
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_workflow(inputs: Optional[Dict[str, str]] = None, stages: Sequence[Stage] = STAGES,
+                 artifacts: Optional[Dict[str, str]] = None, cache: Optional[StageCache] = None,
+                 force: Iterable[str] = (),
+                 runner: Callable[[str, str], Awaitable[str]] = run_agent) -> WorkflowResult:
+    return asyncio.run(arun_workflow(inputs, stages, artifacts, cache, force, runner))
+
+
+def save_artifacts(result: WorkflowResult, directory: Path = config.OUTPUT_DIR) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, stage in result.stages.items():
+        directory.joinpath(f"{name}.md").write_text(stage.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--brief", default=DEFAULT_INPUTS["brief"])
+    parser.add_argument("--keywords", default=DEFAULT_INPUTS["keywords"])
+    parser.add_argument("--artifact", action="append", default=[], metavar="STAGE=FILE",
+                        help="use FILE as the output of STAGE instead of running it")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE", help="ignore STAGE's cached output")
+    args = parser.parse_args()
+
+    artifacts = {}
+    for item in args.artifact:
+        name, _, path = item.partition("=")
+        artifacts[name] = Path(path).read_text()
+    result = run_workflow({"brief": args.brief, "keywords": args.keywords}, artifacts=artifacts, force=args.force)
+    save_artifacts(result)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
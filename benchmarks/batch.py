@@ -0,0 +1,121 @@
+"""Throughput of the async batch runner against concurrency.
+
+``--briefs`` content briefs go through ``agents.batch.run_batch`` with
+``content_creator`` built by its real factory. Its model is a ``PooledGemini``
+on ``--keys`` fake keys against ``benchmarks.fake_gemini``, which answers
+after ``--latency`` and allows ``--rpm`` requests per key per ``--window``
+seconds. The knowledge base is an in-memory one. Each brief costs an answer
+and a memory update. Throughput grows with concurrency until the pool's
+combined quota caps it. A last batch seeds a memory for each brief's user and
+checks that no brief's system prompt carries another brief's memory.
+
+    python -m benchmarks.batch --briefs 32 --concurrency 1 2 4 8 16 32
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agents import config, storage
+from agents.batch import run_batch
+from agents.keypool import KeyPool, PooledGemini
+from agents.registry import build_agent
+from benchmarks.end_to_end import knowledge
+from benchmarks.fake_gemini import FakeGemini
+from benchmarks.key_pool import client_factory
+
+AGENT = "content_creator"
+
+
+def briefs(count: int):
+    return [f"Write a 300-word blog post on AI in web development, angle {i}: "
+            f"{['design', 'SEO', 'accessibility', 'performance'][i % 4]}" for i in range(count)]
+
+
+async def sweep(fake: FakeGemini, batch, levels, window: float, build, then=None) -> None:
+    # One event loop for every level: the pool's clients keep async connections bound to it
+    for concurrency in levels:
+        served_before, rejected_before = sum(fake.served.values()), sum(fake.rejected.values())
+        start = time.perf_counter()
+        results = [r async for r in run_batch({AGENT: batch}, concurrency, build)]
+        seconds = time.perf_counter() - start
+        calls = sum(fake.served.values()) - served_before
+        rejected = sum(fake.rejected.values()) - rejected_before
+        print(f"{concurrency:<13}{seconds:>10.2f}{len(batch) / seconds:>10.2f}"
+              f"{statistics.median(r.seconds for r in results):>9.2f}{calls / seconds:>9.1f}{rejected:>6}"
+              f"{sum(not r.ok for r in results):>8}")
+        # Let the quota window drain before the next level
+        await asyncio.sleep(window)
+    if then is not None:
+        await then
+
+
+async def check_memory_isolation(batch, concurrency: int, build) -> None:
+    """Seed one memory per brief's user, run the batch, and look for other briefs' memories in each prompt."""
+    from agno.memory.v2.db.schema import MemoryRow
+
+    batch_id = "isolation"
+    memory_db = storage.agent_memory_db(f"{AGENT}_memory")
+    memory_db.create()
+    for index in range(len(batch)):
+        memory_db.upsert_memory(MemoryRow(id=f"isolation-{index}", user_id=f"batch-{batch_id}-{AGENT}-{index}",
+                                          memory={"memory": f"Brief {index} marker: isolation-{index}-marker"}))
+    agents = []
+
+    def keep(agent_id: str):
+        agents.append(build(agent_id))
+        return agents[-1]
+
+    results = [r async for r in run_batch({AGENT: batch}, concurrency, keep, batch_id=batch_id)]
+    leaks = []
+    for agent in agents:
+        index = int(agent.session_id.rsplit("-", 1)[1])
+        prompt = agent.run_response.messages[0].content if agent.run_response and agent.run_response.messages else ""
+        seen = {i for i in range(len(batch)) if f"isolation-{i}-marker" in prompt}
+        if seen != {index}:
+            leaks.append(f"brief {index} saw {sorted(seen)}")
+    print(f"\nmemory isolation over {len(results)} concurrent briefs: "
+          + ("ok, each prompt had only its own brief's memory" if not leaks else "; ".join(leaks)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--briefs", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--latency", type=float, default=0.5, help="fake endpoint latency per request")
+    parser.add_argument("--keys", type=int, default=2)
+    parser.add_argument("--rpm", type=int, default=10, help="requests per key per window")
+    parser.add_argument("--window", type=float, default=2.0, help="quota window in seconds")
+    args = parser.parse_args()
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+    config.HISTORY_SUMMARIES = False
+
+    with tempfile.TemporaryDirectory() as scratch, FakeGemini(rpm=args.rpm, window=args.window,
+                                                                latency=args.latency) as fake:
+        storage._engine = storage.create_storage_engine(Path(scratch, "agents.db"))
+        pool = KeyPool({f"KEY{i}": f"fake-key-{i}" for i in range(args.keys)},
+                       limits={"default": (args.rpm, None)}, client_factory=client_factory(fake.url),
+                       window=args.window, base_backoff=0.25)
+        shared = knowledge(50)
+
+        def build(agent_id: str):
+            agent = build_agent(agent_id, model=PooledGemini(id=config.CHAT_MODEL_ID, pool=pool), knowledge=shared,
+                                tools=[])
+            agent.debug_mode = False
+            return agent
+
+        batch = briefs(args.briefs)
+        cap = args.keys * args.rpm / args.window
+        print(f"{args.briefs} briefs, {args.latency * 1000:.0f} ms per model call, {args.keys} keys at {args.rpm} "
+              f"requests per {args.window:g}s ({cap:.0f} calls/s)")
+        print(f"{'concurrency':<13}{'total (s)':>10}{'briefs/s':>10}{'p50 (s)':>9}{'calls/s':>9}{'429s':>6}"
+              f"{'failed':>8}")
+        asyncio.run(sweep(fake, batch, args.concurrency, args.window, build,
+                          then=check_memory_isolation(batch[:8], 8, build)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare chunking strategies: chunk counts, chunk-size distribution and wall time.
+
+    python -m benchmarks.chunking                 # 2000-word synthetic pages, fake agentic model
+    python -m benchmarks.chunking --pdfs          # the PDFs under knowledge/
+    python -m benchmarks.chunking --gemini        # real gemini-2.0-flash-lite for agentic chunking
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agno.document.chunking.agentic import AgenticChunking
+from agno.document.chunking.fixed import FixedSizeChunking
+
+from agents.chunking import CachedAgenticChunking, ChunkCache, SemanticChunking
+from benchmarks.fakes import FakeChunkingModel, FakeEmbedder, synthetic_pages
+from benchmarks.ingest_pipeline import load_pages
+
+
+def run(strategy, pages):
+    start = time.perf_counter()
+    chunks = [chunk for page in pages for chunk in strategy.chunk(page)]
+    return time.perf_counter() - start, [len(c.content) for c in chunks]
+
+
+def report(name, seconds, sizes, model_calls="-"):
+    sizes = sorted(sizes) or [0]
+    p90 = sizes[min(len(sizes) - 1, int(len(sizes) * 0.9))]
+    print(f"{name:<30}{len(sizes):>8}{sizes[0]:>8}{int(statistics.median(sizes)):>8}{p90:>8}{sizes[-1]:>8}"
+          f"{seconds:>10.3f}{model_calls:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=2000,
+                        help="words per synthetic page; pages must be longer than --chunk-size to be chunked at all")
+    parser.add_argument("--pdfs", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--gemini", metavar="KEY_ENV", nargs="?", const="2DCNNGEMINI",
+                        help="use Gemini for agentic chunking instead of the fake model")
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    pages = load_pages(args) if args.pdfs else synthetic_pages(args.pages, words=args.words)
+    longer = sum(len(page.content) > args.chunk_size for page in pages)
+    print(f"{len(pages)} pages ({longer} longer than chunk_size), chunk_size={args.chunk_size}")
+    print(f"{'strategy':<30}{'chunks':>8}{'min':>8}{'median':>8}{'p90':>8}{'max':>8}{'seconds':>10}{'calls':>8}")
+
+    report("fixed", *run(FixedSizeChunking(chunk_size=args.chunk_size), pages))
+    report("semantic (lexical)", *run(SemanticChunking(chunk_size=args.chunk_size), pages))
+    embedder = FakeEmbedder(call_latency=0.0, per_text_latency=0.0)
+    report("semantic (embeddings)", *run(SemanticChunking(chunk_size=args.chunk_size, embedder=embedder), pages))
+
+    if args.gemini:
+        from agents.factories import chunking_model
+
+        model = chunking_model(args.gemini)
+    else:
+        model = FakeChunkingModel(latency=args.model_latency, max_chunk_size=args.chunk_size)
+    count = (lambda: getattr(model, "calls", "?"))
+
+    before = count()
+    seconds, sizes = run(AgenticChunking(model=model, max_chunk_size=args.chunk_size), pages)
+    report("agentic", seconds, sizes, count() - before if isinstance(before, int) else "?")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cached = CachedAgenticChunking(model=model, max_chunk_size=args.chunk_size,
+                                       cache=ChunkCache(Path(tmp).joinpath("chunks.db")))
+        for label in ("agentic cached (cold)", "agentic cached (warm)"):
+            before = count()
+            seconds, sizes = run(cached, pages)
+            report(label, seconds, sizes, count() - before if isinstance(before, int) else "?")
+
+
+if __name__ == "__main__":
+    main()
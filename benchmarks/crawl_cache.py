@@ -0,0 +1,160 @@
+"""Crawl store vs. re-crawling a site for every analysis, against a local site.
+
+The site serves ``--pages`` HTML pages with ETag and Last-Modified headers
+and a simulated ``--latency`` per request. "uncached" crawls the site once for
+the technical and once for the on-page analysis, as the agent did with
+Firecrawl; the crawl store crawls once and answers both reports from its
+index, then re-crawls the next run with conditional requests, before and after
+``--changed`` of the pages are edited.
+
+    python -m benchmarks.crawl_cache --pages 200 --changed 0.1
+"""
+import argparse
+import hashlib
+import random
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from agents.toolkits.crawl import CrawlStore, SiteCrawler, on_page_report, site_of, technical_report
+from benchmarks.fakes import synthetic_text
+
+
+class FakeSite:
+    """A site of linked pages that answers conditional requests with 304."""
+
+    def __init__(self, pages: int, latency: float):
+        self.pages = {f"/page-{i}": 0 for i in range(pages)}
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def edit(self, fraction: float, seed: int = 0) -> None:
+        for path in random.Random(seed).sample(sorted(self.pages), int(len(self.pages) * fraction)):
+            self.pages[path] += 1
+
+    def body(self, path: str) -> bytes:
+        names = sorted(self.pages)
+        if path == "/":
+            links = names[:10]
+        else:
+            i = names.index(path)
+            links = [names[(i * 7 + k) % len(names)] for k in range(1, 6)]
+        version = self.pages.get(path, 0)
+        seed = int(hashlib.md5(f"{path}/{version}".encode()).hexdigest()[:8], 16)
+        return (f"<html lang='en'><head><title>AI websites {path} v{version}</title>"
+                f"<meta name='description' content='{synthetic_text(seed, 20)}'>"
+                f"<meta name='viewport' content='width=device-width'></head><body><h1>{path}</h1>"
+                + "".join(f"<h2>Section {k}</h2><p>{synthetic_text(seed + k, 150)}</p>" for k in range(6))
+                + "".join(f"<a href='{link}'>{link}</a>" for link in links)
+                + "<img src='/hero.png'></body></html>").encode()
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(site.latency)
+                with site._lock:
+                    site.requests += 1
+                if self.path != "/" and self.path not in site.pages:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = site.body(self.path)
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with site._lock:
+                        site.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                with site._lock:
+                    site.bytes_served += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(usegmt=True))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def run(name: str, site: FakeSite, step) -> None:
+    requests, not_modified, served = site.requests, site.not_modified, site.bytes_served
+    start = time.perf_counter()
+    outcomes = step()
+    print(f"{name:<34}{time.perf_counter() - start:>9.2f}{site.requests - requests:>10}"
+          f"{site.not_modified - not_modified:>7}{(site.bytes_served - served) / 1024:>10.0f}   {outcomes or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--changed", type=float, default=0.1, help="fraction of pages edited between runs")
+    parser.add_argument("--latency", type=float, default=0.02, help="site latency per request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    site = FakeSite(args.pages, args.latency)
+    max_pages = args.pages + 1
+    print(f"{args.pages} pages at {args.latency * 1000:.0f} ms, {args.concurrency} concurrent requests")
+    print(f"{'run':<34}{'time (s)':>9}{'requests':>10}{'304s':>7}{'KB served':>10}   outcomes")
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def uncached():
+            for report in (technical_report, on_page_report):
+                with tempfile.TemporaryDirectory() as scratch:
+                    crawler = SiteCrawler(CrawlStore(Path(scratch)), concurrency=args.concurrency)
+                    crawler.crawl(site.url, max_pages)
+                    report(crawler.store, site_of(site.url))
+
+        run("uncached: crawl per analysis", site, uncached)
+
+        store = CrawlStore(Path(tmp))
+        crawler = SiteCrawler(store, concurrency=args.concurrency)
+
+        def crawl_once(max_age=None):
+            result = crawler.crawl(site.url, max_pages, max_age=max_age)
+            technical_report(store, site_of(site.url))
+            on_page_report(store, site_of(site.url))
+            return dict(result.outcomes)
+
+        run("store: first run", site, crawl_once)
+        run("store: same run, again", site, crawl_once)
+        run("store: next run, unchanged site", site, lambda: crawl_once(max_age=0))
+        site.edit(args.changed)
+        run(f"store: next run, {args.changed:.0%} edited", site, lambda: crawl_once(max_age=0))
+        start = time.perf_counter()
+        for _ in range(10):
+            technical_report(store, site_of(site.url))
+            on_page_report(store, site_of(site.url))
+        print(f"both reports from the index: {(time.perf_counter() - start) / 10 * 1000:.1f} ms")
+        stats = store.stats()
+        print(f"archive: {stats['pages']} pages, {stats['raw_bytes'] / 1024:.0f} KB raw -> {stats['blobs']} blobs, "
+              f"{stats['archive_bytes'] / 1024:.0f} KB on disk")
+    site.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""End-to-end latency of every agent against a scripted model, stub tools and an in-memory vector store.
+
+Each agent runs in a fresh interpreter and is built by its real factory, with
+its model, tools and knowledge replaced. The model is a ``ScriptedModel``
+that first makes the agent's usual tool calls. The tools are stubs that answer
+after ``--tool-latency``. The knowledge is an ``InMemoryVectorDb`` of
+synthetic pages. Sessions and memories go to a scratch database. For each
+agent the benchmark reports:
+
+- the time to import its module and to build it;
+- time to first token and total time of a streamed run (medians over ``--runs``);
+- the tool calls made per run;
+- the process's peak RSS.
+
+``--json`` saves the results and ``--compare`` prints the change against a
+saved run.
+
+    python -m benchmarks.end_to_end --runs 5 --json results.json
+    python -m benchmarks.end_to_end --compare results.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from agents import config
+from agents.registry import AGENT_FACTORIES, list_agents
+
+KNOWLEDGE = "search_knowledge_base"
+
+# The __main__ brief of each agent and the tool calls it typically makes for it
+SCRIPTS: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {
+    "brandscript_architect": (
+        "Develop a comprehensive Brandscript for our new AI-driven analytics service. We are brainspark digital. "
+        "We are targeting small businesses.",
+        [(KNOWLEDGE, "StoryBrand framework character problem guide"), (KNOWLEDGE, "small business analytics")]),
+    "seo_specialist": (
+        "DO an extensive keyword research and develop keyword clusters for the following keywords: "
+        "Website Development, AI, AI Agents",
+        [(KNOWLEDGE, "keyword clustering"), ("meta_search", "AI agents website development"),
+         ("crawl_website", "https://example.com"), ("technical_seo_report", "https://example.com")]),
+    "content_creator": (
+        "Write a 1500-word blog post on the future of AI in web development, targeting the keyword "
+        "'AI-driven web design trends",
+        [(KNOWLEDGE, "BrainSpark services"), ("google_search", "AI-driven web design trends"),
+         ("scrape_website", "https://example.com/ai-web-design")]),
+    "script_writer": (
+        "Write a 30 second video script for SEO guidelines from the SEO Specialist",
+        [(KNOWLEDGE, "video script structure"), ("duckduckgo_search", "SEO video script hooks")]),
+    "social_media_manager": (
+        "Write a social media post for LinkedIn about the latest trends in AI",
+        [("google_search", "latest AI trends"), ("web_search_using_tavily", "LinkedIn AI posts engagement")]),
+    "growth_hacker": (
+        "Conduct a comprehensive analysis of the current state of BrainSpark Digital's AARRR funnel, utilizing "
+        "all available performance data to identify bottlenecks, underperforming areas, and opportunities for "
+        "improvement.",
+        [(KNOWLEDGE, "AARRR funnel benchmarks"), ("google_search", "agency activation rate benchmarks"),
+         ("search_wikipedia", "Growth hacking")]),
+    "product_manager": (
+        "Competitor analysis reports detailing services, pricing, and positioning of other digital agencies",
+        [("google_search", "digital agency pricing tiers"), ("search_wikipedia", "Digital agency")]),
+}
+
+METRICS = ("import_ms", "construct_ms", "ttft_ms", "total_ms", "tool_calls", "peak_rss_mb")
+
+
+def knowledge(pages: int):
+    from agno.knowledge.document import DocumentKnowledgeBase
+
+    from benchmarks.fakes import FakeEmbedder, InMemoryVectorDb, synthetic_pages
+
+    documents = synthetic_pages(pages, words=200)
+    vector_db = InMemoryVectorDb(FakeEmbedder(call_latency=0.02))
+    vector_db.insert(documents)
+    return DocumentKnowledgeBase(documents=documents, vector_db=vector_db, num_documents=5)
+
+
+def worker(agent_id: str, args) -> dict:
+    """Measure one agent in this process; run by ``main`` in a fresh interpreter per agent."""
+    import inspect
+    import resource
+    from importlib import import_module
+    from pathlib import Path
+
+    start = time.perf_counter()
+    module_name, func_name = AGENT_FACTORIES[agent_id].split(":")
+    builder = getattr(import_module(module_name), func_name)
+    import_s = time.perf_counter() - start
+
+    from agno.run.response import RunEvent
+
+    from agents import storage
+    from benchmarks.fakes import ScriptedModel, ScriptStep, stub_tool
+
+    brief, script = SCRIPTS[agent_id]
+    # Sessions and memories go to a scratch database instead of tmp/agents.db
+    scratch = tempfile.mkdtemp()
+    storage._engine = storage.create_storage_engine(Path(scratch, "agents.db"))
+    model = ScriptedModel(script=[ScriptStep(tool, {"query": query}) for tool, query in script],
+                          latency=args.latency, chunk_latency=args.chunk_latency, reply_words=args.reply_words)
+    params = inspect.signature(builder).parameters
+    overrides = {"model": model}
+    if "knowledge" in params:
+        overrides["knowledge"] = knowledge(args.pages)
+    if "tools" in params:
+        overrides["tools"] = [stub_tool(tool, args.tool_latency) for tool in dict.fromkeys(t for t, _ in script)
+                              if tool != KNOWLEDGE]
+
+    start = time.perf_counter()
+    agent = builder(**overrides)
+    construct_s = time.perf_counter() - start
+    agent.debug_mode = args.debug
+
+    ttfts, totals, tool_calls = [], [], []
+    for run in range(args.runs):
+        start = time.perf_counter()
+        first = None
+        for response in agent.run(brief, stream=True, session_id=f"benchmark-{run}"):
+            # The content event is "RunResponse" in agno 1.5 and "RunResponseContent" from 1.6 on
+            if first is None and response.event == RunEvent.run_response.value and response.content:
+                first = time.perf_counter() - start
+        totals.append(time.perf_counter() - start)
+        ttfts.append(first if first is not None else totals[-1])
+        tool_calls.append(len(agent.run_response.tools or []))
+    storage.session_writer().flush()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1 << (20 if sys.platform == "darwin" else 10))
+
+    return {
+        "import_ms": import_s * 1000,
+        "construct_ms": construct_s * 1000,
+        "ttft_ms": statistics.median(ttfts) * 1000,
+        "total_ms": statistics.median(totals) * 1000,
+        "tool_calls": statistics.median(tool_calls),
+        "model_calls": model.calls / args.runs,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def measure(agent_id: str, argv: List[str]) -> dict:
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.end_to_end", "--worker", agent_id, *argv],
+                          cwd=config.ROOT_DIR, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed"}
+    return json.loads(lines[-1])
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print(f"\nchange against the baseline ({baseline.get('_meta', {}).get('created', 'unknown')})")
+    print(f"{'agent':<24}" + "".join(f"{m:>14}" for m in METRICS))
+    for agent_id, result in results.items():
+        before = baseline.get("agents", {}).get(agent_id)
+        if not before or "error" in result or "error" in before:
+            continue
+        cells = []
+        for metric in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            cells.append(f"{(new - old) / old:>+14.0%}" if old else f"{'-':>14}")
+        print(f"{agent_id:<24}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agents", nargs="*", default=list_agents())
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3, help="scripted model time to first token")
+    parser.add_argument("--chunk-latency", type=float, default=0.01, help="scripted model delay per streamed chunk")
+    parser.add_argument("--reply-words", type=int, default=300)
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="stub tool latency")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages in each knowledge base")
+    parser.add_argument("--debug", action="store_true", help="keep the agents' agno debug logging on")
+    parser.add_argument("--json", dest="json_path", help="save the results here")
+    parser.add_argument("--compare", metavar="JSON", help="results of an earlier run to compare against")
+    parser.add_argument("--worker", metavar="AGENT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args)))
+        return
+
+    argv = [f"--runs={args.runs}", f"--latency={args.latency}", f"--chunk-latency={args.chunk_latency}",
+            f"--reply-words={args.reply_words}", f"--tool-latency={args.tool_latency}", f"--pages={args.pages}"]
+    argv += ["--debug"] if args.debug else []
+    results: Dict[str, dict] = {}
+    print(f"{args.runs} streamed runs per agent, model {args.latency * 1000:.0f} ms to first token, "
+          f"tools {args.tool_latency * 1000:.0f} ms")
+    print(f"{'agent':<24}{'import (ms)':>12}{'build (ms)':>12}{'TTFT (ms)':>11}{'total (ms)':>12}"
+          f"{'tool calls':>12}{'peak RSS (MB)':>15}")
+    for agent_id in args.agents:
+        if agent_id not in SCRIPTS:
+            parser.error(f"unknown agent '{agent_id}'")
+        r = results[agent_id] = measure(agent_id, argv)
+        if "error" in r:
+            print(f"{agent_id:<24}{r['error']}")
+            continue
+        print(f"{agent_id:<24}{r['import_ms']:>12.0f}{r['construct_ms']:>12.0f}{r['ttft_ms']:>11.0f}"
+              f"{r['total_ms']:>12.0f}{r['tool_calls']:>12.0f}{r['peak_rss_mb']:>15.0f}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.json_path:
+        meta = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                "argv": argv}
+        with open(args.json_path, "w") as f:
+            json.dump({"_meta": meta, "agents": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
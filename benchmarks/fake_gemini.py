@@ -0,0 +1,184 @@
+"""A local stand-in for the Gemini REST API with per-key quotas.
+
+Serves ``generateContent``, ``streamGenerateContent`` (SSE),
+``batchEmbedContents`` and ``cachedContents`` for any model. Each API key may make ``rpm`` requests
+per model per ``window`` seconds; beyond that it answers 429
+``RESOURCE_EXHAUSTED`` like the real API. Replies take ``latency`` seconds
+plus ``token_latency`` per 1000 prompt tokens and carry ``reply_words`` of
+filler. Prompt tokens held in cached content cost a quarter of that and are
+reported as ``cachedContentTokenCount``. Point a google-genai client at it with
+``GEMINI_BASE_URL=http://127.0.0.1:<port>``.
+
+    python -m benchmarks.fake_gemini --port 8765 --rpm 15 --window 60
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fakes import fake_vector, synthetic_text
+
+
+class FakeGemini:
+    def __init__(self, rpm: int = 15, window: float = 60.0, latency: float = 0.05,
+                 rpm_per_model: Optional[Dict[str, int]] = None, host: str = "127.0.0.1", port: int = 0,
+                 token_latency: float = 0.0, reply_words: int = 0):
+        self.rpm = rpm
+        self.token_latency = token_latency
+        self.reply_words = reply_words
+        self.rpm_per_model = rpm_per_model or {}
+        self.window = window
+        self.latency = latency
+        self.requests = defaultdict(deque)
+        self.served = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.caches: Dict[str, int] = {}
+        self.caches_created = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGemini":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def drop_caches(self) -> None:
+        """Forget every cached content, as if they had all expired."""
+        with self._lock:
+            self.caches.clear()
+
+    def admit(self, key: str, model: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            window = self.requests[(key, model)]
+            while window and window[0] <= now - self.window:
+                window.popleft()
+            if len(window) >= self.rpm_per_model.get(model, self.rpm):
+                self.rejected[key] += 1
+                return False
+            window.append(now)
+            self.served[key] += 1
+            return True
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                key = self.headers.get("x-goog-api-key") or parse_qs(url.query).get("key", [""])[0]
+                model, _, method = url.path.rsplit("/", 1)[-1].partition(":")
+                if model == "cachedContents":
+                    self._create_cache(body)
+                    return
+                prompt = json.dumps([body.get("systemInstruction"), body.get("tools"), body.get("contents", [])])
+                cached = 0
+                if body.get("cachedContent"):
+                    cached = fake.caches.get(body["cachedContent"], -1)
+                    if cached < 0:
+                        self._send(403, {"error": {"code": 403, "status": "PERMISSION_DENIED",
+                                                   "message": f"CachedContent not found: {body['cachedContent']}"}})
+                        return
+                time.sleep(fake.latency + (len(prompt) / 4000 + cached / 4000) * fake.token_latency)
+                if not fake.admit(key, model):
+                    self._send(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                                               "message": "Resource has been exhausted (e.g. check quota)."}})
+                    return
+                if method == "batchEmbedContents":
+                    embeddings = []
+                    for request in body.get("requests", []):
+                        text = " ".join(p.get("text", "") for p in request.get("content", {}).get("parts", []))
+                        dimensions = request.get("outputDimensionality") or 768
+                        embeddings.append({"values": fake_vector(text, dimensions)})
+                    self._send(200, {"embeddings": embeddings})
+                elif method in ("generateContent", "streamGenerateContent"):
+                    text = f"ok ({len(prompt)})"
+                    if fake.reply_words:
+                        text += " " + synthetic_text(len(prompt), fake.reply_words)
+                    reply = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                             "finishReason": "STOP", "index": 0}],
+                             "usageMetadata": {"promptTokenCount": len(prompt) // 4 + cached,
+                                               "cachedContentTokenCount": cached, "candidatesTokenCount": 2,
+                                               "totalTokenCount": len(prompt) // 4 + cached + 2}}
+                    if method == "generateContent":
+                        self._send(200, reply)
+                        return
+                    data = f"data: {json.dumps(reply)}\r\n\r\n".encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send(404, {"error": {"code": 404, "status": "NOT_FOUND", "message": method}})
+
+            def _create_cache(self, body: dict):
+                tokens = len(json.dumps([body.get("systemInstruction"), body.get("tools"),
+                                         body.get("contents")])) // 4
+                with fake._lock:
+                    fake.caches_created += 1
+                    name = f"cachedContents/{fake.caches_created}"
+                    fake.caches[name] = tokens
+                ttl = float(body.get("ttl", "3600s").rstrip("s"))
+                expires = datetime.fromtimestamp(time.time() + ttl, timezone.utc).isoformat().replace("+00:00", "Z")
+                self._send(200, {"name": name, "model": body.get("model"), "displayName": body.get("displayName"),
+                                 "expireTime": expires, "usageMetadata": {"totalTokenCount": tokens}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=15)
+    parser.add_argument("--window", type=float, default=60.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    fake = FakeGemini(args.rpm, args.window, args.latency, port=args.port)
+    print(f"Fake Gemini at {fake.url} ({args.rpm} requests per key per model per {args.window:.0f}s)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
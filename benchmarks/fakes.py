@@ -0,0 +1,466 @@
+"""Offline stand-ins for Gemini, Qdrant and the agents' tools used by the benchmarks."""
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from hashlib import md5
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from agno.document.base import Document
+from agno.embedder.base import Embedder
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+from agno.vectordb.base import VectorDb
+
+WORDS = ("seo keyword cluster content growth funnel acquisition activation retention revenue referral "
+         "brand script character problem guide plan success failure analytics small business data "
+         "insight dashboard experiment hypothesis metric traffic ranking backlink crawl sitemap").split()
+
+
+def synthetic_text(seed: int, words: int = 400) -> str:
+    rng = random.Random(seed)
+    sentences = []
+    while words > 0:
+        n = min(words, rng.randint(8, 20))
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + ".")
+        words -= n
+    return " ".join(sentences)
+
+
+def synthetic_pages(count: int, words: int = 400, name: str = "synthetic") -> List[Document]:
+    return [Document(name=name, id=f"{name}_{i}", content=synthetic_text(i, words), meta_data={"page": i})
+            for i in range(1, count + 1)]
+
+
+def synthetic_pdf(path, pages: int, words: int = 400, seed: int = 0, line_words: int = 12) -> None:
+    """Write a text-only PDF of ``pages`` pages of ``synthetic_text``, one Helvetica line per ``line_words``."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = synthetic_text(seed * 100003 + page, words).split()
+        lines = [" ".join(text[i:i + line_words]) for i in range(0, len(text), line_words)]
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream.encode("latin-1")))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids).encode(), pages)
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def fake_vector(text: str, dimensions: int) -> List[float]:
+    rng = random.Random(md5(text.encode()).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@dataclass
+class FakeEmbedder(Embedder):
+    """Deterministic embedder that sleeps like a remote API: a round trip per call plus a cost per text."""
+
+    id: str = "fake-embedding"
+    dimensions: int = 768
+    call_latency: float = 0.05
+    per_text_latency: float = 0.0005
+    calls: int = 0
+    texts: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def _count(self, n: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.texts += n
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        self._count(1)
+        time.sleep(self.call_latency + self.per_text_latency)
+        return fake_vector(text, self.dimensions), None
+
+    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        self._count(len(texts))
+        time.sleep(self.call_latency + self.per_text_latency * len(texts))
+        return [fake_vector(text, self.dimensions) for text in texts]
+
+
+@dataclass
+class FakeMatryoshkaEmbedder(Embedder):
+    """Offline bag-of-words embedder whose leading dimensions carry most of the similarity.
+
+    Each word is a fixed random vector scaled by ``1 / sqrt(1 + i / decay)`` at
+    dimension ``i``, so texts sharing words are close and truncated vectors
+    rank roughly like full ones, as with a Matryoshka-trained model.
+    """
+
+    id: str = "fake-matryoshka"
+    dimensions: int = 768
+    decay: float = 32.0
+
+    def __post_init__(self):
+        import numpy as np
+
+        self._weights = 1 / np.sqrt(1 + np.arange(self.dimensions) / self.decay)
+        self._words = {}
+
+    def _word(self, word: str):
+        vector = self._words.get(word)
+        if vector is None:
+            import numpy as np
+
+            seed = int.from_bytes(md5(word.encode()).digest()[:8], "little")
+            vector = self._words[word] = np.random.default_rng(seed).standard_normal(self.dimensions) * self._weights
+        return vector
+
+    def get_embedding(self, text: str) -> List[float]:
+        from agents.bm25 import tokenize
+
+        vector = sum((self._word(word) for word in tokenize(text)), start=self._weights * 0)
+        norm = float((vector * vector).sum()) ** 0.5 or 1.0
+        return (vector / norm).tolist()
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self.get_embedding(text) for text in texts]
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a)) or 1.0
+    nb = math.sqrt(sum(y * y for y in b)) or 1.0
+    return dot / (na * nb)
+
+
+class InMemoryVectorDb(VectorDb):
+    """Dict-backed vector DB with a simulated round trip per write and per search."""
+
+    def __init__(self, embedder: Optional[Embedder] = None, collection: str = "memory",
+                 write_latency: float = 0.02, search_latency: float = 0.02):
+        self.embedder = embedder or FakeEmbedder(call_latency=0.0, per_text_latency=0.0)
+        self.collection = collection
+        self.write_latency = write_latency
+        self.search_latency = search_latency
+        self.points: Dict[str, Tuple[Document, List[float]]] = {}
+        self.write_calls = 0
+        self.search_calls = 0
+        self._created = False
+        self._lock = threading.Lock()
+
+    def _write(self, documents: List[Document], embed: bool) -> None:
+        from agents.ingestion import chunk_id
+
+        time.sleep(self.write_latency)
+        for document in documents:
+            if embed or not document.embedding:
+                document.embed(embedder=self.embedder)
+            with self._lock:
+                self.points[chunk_id(document.content)] = (document, document.embedding)
+        with self._lock:
+            self.write_calls += 1
+
+    def upsert_embedded(self, documents: List[Document]) -> None:
+        self._write(documents, embed=False)
+
+    def delete_ids(self, ids: List[str]) -> None:
+        with self._lock:
+            for point_id in ids:
+                self.points.pop(point_id, None)
+
+    def create(self) -> None:
+        self._created = True
+
+    async def async_create(self) -> None:
+        self.create()
+
+    def doc_exists(self, document: Document) -> bool:
+        from agents.ingestion import chunk_id
+
+        return chunk_id(document.content) in self.points
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return self.doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return any(doc.name == name for doc, _ in self.points.values())
+
+    async def async_name_exists(self, name: str) -> bool:
+        return self.name_exists(name)
+
+    def id_exists(self, id: str) -> bool:
+        return id in self.points
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, embed=True)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.upsert(documents, filters)
+
+    def search_by_vector(self, vector: List[float], limit: int = 5,
+                         filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return self.search_by_vectors([vector], limit, filters)[0]
+
+    def search_by_vectors(self, vectors: List[List[float]], limit: int = 5,
+                          filters: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """One simulated round trip for the whole batch, like Qdrant's ``query_batch_points``."""
+        time.sleep(self.search_latency)
+        with self._lock:
+            self.search_calls += 1
+            points = list(self.points.values())
+        return [[doc for doc, _ in sorted(points, key=lambda p: cosine(vector, p[1]), reverse=True)[:limit]]
+                for vector in vectors]
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return self.search_by_vector(self.embedder.get_embedding(query), limit)
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        # Off the event loop, as the real stores' wrappers do
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    def keyword_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    def hybrid_search(self, query: str, limit: int = 5) -> List[Document]:
+        return self.search(query, limit)
+
+    def drop(self) -> None:
+        self.points.clear()
+        self._created = False
+
+    async def async_drop(self) -> None:
+        self.drop()
+
+    def exists(self) -> bool:
+        return self._created
+
+    async def async_exists(self) -> bool:
+        return self.exists()
+
+    def optimize(self) -> None:
+        pass
+
+    def delete(self) -> bool:
+        self.points.clear()
+        return True
+
+
+@dataclass
+class FakeMemoryManager:
+    """Stands in for agno's ``MemoryManager``: sleeps like its model call, then stores the user's words as a memory."""
+
+    def __init__(self, latency: float = 1.0):
+        self.model = None
+        self.latency = latency
+        self.calls = 0
+        self.existing_chars: List[int] = []
+
+    def create_or_update_memories(self, messages: List[Message], existing_memories: List[Dict[str, Any]], user_id: str,
+                                  db, delete_memories: bool = True, clear_memories: bool = True) -> str:
+        from datetime import datetime
+
+        from agno.memory.v2.db.schema import MemoryRow
+        from agno.memory.v2.schema import UserMemory
+
+        self.calls += 1
+        self.existing_chars.append(sum(len(m["memory"]) for m in existing_memories))
+        time.sleep(self.latency)
+        memory = UserMemory(memory=" ".join(m.get_content_string() for m in messages if m.role == "user"),
+                            last_updated=datetime.now())
+        db.upsert_memory(MemoryRow(user_id=user_id, memory=memory.to_dict(), last_updated=memory.last_updated))
+        return "Added 1 memory"
+
+
+@dataclass
+class _Reply:
+    content: str
+
+
+class FakeChunkingModel:
+    """Answers AgenticChunking's breakpoint prompt with the last sentence end that fits, after a delay."""
+
+    id = "fake-chunking-model"
+
+    def __init__(self, latency: float = 0.3, max_chunk_size: int = 5000):
+        self.latency = latency
+        self.max_chunk_size = max_chunk_size
+        self.calls = 0
+
+    def response(self, messages, **kwargs) -> _Reply:
+        self.calls += 1
+        time.sleep(self.latency)
+        prompt = messages[-1].content if hasattr(messages[-1], "content") else str(messages[-1])
+        window = prompt[-self.max_chunk_size:]
+        breakpoint = window.rfind(". ") + 1
+        return _Reply(content=str(breakpoint if breakpoint > 0 else len(window)))
+
+
+class StubSearchProvider:
+    """A search engine that answers after ``latency`` (+/- ``jitter``) seconds.
+
+    Results come from a shared pool of URLs per query, so engines overlap the
+    way real ones do and merging has duplicates to remove.
+    """
+
+    def __init__(self, name: str, latency: float = 0.8, jitter: float = 0.4, overlap: float = 0.5):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.overlap = overlap
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str, max_results: int) -> List[dict]:
+        with self._lock:
+            self.calls += 1
+        rng = random.Random(md5(f"{self.name}/{query}".encode()).digest())
+        time.sleep(max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter)))
+        slug = "-".join(query.lower().split())
+        results = []
+        for rank in range(max_results):
+            if rng.random() < self.overlap:
+                url = f"https://www.example.com/{slug}/{rng.randint(0, max_results)}?utm_source={self.name}"
+            else:
+                url = f"https://{self.name}.example.org/{slug}/{rank}"
+            results.append({"url": url, "title": f"{query} ({self.name} #{rank + 1})",
+                            "snippet": synthetic_text(rank, 30)})
+        return results
+
+
+@dataclass
+class ScriptStep:
+    tool: str
+    arguments: Dict[str, Any]
+
+
+@dataclass
+class _Turn:
+    content: Optional[str] = None
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _offered(tools) -> set:
+    return {t.get("function", {}).get("name") for t in tools or []}
+
+
+@dataclass
+class ScriptedModel(Model):
+    """A chat model that plays ``script`` and then writes ``reply_words`` of filler.
+
+    Within a run, each call makes the next scripted tool call among the tools it
+    is offered (so memory and summary calls, which offer other tools, get a plain
+    reply). It waits ``latency`` before the first token and ``chunk_latency``
+    between streamed chunks of ``chunk_words`` words.
+    """
+
+    id: str = "scripted"
+    name: str = "ScriptedModel"
+    provider: str = "Fake"
+    script: List[ScriptStep] = field(default_factory=list)
+    latency: float = 0.2
+    chunk_latency: float = 0.01
+    chunk_words: int = 8
+    reply_words: int = 200
+    calls: int = 0
+
+    def _next(self, messages: List[Message], tools) -> _Turn:
+        self.calls += 1
+        last_user = max((i for i, m in enumerate(messages) if m.role == "user"), default=-1)
+        done = sum(1 for m in messages[last_user + 1:] if m.role == "assistant" and m.tool_calls)
+        steps = [step for step in self.script if step.tool in _offered(tools)]
+        if done < len(steps):
+            step = steps[done]
+            return _Turn(tool_calls=[{"id": f"call_{self.calls}", "type": "function",
+                                      "function": {"name": step.tool, "arguments": json.dumps(step.arguments)}}])
+        return _Turn(content=synthetic_text(len(messages), self.reply_words))
+
+    def _duration(self, turn: _Turn) -> float:
+        """How long a non-streamed call takes: the first token, then the rest of the reply."""
+        return self.latency + (self.chunk_latency * self.reply_words / self.chunk_words if turn.content else 0.0)
+
+    def invoke(self, messages, response_format=None, tools=None, tool_choice=None) -> _Turn:
+        turn = self._next(messages, tools)
+        time.sleep(self._duration(turn))
+        return turn
+
+    async def ainvoke(self, messages, response_format=None, tools=None, tool_choice=None) -> _Turn:
+        import asyncio
+
+        turn = self._next(messages, tools)
+        await asyncio.sleep(self._duration(turn))
+        return turn
+
+    def _chunks(self, turn: _Turn) -> Iterator[_Turn]:
+        if turn.tool_calls:
+            yield turn
+            return
+        words = turn.content.split(" ")
+        for start in range(0, len(words), self.chunk_words):
+            yield _Turn(content=" ".join(words[start:start + self.chunk_words]) + " ")
+
+    def invoke_stream(self, messages, response_format=None, tools=None, tool_choice=None) -> Iterator[_Turn]:
+        turn = self._next(messages, tools)
+        time.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(turn)):
+            if i:
+                time.sleep(self.chunk_latency)
+            yield chunk
+
+    async def ainvoke_stream(self, messages, response_format=None, tools=None, tool_choice=None):
+        import asyncio
+
+        turn = self._next(messages, tools)
+        await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(turn)):
+            if i:
+                await asyncio.sleep(self.chunk_latency)
+            yield chunk
+
+    def parse_provider_response(self, response: _Turn, **kwargs) -> ModelResponse:
+        return ModelResponse(role="assistant", content=response.content, tool_calls=list(response.tool_calls))
+
+    def parse_provider_response_delta(self, response: _Turn) -> ModelResponse:
+        return ModelResponse(role="assistant", content=response.content, tool_calls=list(response.tool_calls))
+
+
+def stub_tool(name: str, latency: float = 0.1, words: int = 150) -> Callable[..., str]:
+    """A tool called ``name`` that returns ``words`` of search-like results after ``latency`` seconds."""
+
+    def tool(query: str) -> str:
+        time.sleep(latency)
+        seed = int(md5(f"{name}/{query}".encode()).hexdigest()[:8], 16)
+        return json.dumps([{"title": f"{query} #{rank + 1}", "url": f"https://example.com/{name}/{rank}",
+                            "content": synthetic_text(seed + rank, words // 5)} for rank in range(5)])
+
+    tool.__name__ = name
+    tool.__doc__ = f"Stand-in for {name}.\n\nArgs:\n    query: What to look up.\n"
+    return tool
@@ -0,0 +1,83 @@
+"""Prompt size and latency over a long session, with and without history windowing.
+
+One agent holds a ``--turns`` turn conversation with ``benchmarks.fake_gemini``,
+which answers with ``--reply-words`` of text and takes longer the longer the
+prompt is. "all runs" sends the whole session every turn, "last 3 runs" is
+agno's default ``num_history_runs``, and "windowed" is ``HistoryMemory`` with a
+``--budget`` token window and a rolling summary made by the same fake model.
+
+    python -m benchmarks.history --turns 100 --budget 4000
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agno.agent import Agent
+from agno.memory.v2.memory import Memory
+from agno.models.google import Gemini
+from agno.storage.sqlite import SqliteStorage
+
+from agents import config
+from agents.history import HistoryMemory, HistorySummarizer, covered_runs
+from benchmarks.fake_gemini import FakeGemini
+from benchmarks.fakes import synthetic_text
+
+
+def model(url: str, id: str = config.CHAT_MODEL_ID) -> Gemini:
+    from google.genai import types
+
+    return Gemini(id=id, api_key="fake-key", client_params={"http_options": types.HttpOptions(base_url=url)})
+
+
+def converse(agent: Agent, turns: int, words: int):
+    prompts, latencies = [], []
+    for turn in range(turns):
+        start = time.perf_counter()
+        response = agent.run(f"Turn {turn}: " + synthetic_text(turn, words), session_id="benchmark")
+        latencies.append(time.perf_counter() - start)
+        prompts.append(sum(response.metrics.get("input_tokens", [0])))
+    return prompts, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=4000, help="HistoryMemory token budget")
+    parser.add_argument("--words", type=int, default=60, help="words per user message")
+    parser.add_argument("--reply-words", type=int, default=250)
+    parser.add_argument("--token-latency", type=float, default=0.01, help="fake latency per 1000 prompt tokens")
+    args = parser.parse_args()
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+
+    with FakeGemini(rpm=100_000, latency=0.01, token_latency=args.token_latency,
+                    reply_words=args.reply_words) as fake, tempfile.TemporaryDirectory() as tmp:
+        setups = {
+            "all runs": dict(memory=Memory(), num_history_runs=None),
+            "last 3 runs": dict(memory=Memory()),
+            f"windowed ({args.budget})": dict(memory=HistoryMemory(
+                history_tokens=args.budget, summarizer=HistorySummarizer(model(fake.url, config.HISTORY_SUMMARY_MODEL_ID)))),
+        }
+        print(f"{args.turns} turns, {args.words}-word messages, {args.reply_words}-word replies")
+        print(f"{'history':<18}{'turn 10':>9}{'turn 50':>9}{'last':>9}{'mean':>9}   prompt tokens"
+              f"{'p50 (s)':>11}{'last 10 (s)':>13}{'total (s)':>11}")
+        for name, setup in setups.items():
+            storage = SqliteStorage(table_name=name.split()[0], db_file=str(Path(tmp, "history.db")))
+            agent = Agent(model=model(fake.url), storage=storage, add_history_to_messages=True,
+                          user_id=config.USER_ID, **setup)
+            prompts, latencies = converse(agent, args.turns, args.words)
+            marks = [prompts[min(i, len(prompts)) - 1] for i in (10, 50, len(prompts))]
+            print(f"{name:<18}" + "".join(f"{m:>9}" for m in marks) + f"{statistics.mean(prompts):>9.0f}"
+                  + " " * 16 + f"{statistics.median(latencies):>11.3f}{statistics.mean(latencies[-10:]):>13.3f}"
+                  f"{sum(latencies):>11.1f}")
+        memory = setups[f"windowed ({args.budget})"]["memory"]
+        summary = memory.session_summary("benchmark")
+        if summary is not None:
+            print(f"windowed: the summary ({len(summary.summary) // 4} tokens) covers "
+                  f"{covered_runs(memory.runs['benchmark'], summary)} of {args.turns} runs")
+
+
+if __name__ == "__main__":
+    main()
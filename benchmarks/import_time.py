@@ -0,0 +1,66 @@
+"""Cold-start benchmark for each registered agent.
+
+Every agent is measured in a fresh interpreter so module caches from one agent
+don't hide the cost of another:
+
+    python -m benchmarks.import_time [agent_id ...] [--json results.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from agents import config
+from agents.registry import AGENT_FACTORIES, list_agents
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import agents.registry as registry
+module_name, func_name = registry.AGENT_FACTORIES[sys.argv[1]].split(":")
+__import__(module_name)
+t1 = time.perf_counter()
+result = {"import_s": t1 - t0, "modules_after_import": len(sys.modules)}
+try:
+    registry.get_agent(sys.argv[1])
+    result["construct_s"] = time.perf_counter() - t1
+    result["modules_after_construct"] = len(sys.modules)
+except Exception as e:
+    result["error"] = f"{type(e).__name__}: {e}"
+print(json.dumps(result))
+"""
+
+
+def measure(agent_id: str) -> dict:
+    proc = subprocess.run([sys.executable, "-c", PROBE, agent_id],
+                          cwd=config.ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "probe failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("agents", nargs="*", default=list_agents())
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'agent':<24}{'import (ms)':>14}{'construct (ms)':>16}  modules")
+    for agent_id in args.agents:
+        if agent_id not in AGENT_FACTORIES:
+            parser.error(f"unknown agent '{agent_id}'")
+        r = results[agent_id] = measure(agent_id)
+        construct = f"{r['construct_s'] * 1000:>16.1f}" if "construct_s" in r else f"{'-':>16}"
+        imported = f"{r['import_s'] * 1000:>14.1f}" if "import_s" in r else f"{'-':>14}"
+        print(f"{agent_id:<24}{imported}{construct}  {r.get('modules_after_construct', r.get('modules_after_import', '-'))}")
+        if "error" in r:
+            print(f"    {r['error']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
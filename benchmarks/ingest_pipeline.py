@@ -0,0 +1,72 @@
+"""Serial vs. pipelined knowledge ingestion against a fake embedder and in-memory vector store.
+
+The serial path mirrors ``AgentKnowledge.load``: every page's chunks are
+upserted together and every chunk is embedded with its own request.
+
+    python -m benchmarks.ingest_pipeline --pages 200 --batch-sizes 16 64
+    python -m benchmarks.ingest_pipeline --pdfs      # the PDFs under knowledge/
+"""
+import argparse
+import time
+
+from agno.document.chunking.fixed import FixedSizeChunking
+
+from agents import config
+from agents.ingest_pipeline import PipelineConfig, run_pipeline
+from benchmarks.fakes import FakeEmbedder, InMemoryVectorDb, synthetic_pages
+
+
+def load_pages(args):
+    if not args.pdfs:
+        return synthetic_pages(args.pages)
+    from agno.knowledge.pdf import PDFReader
+
+    reader = PDFReader(chunk=False)
+    pages = []
+    for path in sorted(config.KNOWLEDGE_DIR.rglob("*.pdf")):
+        pages.extend(reader.read(path))
+    return pages
+
+
+def serial(pages, chunker, vector_db):
+    start = time.perf_counter()
+    for page in pages:
+        vector_db.upsert(chunker.chunk(page))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--pdfs", action="store_true", help="ingest knowledge/**/*.pdf instead of synthetic pages")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="simulated round trip per embed call")
+    parser.add_argument("--write-latency", type=float, default=0.02, help="simulated round trip per upsert")
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    chunker = FixedSizeChunking(chunk_size=args.chunk_size)
+    print(f"{len(pages)} pages, chunk_size={args.chunk_size}, embed latency={args.embed_latency * 1000:.0f}ms, "
+          f"write latency={args.write_latency * 1000:.0f}ms")
+    print(f"{'mode':<28}{'seconds':>10}{'embed calls':>14}{'upserts':>10}{'chunks/s':>12}")
+
+    embedder = FakeEmbedder(call_latency=args.embed_latency)
+    vector_db = InMemoryVectorDb(embedder=embedder, write_latency=args.write_latency)
+    seconds = serial(pages, chunker, vector_db)
+    chunks = len(vector_db.points)
+    print(f"{'serial':<28}{seconds:>10.2f}{embedder.calls:>14}{vector_db.write_calls:>10}{chunks / seconds:>12.1f}")
+
+    for batch_size in args.batch_sizes:
+        embedder = FakeEmbedder(call_latency=args.embed_latency)
+        vector_db = InMemoryVectorDb(embedder=embedder, write_latency=args.write_latency)
+        stats = run_pipeline(((page.id, page) for page in pages), chunker.chunk, embedder, vector_db,
+                             PipelineConfig(embed_batch_size=batch_size, embed_concurrency=args.concurrency))
+        label = f"pipeline batch={batch_size} x{args.concurrency}"
+        print(f"{label:<28}{stats.seconds:>10.2f}{embedder.calls:>14}{vector_db.write_calls:>10}"
+              f"{stats.chunks / stats.seconds:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Pinned keys vs. the shared key pool against a simulated Gemini quota.
+
+Every agent makes ``--calls`` chat calls at once through agno's ``Gemini``
+model against ``benchmarks.fake_gemini``, which allows ``--rpm`` requests per
+key per ``--window`` seconds. "pinned" uses each agent's hard-wired key (two
+agents share 3DCNNGEMINI and two share 5DCNNGEMINI) and retries 429s on that
+key with exponential backoff; "pooled" routes through ``agents.keypool``.
+
+    python -m benchmarks.key_pool --calls 20 --rpm 10 --window 2
+"""
+import argparse
+import logging
+import threading
+import time
+from collections import Counter
+
+from agno.models.google import Gemini
+from agno.models.message import Message
+
+from agents import config
+from agents.keypool import KeyPool, PooledGemini, is_rate_limit
+from benchmarks.fake_gemini import FakeGemini
+
+PINNED_KEYS = {
+    "brandscript_architect": "1DCNNGEMINI",
+    "seo_specialist": "2DCNNGEMINI",
+    "content_creator": "3DCNNGEMINI",
+    "growth_hacker": "3DCNNGEMINI",
+    "script_writer": "4DCNNGEMINI",
+    "social_media_manager": "5DCNNGEMINI",
+    "product_manager": "5DCNNGEMINI",
+}
+KEYS = {env: f"fake-key-{env}" for env in sorted(set(PINNED_KEYS.values()))}
+
+
+def client_factory(url: str):
+    from google import genai
+    from google.genai import types
+
+    return lambda api_key: genai.Client(api_key=api_key, http_options=types.HttpOptions(base_url=url))
+
+
+def pinned_model(url: str, key_env: str) -> Gemini:
+    from google.genai import types
+
+    return Gemini(id=config.CHAT_MODEL_ID, api_key=KEYS[key_env],
+                  client_params={"http_options": types.HttpOptions(base_url=url)})
+
+
+def run_calls(model, agent_id: str, calls: int, retry_same_key: bool, latencies: list, failures: list):
+    for i in range(calls):
+        start = time.perf_counter()
+        for attempt in range(12):
+            try:
+                model.invoke([Message(role="user", content=f"{agent_id} request {i}")])
+                break
+            except Exception as e:
+                if not (retry_same_key and is_rate_limit(e)):
+                    failures.append(f"{type(e).__name__}: {e}")
+                    break
+                time.sleep(min(8.0, 0.25 * 2 ** attempt))
+        latencies.append(time.perf_counter() - start)
+
+
+def measure(name: str, fake: FakeGemini, models: dict, calls: int, retry_same_key: bool):
+    served_before, rejected_before = Counter(fake.served), Counter(fake.rejected)
+    latencies, failures = [], []
+    threads = [threading.Thread(target=run_calls, args=(model, agent_id, calls, retry_same_key, latencies, failures))
+               for agent_id, model in models.items()]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    served = Counter(fake.served) - served_before
+    rejected = sum((Counter(fake.rejected) - rejected_before).values())
+    latencies.sort()
+    print(f"{name:<8}{seconds:>9.2f}{sum(served.values()) / seconds:>11.1f}{rejected:>7}{len(failures):>10}"
+          f"{latencies[int(len(latencies) * 0.95) - 1]:>10.2f}   "
+          + " ".join(f"{served.get(k, 0):>3}" for k in KEYS.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="chat calls per agent")
+    parser.add_argument("--rpm", type=int, default=10, help="requests per key per window")
+    parser.add_argument("--window", type=float, default=2.0, help="quota window in seconds")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake endpoint latency per request")
+    args = parser.parse_args()
+    # agno logs every 429 it raises; the table below counts them
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+
+    with FakeGemini(rpm=args.rpm, window=args.window, latency=args.latency) as fake:
+        print(f"{len(PINNED_KEYS)} agents x {args.calls} calls, {len(KEYS)} keys at {args.rpm} requests "
+              f"per {args.window:g}s each")
+        print(f"{'mode':<8}{'total (s)':>9}{'calls/s':>11}{'429s':>7}{'failures':>10}{'p95 (s)':>10}   "
+              f"calls served per key (1..{len(KEYS)})")
+        measure("pinned", fake, {a: pinned_model(fake.url, k) for a, k in PINNED_KEYS.items()}, args.calls, True)
+        # Let the quota window drain before the next run
+        time.sleep(args.window)
+        pool = KeyPool(KEYS, limits={config.CHAT_MODEL_ID: (args.rpm, None), "default": (args.rpm, None)},
+                       client_factory=client_factory(fake.url), window=args.window, base_backoff=0.25)
+        measure("pooled", fake, {a: PooledGemini(id=config.CHAT_MODEL_ID, pool=pool) for a in PINNED_KEYS},
+                args.calls, False)
+
+
+if __name__ == "__main__":
+    main()
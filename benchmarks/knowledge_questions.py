@@ -0,0 +1,84 @@
+"""Several knowledge-base questions: one tool call each vs. one batched ``search_knowledge_questions``.
+
+The knowledge base is ``--chunks`` synthetic chunks in an ``InMemoryVectorDb``
+that sleeps ``--search-latency`` per round trip (a batch of vectors is one
+round trip, as with Qdrant's ``query_batch_points``). It is wrapped in a
+``HybridVectorDb`` as the agents' collections are. The embedder sleeps
+``--embed-latency`` per call. Each question is a word window from one of a few
+chunks, so the questions of a session overlap like an agent's do. "one call
+per question" is what ``search_knowledge_base`` costs today, question after
+question. "batched" is ``KnowledgeSearchTools.search``.
+
+    python -m benchmarks.knowledge_questions --questions 6 --sessions 5
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agents.bm25 import BM25Index
+from agents.toolkits.knowledge import KnowledgeSearchTools
+from agents.vectorstores.hybrid import HybridVectorDb
+from benchmarks.fakes import FakeEmbedder, InMemoryVectorDb, synthetic_pages
+
+
+def sessions(documents: list, count: int, questions: int, topics: int, words: int):
+    """Each session asks ``questions`` questions about ``topics`` chunks."""
+    rng = random.Random(0)
+    for _ in range(count):
+        asked = []
+        for document in rng.choices(rng.sample(documents, topics), k=questions):
+            tokens = document.content.split()
+            start = rng.randrange(max(1, len(tokens) - words))
+            asked.append(" ".join(tokens[start:start + words]))
+        yield asked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=6)
+    parser.add_argument("--topics", type=int, default=3, help="distinct chunks the questions of a session are about")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--embed-latency", type=float, default=0.15)
+    parser.add_argument("--search-latency", type=float, default=0.04)
+    args = parser.parse_args()
+
+    from agno.knowledge.agent import AgentKnowledge
+
+    embedder = FakeEmbedder(call_latency=args.embed_latency, per_text_latency=0.0)
+    documents = synthetic_pages(args.chunks, words=60)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Loaded with a zero-latency embedder; the simulated one only answers questions
+        store = InMemoryVectorDb(embedder=FakeEmbedder(call_latency=0.0, per_text_latency=0.0), write_latency=0.0,
+                                 search_latency=args.search_latency)
+        vector_db = HybridVectorDb(store, index=BM25Index(Path(tmp, "bm25.json")))
+        vector_db.upsert(documents)
+        store.embedder = embedder
+        knowledge = AgentKnowledge(vector_db=vector_db, num_documents=args.limit)
+        tools = KnowledgeSearchTools(knowledge, num_documents=args.limit)
+
+        print(f"{args.chunks} chunks, {args.sessions} sessions of {args.questions} questions about "
+              f"{args.topics} chunks, top-{args.limit}, embed {args.embed_latency * 1000:.0f} ms/call, "
+              f"search {args.search_latency * 1000:.0f} ms/round trip")
+        print(f"{'mode':<24}{'embed calls':>12}{'searches':>10}{'chunks sent':>13}{'p50 (ms)':>10}{'mean (ms)':>11}")
+        for mode in ("one call per question", "batched"):
+            embedder.calls, store.search_calls = 0, 0
+            latencies, sent = [], 0
+            for questions in sessions(documents, args.sessions, args.questions, args.topics, 12):
+                start = time.perf_counter()
+                if mode == "batched":
+                    sent += len(tools.search(questions)["chunks"])
+                else:
+                    sent += sum(len(knowledge.search(question)) for question in questions)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{mode:<24}{embedder.calls / args.sessions:>12.1f}{store.search_calls / args.sessions:>10.1f}"
+                  f"{sent / args.sessions:>13.1f}{statistics.median(latencies):>10.1f}"
+                  f"{statistics.mean(latencies):>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Two-stage Matryoshka search on the knowledge PDFs: recall and latency per coarse dimension.
+
+The PDFs under ``knowledge/`` are chunked with ``FixedSizeChunking`` and
+embedded at 768 dimensions. ``--embedder fake`` (the default, offline) uses
+``FakeMatryoshkaEmbedder``. ``--embedder gemini`` uses text-embedding-004
+through the agents' cached embedder, which needs a Gemini key. The queries
+are word windows cut from random chunks. The ground truth is exact 768-dim
+search. For each ``--dimensions`` setting, ``CompactVectorDb`` in
+``matryoshka`` mode is measured twice: with the coarse pass only, and with
+the shortlist of ``--rerank`` candidates per result re-scored at 768 dims.
+
+    python -m benchmarks.matryoshka --dimensions 64 128 256 384 --k 5
+    python -m benchmarks.matryoshka --embedder gemini
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from agents import config
+from agents.vectorstores.compact import CompactVectorDb, VectorStore, normalize, top_k
+
+
+def chunks(chunk_size: int) -> list:
+    from agno.document.chunking.fixed import FixedSizeChunking
+    from agno.knowledge.pdf import PDFReader
+
+    reader, chunker = PDFReader(chunk=False), FixedSizeChunking(chunk_size=chunk_size)
+    return [chunk for path in sorted(config.KNOWLEDGE_DIR.rglob("*.pdf")) for page in reader.read(path)
+            for chunk in chunker.chunk(page) if chunk.content.strip()]
+
+
+def embedder(kind: str):
+    if kind == "gemini":
+        from agents.factories import gemini_embedder
+
+        return gemini_embedder("1DCNNGEMINI")
+    from benchmarks.fakes import FakeMatryoshkaEmbedder
+
+    return FakeMatryoshkaEmbedder(dimensions=config.EMBEDDING_DIMENSIONS)
+
+
+def queries(documents: list, count: int, words: int) -> list:
+    rng = random.Random(0)
+    texts = []
+    for document in rng.sample(documents, min(count, len(documents))):
+        tokens = document.content.split()
+        start = rng.randrange(max(1, len(tokens) - words))
+        texts.append(" ".join(tokens[start:start + words]))
+    return texts
+
+
+def timed(search, vectors):
+    latencies, results = [], []
+    for vector in vectors:
+        start = time.perf_counter()
+        results.append(search(vector))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embedder", choices=["fake", "gemini"], default="fake")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[64, 128, 256, 384])
+    parser.add_argument("--rerank", type=int, default=4, help="shortlist size per requested result")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-words", type=int, default=12)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = chunks(args.chunk_size)
+    model = embedder(args.embedder)
+    start = time.perf_counter()
+    vectors = np.asarray(model.get_embeddings_batch([d.content for d in documents]), dtype=np.float32)
+    embed_s = time.perf_counter() - start
+    query_vectors = normalize(np.asarray(model.get_embeddings_batch(queries(documents, args.queries,
+                                                                            args.query_words)), dtype=np.float32))
+    full = normalize(vectors)
+    ids = [f"{i:06d}" for i in range(len(documents))]
+
+    exact, exact_p50 = timed(lambda q: [ids[i] for i in top_k(full @ q, args.k)], query_vectors)
+    print(f"{len(documents)} chunks from {config.KNOWLEDGE_DIR.name}/*.pdf ({args.embedder} embeddings, "
+          f"{embed_s:.1f}s), {len(query_vectors)} queries, recall@{args.k}")
+    print(f"{'dimensions':<12}{'bytes/vec':>10}{'coarse recall':>15}{'p50 (ms)':>10}{'two-stage recall':>18}"
+          f"{'p50 (ms)':>10}")
+    print(f"{'768 exact':<12}{full.shape[1] * 4:>10}{1:>15.3f}{exact_p50:>10.2f}{'-':>18}{'-':>10}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store = VectorStore(Path(scratch, "vectors.db"))
+        store.create("knowledge")
+        store.put("knowledge", [(ids[i], vectors[i], d.name, d.content, d.meta_data) for i, d in enumerate(documents)])
+        for dimensions in args.dimensions:
+            cells = []
+            for rerank in (0, args.rerank):
+                vector_db = CompactVectorDb("knowledge", embedder=model, quantization="matryoshka", rerank=rerank,
+                                            coarse_dimensions=dimensions, store=store)
+                vector_db.index()
+                found, p50 = timed(lambda q: [d.id for d in vector_db.search_by_vector(q, args.k)], query_vectors)
+                cells.append((statistics.mean(len(set(f) & set(e)) / args.k for f, e in zip(found, exact)), p50))
+            (coarse, coarse_p50), (two_stage, two_stage_p50) = cells
+            print(f"{dimensions:<12}{dimensions * 4:>10}{coarse:>15.3f}{coarse_p50:>10.2f}{two_stage:>18.3f}"
+                  f"{two_stage_p50:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
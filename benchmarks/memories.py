@@ -0,0 +1,130 @@
+"""User memories at 10k: agno's full scan vs. ``IndexedMemory``'s top-k retrieval, background extraction and dedupe.
+
+``--memories`` synthetic memories of one user go into a memory table of a
+scratch agents database. Each memory is a fact about a few made-up names, and
+``--duplicates`` of them also have a reworded copy. Each turn's message asks
+about one memory, using some of its names. The embedder is the offline
+``FakeMatryoshkaEmbedder``. Extraction uses ``FakeMemoryManager``, which
+sleeps ``--extract-latency`` like the model call and stores the message as a
+memory.
+
+For each turn the table gives the time to get the memories for the prompt,
+how many memories and tokens that puts in the prompt, and how often the memory
+the message asks about is among them. The extraction rows give the time the
+run waits for extraction and the characters of existing memories the
+extraction prompt carries.
+
+    python -m benchmarks.memories --memories 10000 --turns 50 --k 8
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agents.memories import IndexedMemory, wait_for_extraction
+from agents.storage import SharedSqliteMemoryDb, create_storage_engine
+from benchmarks.fakes import FakeMatryoshkaEmbedder, FakeMemoryManager
+
+TEMPLATES = ["The user's client {0} wants a {1} campaign for {2}", "The user prefers {0} and {1} over {2}",
+             "The user is planning a {0} launch with {1} in {2}", "The user's {0} dashboard tracks {1} and {2}"]
+SYLLABLES = "ka lo mi ne su ta ri vo ba de fi gu ho ja ku le mo nu pa qui ro sa ti ul ve wa xi yo za zu".split()
+
+
+def names(rng, count: int) -> list:
+    return ["".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize() for _ in range(count)]
+
+
+def synthetic_memories(count: int, duplicates: int, rng) -> list:
+    """``(text, names)`` pairs; the last ``duplicates`` reword earlier memories."""
+    memories = []
+    for _ in range(count - duplicates):
+        words = names(rng, 3)
+        memories.append((rng.choice(TEMPLATES).format(*words), words))
+    for text, words in rng.sample(memories, duplicates):
+        memories.append((text.replace("The user", "User"), words))
+    return memories
+
+
+def load(db, user_id: str, memories: list) -> None:
+    from datetime import datetime
+
+    rows = [{"id": f"memory-{i:06d}", "user_id": user_id, "memory": str({"memory": text, "memory_id": f"memory-{i:06d}",
+             "last_updated": datetime.now().isoformat()})} for i, (text, _) in enumerate(memories)]
+    db.create()
+    with db.db_engine.begin() as conn:
+        conn.execute(db.table.insert(), rows)
+
+
+def turns(memories: list, count: int, rng) -> list:
+    """``(message, memory index)`` pairs asking about two of a memory's three names."""
+    asked = []
+    for i in rng.sample(range(len(memories)), count):
+        first, second = rng.sample(memories[i][1], 2)
+        asked.append((f"What did we decide about {first} and {second}?", i))
+    return asked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=10000)
+    parser.add_argument("--duplicates", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--extract-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    from agno.memory.v2.memory import Memory
+
+    rng = random.Random(0)
+    user_id = "benchmark"
+    memories = synthetic_memories(args.memories, args.duplicates, rng)
+    questions = turns(memories[:args.memories - args.duplicates], args.turns, rng)
+    embedder = FakeMatryoshkaEmbedder()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_storage_engine(Path(scratch, "agents.db"))
+        db = SharedSqliteMemoryDb("benchmark_memory", engine)
+        load(db, user_id, memories)
+        print(f"{len(memories)} memories ({args.duplicates} reworded duplicates), {args.turns} turns, top-{args.k}")
+        print(f"{'prompt memories':<28}{'p50 (ms)':>10}{'first (ms)':>12}{'in prompt':>11}{'tokens':>9}{'recall':>8}")
+
+        full = Memory(db=db)
+        indexed = IndexedMemory(db=db, embedder=embedder, top_k=args.k, background_extraction=False)
+        for label, lookup in (("agno (all memories)", lambda q: full.get_user_memories(user_id)),
+                              (f"indexed (top {args.k})", lambda q: indexed.relevant_memories(q, user_id))):
+            latencies, found, sizes = [], 0, []
+            for message, target in questions:
+                start = time.perf_counter()
+                prompt = lookup(message)
+                latencies.append((time.perf_counter() - start) * 1000)
+                sizes.append((len(prompt), sum(len(m.memory) for m in prompt) // 4))
+                found += any(m.memory == memories[target][0] for m in prompt)
+            print(f"{label:<28}{statistics.median(latencies[1:]):>10.1f}{latencies[0]:>12.1f}{sizes[-1][0]:>11}"
+                  f"{sizes[-1][1]:>9}{found / len(questions):>8.3f}")
+
+        start = time.perf_counter()
+        replaced = indexed.dedupe(user_id)
+        print(f"\ndedupe pass over all memories: {replaced} replaced in {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"{len(indexed.memories[user_id])} left")
+
+        print(f"\n{'extraction':<28}{'run waits (ms)':>15}{'existing chars':>16}{'replaced':>10}")
+        message, target = questions[0]
+        reworded = memories[target][0].replace("The user", "User")
+        # Indexed first: agno's run stores the same reworded memory again, which would be replaced too
+        for label, memory in (("indexed (background)", IndexedMemory(
+                                  db=db, embedder=embedder, top_k=args.k,
+                                  memory_manager=FakeMemoryManager(args.extract_latency))),
+                              ("agno (inline)", Memory(db=db, memory_manager=FakeMemoryManager(args.extract_latency)))):
+            start = time.perf_counter()
+            memory.create_user_memories(message=reworded, user_id=user_id)
+            waited = (time.perf_counter() - start) * 1000
+            wait_for_extraction()
+            replaced = f"{memory.replaced}" if isinstance(memory, IndexedMemory) else "-"
+            print(f"{label:<28}{waited:>15.0f}{memory.memory_manager.existing_chars[-1]:>16}{replaced:>10}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Meta search latency and cache hit rate with stub search engines.
+
+Replays keyword-research sessions (each repeats some of the queries of the
+previous one) three ways: the engines one after another, as the model calls
+separate tools today; ``MetaSearchTools`` without a cache; and
+``MetaSearchTools`` with its on-disk cache.
+
+    python -m benchmarks.meta_search --sessions 3 --queries 8
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agents.toolkits.meta_search import MetaSearchTools, SearchCache, SearchProvider, merge_results
+from benchmarks.fakes import StubSearchProvider
+
+ENGINES = {"google": 0.9, "duckduckgo": 0.6, "tavily": 1.2, "exa": 1.0, "wikipedia": 0.3}
+SEEDS = ["ai agents", "website development", "ai analytics for small business", "lean seo", "storybrand",
+         "keyword clusters", "ai web design trends", "small business dashboards", "growth hacking funnel",
+         "ai seo tools", "aarrr metrics", "content pillar strategy"]
+
+
+def sessions(count: int, queries: int):
+    """Each session keeps half of the previous session's queries, like iterating on the same research."""
+    previous = SEEDS[:queries]
+    for i in range(count):
+        if i:
+            fresh = [f"{q} {i}" for q in SEEDS[queries // 2:queries]]
+            previous = previous[:queries // 2] + fresh
+        yield list(previous)
+
+
+def providers(timeout: float):
+    return [SearchProvider(name, StubSearchProvider(name, latency), timeout) for name, latency in ENGINES.items()]
+
+
+def sequential(query: str, engines) -> list:
+    return merge_results({p.name: p.search(query, 10) for p in engines}, 10)
+
+
+def measure(name: str, search, plan) -> None:
+    latencies = []
+    for queries in plan:
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            latencies.append(time.perf_counter() - start)
+    print(f"{name:<22}{statistics.mean(latencies):>10.2f}{max(latencies):>10.2f}{sum(latencies):>10.1f}", end="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=8, help="queries per session")
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-provider timeout")
+    args = parser.parse_args()
+    plan = list(sessions(args.sessions, args.queries))
+    # Slow engines are expected to time out; the table shows the effect
+    logging.getLogger("agents.toolkits.meta_search").setLevel(logging.ERROR)
+
+    print(f"{len(ENGINES)} stub engines, {args.sessions} sessions x {args.queries} queries, "
+          f"{args.timeout:g}s provider timeout")
+    print(f"{'mode':<22}{'mean (s)':>10}{'max (s)':>10}{'total (s)':>10}{'engine calls':>14}{'hit rate':>10}")
+    engines = providers(args.timeout)
+    measure("sequential tools", lambda q: sequential(q, engines), plan)
+    print(f"{sum(p.search.calls for p in engines):>14}{'-':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engines = providers(args.timeout)
+        uncached = MetaSearchTools(engines, cache=SearchCache(Path(tmp, "off.db"), ttl=0))
+        measure("meta search", uncached.search_all, plan)
+        print(f"{sum(p.search.calls for p in engines):>14}{'-':>10}")
+
+        engines = providers(args.timeout)
+        cache = SearchCache(Path(tmp, "on.db"))
+        cached = MetaSearchTools(engines, cache=cache)
+        measure("meta search + cache", cached.search_all, plan)
+        print(f"{sum(p.search.calls for p in engines):>14}{cache.hit_rate():>10.0%}")
+        merged = cached.search_all(plan[0][0])
+        raw = sum(len(cache.get(p, plan[0][0], 10) or []) for p in ENGINES)
+        print(f"dedupe: {raw} engine results -> {len(merge_results({p: cache.get(p, plan[0][0], 10) for p in ENGINES}, 100))} "
+              f"unique URLs; top result from {', '.join(merged['results'][0]['providers'])}")
+
+
+if __name__ == "__main__":
+    main()
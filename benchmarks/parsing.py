@@ -0,0 +1,130 @@
+"""Whole-file vs. paged vs. process-pool parsing of a synthetic knowledge directory.
+
+The corpus is ``--pdfs`` text PDFs of ``--pages`` pages each plus a CSV of
+``--csv-rows`` rows, 500 pages by default. Each mode runs
+``agents.ingestion.incremental_load`` over it in a fresh interpreter. The
+knowledge base is a ``PDFKnowledgeBase`` and a ``CSVKnowledgeBase`` on a fake
+embedder and an in-memory vector store. The modes are:
+
+- whole file: every file read in one piece by its agno reader, as ``knowledge.load`` does;
+- paged: ``agents.parsing`` tasks run in the loading process (``PARSE_WORKERS=0``);
+- pool xN: the same tasks on N worker processes.
+
+Peak RSS is the loading process's and the largest worker's.
+
+    python -m benchmarks.parsing --pdfs 5 --pages 100 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agents import config
+
+
+def corpus(directory: Path, pdfs: int, pages: int, words: int, csv_rows: int) -> None:
+    from benchmarks.fakes import synthetic_pdf, synthetic_text
+
+    for i in range(pdfs):
+        synthetic_pdf(directory.joinpath(f"synthetic-{i}.pdf"), pages, words, seed=i)
+    with open(directory.joinpath("synthetic.csv"), "w") as f:
+        f.write("keyword,volume,notes\n")
+        for i in range(csv_rows):
+            f.write(f'"{synthetic_text(i, 3)}",{i * 7 % 5000},"{synthetic_text(i, 12)}"\n')
+
+
+def worker(mode: str, args) -> dict:
+    """Load the corpus once in this process; run by ``main`` in a fresh interpreter per mode."""
+    import logging
+    import resource
+
+    from agno.knowledge.combined import CombinedKnowledgeBase
+    from agno.knowledge.csv import CSVKnowledgeBase
+    from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
+
+    from agents import parsing
+    from agents.ingest_pipeline import PipelineConfig
+    from agents.ingestion import IngestionManifest, incremental_load
+    from benchmarks.fakes import FakeEmbedder, InMemoryVectorDb
+
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+    workers = 0
+    if mode == "whole":
+        # Every reader falls back to reading its files in one piece
+        parsing.SPLITTERS = {}
+    elif mode != "paged":
+        workers = int(mode)
+    parsing.iter_pages.__defaults__ = (workers, *parsing.iter_pages.__defaults__[1:])
+
+    directory = Path(args.corpus)
+    vector_db = InMemoryVectorDb(FakeEmbedder(call_latency=args.embed_latency, dimensions=64))
+    knowledge = CombinedKnowledgeBase(sources=[
+        PDFKnowledgeBase(path=directory, vector_db=vector_db, reader=PDFReader(chunk=True, chunk_size=5000)),
+        CSVKnowledgeBase(path=directory, vector_db=vector_db),
+    ], vector_db=vector_db)
+    manifest = IngestionManifest("parsing-benchmark", Path(tempfile.mkdtemp()))
+    start = time.perf_counter()
+    report = incremental_load(knowledge, manifest, PipelineConfig(embed_batch_size=64))
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1 << (20 if sys.platform == "darwin" else 10)
+    return {
+        "seconds": seconds,
+        "pages": report.pages_embedded,
+        "chunks": report.chunks_upserted,
+        "errors": len(report.errors),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit,
+    }
+
+
+def measure(mode: str, argv: list) -> dict:
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.parsing", "--worker", mode, *argv],
+                          cwd=config.ROOT_DIR, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed"}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=90, help="pages per PDF")
+    parser.add_argument("--words", type=int, default=400, help="words per PDF page")
+    parser.add_argument("--csv-rows", type=int, default=50000, help="rows of the CSV")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="simulated round trip per embed call")
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", metavar="MODE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus(Path(directory), args.pdfs, args.pages, args.words, args.csv_rows)
+        argv = [f"--corpus={directory}", f"--embed-latency={args.embed_latency}"]
+        print(f"{args.pdfs} PDFs x {args.pages} pages + a {args.csv_rows}-row CSV "
+              f"({args.csv_rows // config.CSV_ROWS_PER_PAGE} pages), {os.cpu_count()} CPUs")
+        print(f"{'mode':<14}{'seconds':>9}{'pages':>7}{'pages/s':>9}{'chunks':>8}{'RSS (MB)':>10}"
+              f"{'worker RSS (MB)':>17}")
+        modes = ["whole", "paged", *dict.fromkeys(str(w) for w in args.workers)]
+        for mode in modes:
+            r = measure(mode, argv)
+            label = {"whole": "whole file", "paged": "paged"}.get(mode, f"pool x{mode}")
+            if "error" in r:
+                print(f"{label:<14}{r['error']}")
+                continue
+            worker_rss = f"{r['worker_rss_mb']:>17.0f}" if mode not in ("whole", "paged") else f"{'-':>17}"
+            print(f"{label:<14}{r['seconds']:>9.2f}{r['pages']:>7}{r['pages'] / r['seconds']:>9.1f}{r['chunks']:>8}"
+                  f"{r['rss_mb']:>10.0f}{worker_rss}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Prompt tokens and latency of an agent session, with and without prefix caching.
+
+The SEO specialist's description and instructions plus the BrandScript make up
+a large, unchanging prompt prefix. Against ``benchmarks.fake_gemini`` (where
+cached prompt tokens cost a quarter of the latency of uncached ones) the agent
+answers ``--turns`` questions:
+
+- "inline": the BrandScript is pasted into every user message, as before;
+- "local prefix": the BrandScript is a context artifact in the system prompt,
+  which is sent in full on every call;
+- "provider cache": the same prefix is stored as Gemini cached content once and
+  referenced from then on.
+
+    python -m benchmarks.prompt_cache --turns 20
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from agno.agent import Agent
+from agno.models.google import Gemini
+
+from agents import config
+from agents.context import load_artifact, register_context, with_context
+from agents.prompt_cache import CachedPrefixGemini, prompt_cache, track_prompt_usage
+from agents.seo import DESCRIPTION, INSTRUCTIONS
+from benchmarks.fake_gemini import FakeGemini
+
+
+def model(cls, url: str, **kwargs) -> Gemini:
+    from google.genai import types
+
+    return cls(id=config.CHAT_MODEL_ID, api_key="fake-key",
+               client_params={"http_options": types.HttpOptions(base_url=url)}, **kwargs)
+
+
+def converse(agent: Agent, turns: int, suffix: str = ""):
+    latencies = []
+    with track_prompt_usage() as usage:
+        for turn in range(turns):
+            start = time.perf_counter()
+            agent.run(f"Turn {turn}: suggest three long-tail keywords for AI agents." + suffix)
+            latencies.append(time.perf_counter() - start)
+    return usage, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--token-latency", type=float, default=0.05, help="fake latency per 1000 prompt tokens")
+    args = parser.parse_args()
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+
+    brandscript = load_artifact("brandscript")
+    register_context("brandscript", brandscript)
+    with FakeGemini(rpm=100_000, latency=0.01, token_latency=args.token_latency) as fake:
+        setups = {
+            "inline": (Agent(model=model(CachedPrefixGemini, fake.url, context_cache="off"),
+                             description=DESCRIPTION, instructions=INSTRUCTIONS),
+                       "\n\nBrandScript:\n" + brandscript),
+            "local prefix": (Agent(model=model(CachedPrefixGemini, fake.url, context_cache="local"),
+                                   description=DESCRIPTION, instructions=with_context(INSTRUCTIONS, "brandscript")),
+                             ""),
+            "provider cache": (Agent(model=model(CachedPrefixGemini, fake.url, context_cache="provider"),
+                                     description=DESCRIPTION, instructions=with_context(INSTRUCTIONS, "brandscript")),
+                               ""),
+        }
+        print(f"{args.turns} turns, {len(brandscript) // 4}-token BrandScript, "
+              f"{args.token_latency * 1000:.0f} ms per 1000 uncached prompt tokens")
+        print(f"{'mode':<16}{'prompt/turn':>12}{'cached/turn':>12}{'saved':>7}{'p50 (s)':>9}{'total (s)':>11}")
+        for name, (agent, suffix) in setups.items():
+            usage, latencies = converse(agent, args.turns, suffix)
+            share = usage.saved_tokens / usage.prompt_tokens if usage.prompt_tokens else 0.0
+            print(f"{name:<16}{usage.prompt_tokens / args.turns:>12.0f}{usage.cached_tokens / args.turns:>12.0f}"
+                  f"{share:>7.0%}{statistics.median(latencies):>9.3f}{sum(latencies):>11.2f}")
+        print(f"cached contents created: {prompt_cache().created}")
+
+
+if __name__ == "__main__":
+    main()
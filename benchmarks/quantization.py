@@ -0,0 +1,94 @@
+"""Recall@k, latency and size of the compact backend's quantization modes against exact search.
+
+The collection is ``--vectors`` clustered, unit-length ``--dimensions``-dim
+vectors. The queries are perturbed copies of some of them. Exact search is a
+float32 matmul over the whole collection in memory and gives the ground
+truth. Each ``CompactVectorDb`` mode is searched with ``search_by_vector``, so
+its latency includes re-ranking against the memory-mapped vectors and
+fetching the payloads from SQLite. The
+same points then go into two more collections to show that the shared vector
+store keeps each vector once.
+
+    python -m benchmarks.quantization --vectors 20000 --queries 200 --k 10
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from agents.vectorstores.compact import CompactVectorDb, VectorStore, normalize, top_k
+
+MODES = [("int8", 0, None), ("int8", 4, None), ("pq", 0, 192), ("pq", 4, 192), ("pq", 0, 96), ("pq", 8, 96)]
+
+
+def clustered(count: int, dimensions: int, clusters: int, spread: float, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    noise = rng.standard_normal((count, dimensions)).astype(np.float32) * spread
+    return normalize(centers[rng.integers(clusters, size=count)] + noise)
+
+
+def timed(search, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return results, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--spread", type=float, default=0.6, help="noise around each cluster center")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered(args.vectors, args.dimensions, args.clusters, args.spread, rng)
+    picks = rng.choice(args.vectors, args.queries, replace=False)
+    queries = normalize(vectors[picks] + rng.standard_normal((args.queries, args.dimensions)).astype(np.float32) * 0.02)
+    ids = [f"{i:08d}" for i in range(args.vectors)]
+    points = [(ids[i], vectors[i], "synthetic", f"chunk {i}", {"chunk": i}) for i in range(args.vectors)]
+
+    exact, exact_p50, exact_p95 = timed(lambda q: [ids[i] for i in top_k(vectors @ q, args.k)], queries)
+    full_bytes = vectors.nbytes
+    print(f"{args.vectors} vectors x {args.dimensions} dims, {args.queries} queries, recall@{args.k}")
+    print(f"{'mode':<22}{'bytes/vec':>10}{'smaller':>9}{'index (MB)':>12}{'recall':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    print(f"{'exact float32':<22}{args.dimensions * 4:>10}{'1x':>9}{full_bytes / 2**20:>12.1f}{1:>8.3f}"
+          f"{exact_p50:>10.2f}{exact_p95:>10.2f}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store = VectorStore(Path(scratch, "vectors.db"))
+        store.create("knowledge")
+        for start in range(0, len(points), 2000):
+            store.put("knowledge", points[start:start + 2000])
+
+        for quantization, rerank, subvectors in MODES:
+            vector_db = CompactVectorDb("knowledge", embedder=object(), quantization=quantization,
+                                        pq_subvectors=subvectors or 0, rerank=rerank, store=store)
+            index = vector_db.index()
+            found, p50, p95 = timed(lambda q: [d.id for d in vector_db.search_by_vector(q, args.k)], queries)
+            recall = statistics.mean(len(set(f) & set(e)) / args.k for f, e in zip(found, exact))
+            label = f"{quantization}{subvectors or ''}" + (f" rerank={rerank}" if rerank else "")
+            per_vector = index.codes.shape[1]
+            print(f"{label:<22}{per_vector:>10}{f'{full_bytes / index.nbytes:.1f}x':>9}"
+                  f"{vector_db.index_file.stat().st_size / 2**20:>12.1f}{recall:>8.3f}{p50:>10.2f}{p95:>10.2f}")
+
+        for collection in ("keywords", "specialist"):
+            store.create(collection)
+            for start in range(0, len(points), 2000):
+                store.put(collection, points[start:start + 2000])
+        stats = store.stats()
+        print(f"\n3 collections: {stats['points']} points, {stats['vectors']} float32 vectors stored "
+              f"({stats['vector_bytes'] / 2**20:.1f} MB instead of {3 * full_bytes / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Live model calls vs. recording and replaying them.
+
+The ``__main__`` briefs of the content agents are streamed through
+``print_response``-style runs against ``benchmarks.fake_gemini``: once live,
+once with ``RESPONSE_CACHE=record``, then with ``replay`` and no endpoint.
+
+    python -m benchmarks.response_cache --latency 0.5
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agno.agent import Agent
+
+from agents import config, response_cache
+from agents.prompt_cache import CachedPrefixGemini
+from benchmarks.fake_gemini import FakeGemini
+
+BRIEFS = {
+    "seo_specialist": "DO an extensive keyword research and develop keyword clusters for the following keywords: "
+                      "Website Development, AI, AI Agents",
+    "content_creator": "Write a 1500-word blog post on the future of AI in web development, targeting the keyword "
+                       "'AI-driven web design trends",
+    "script_writer": "Write a 30 second video script for SEO guidelines from the SEO Specialist",
+}
+
+
+def agent(agent_id: str, url: str, mode: str) -> Agent:
+    from google.genai import types
+
+    cls = response_cache.replayable(CachedPrefixGemini)
+    model = cls(id=config.CHAT_MODEL_ID, api_key="fake-key",
+                client_params={"http_options": types.HttpOptions(base_url=url)})
+    model.response_cache_mode = mode
+    built = Agent(model=model, instructions=f"You are the {agent_id}.", add_datetime_to_instructions=True,
+                  markdown=True)
+    response_cache.attach(built, agent_id)
+    return built
+
+
+def run(name: str, url: str, mode: str, rounds: int) -> None:
+    latencies = []
+    for _ in range(rounds):
+        for agent_id, brief in BRIEFS.items():
+            start = time.perf_counter()
+            chunks = sum(1 for _ in agent(agent_id, url, mode).run(brief, stream=True))
+            latencies.append(time.perf_counter() - start)
+    print(f"{name:<10}{statistics.median(latencies) * 1000:>10.1f}{sum(latencies):>11.2f}{chunks:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency per call")
+    args = parser.parse_args()
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        response_cache._shared = response_cache.ResponseCache(Path(tmp, "responses.db"))
+        print(f"{len(BRIEFS)} briefs x {args.rounds} rounds, {args.latency * 1000:.0f} ms per model call")
+        print(f"{'mode':<10}{'p50 (ms)':>10}{'total (s)':>11}{'chunks':>8}")
+        with FakeGemini(rpm=100_000, latency=args.latency, reply_words=300) as fake:
+            run("live", fake.url, "off", args.rounds)
+            run("record", fake.url, "record", 1)
+        # The endpoint is gone: everything has to come from the recordings
+        run("replay", "http://127.0.0.1:9", "replay", args.rounds)
+        cache = response_cache.response_cache()
+        print(f"replayed {cache.hits} responses, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
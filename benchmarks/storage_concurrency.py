@@ -0,0 +1,109 @@
+"""Session and memory storage under all agents running in parallel.
+
+Each registered agent gets a thread that replays the storage traffic of an
+agent run per turn: read the session, read the user's memories, upsert the
+session at run start and end with a growing history, and every few turns
+store a memory. The "legacy" layout is what the modules used to do (default
+journal, unpooled engines per agent, CWD-relative files); "shared" is
+``agents.storage`` (one WAL database, pooled engine, batched session writes).
+
+    python -m benchmarks.storage_concurrency --turns 200
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from agno.memory.v2.db.schema import MemoryRow
+from agno.memory.v2.db.sqlite import SqliteMemoryDb
+from agno.storage.session import AgentSession
+from agno.storage.sqlite import SqliteStorage
+
+from agents import config
+from agents.registry import list_agents
+from agents.storage import BatchedSqliteStorage, SessionWriter, SharedSqliteMemoryDb, create_storage_engine
+from benchmarks.fakes import synthetic_text
+
+
+def legacy_layout(directory: Path, agent_id: str):
+    storage = SqliteStorage(table_name=f"{agent_id}_agent", db_file=str(directory.joinpath("agents.db")))
+    memory_db = SqliteMemoryDb(table_name=f"{agent_id}_memory", db_file=str(directory.joinpath("memory.db")))
+    return storage, memory_db
+
+
+def shared_layout(engine, writer: SessionWriter, agent_id: str):
+    storage = BatchedSqliteStorage(f"{agent_id}_agent", engine, writer)
+    memory_db = SharedSqliteMemoryDb(f"{agent_id}_memory", engine)
+    return storage, memory_db
+
+
+def run_agent(agent_id: str, storage, memory_db, turns: int, latencies: list, errors: list):
+    session_id = f"{agent_id}-session"
+    messages = []
+    storage.create()
+    memory_db.create()
+    for turn in range(turns):
+        start = time.perf_counter()
+        try:
+            storage.read(session_id, config.USER_ID)
+            memory_db.read_memories(user_id=config.USER_ID, limit=20)
+            messages.append({"role": "user", "content": synthetic_text(turn, 40)})
+            for _ in range(2):
+                # agno writes the session when a run starts and again when it finishes
+                storage.upsert(AgentSession(session_id=session_id, agent_id=agent_id, user_id=config.USER_ID,
+                                            memory={"runs": [], "messages": messages}, agent_data={"name": agent_id},
+                                            session_data={}, extra_data={}))
+                messages.append({"role": "assistant", "content": synthetic_text(turn + 1, 120)})
+            if turn % 5 == 0:
+                memory_db.upsert_memory(MemoryRow(id=f"{agent_id}-{turn}", user_id=config.USER_ID,
+                                                  memory={"memory": synthetic_text(turn, 20)}))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def measure(name: str, layouts, turns: int, finish=None):
+    latencies, errors = [], []
+    threads = [threading.Thread(target=run_agent, args=(agent_id, storage, memory_db, turns, latencies, errors))
+               for agent_id, (storage, memory_db) in layouts.items()]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if finish is not None:
+        finish()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print(f"{name:<10}{seconds:>10.2f}{len(latencies) / seconds:>12.1f}{statistics.median(latencies):>11.2f}"
+          f"{latencies[int(len(latencies) * 0.95) - 1]:>11.2f}{len(errors):>9}")
+    for error in sorted(set(errors))[:3]:
+        print(f"    {error[:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200, help="turns per agent")
+    parser.add_argument("--flush-interval", type=float, default=config.STORAGE_FLUSH_INTERVAL)
+    args = parser.parse_args()
+
+    agent_ids = list_agents()
+    print(f"{len(agent_ids)} agents in parallel, {args.turns} turns each")
+    print(f"{'layout':<10}{'total (s)':>10}{'turns/s':>12}{'p50 (ms)':>11}{'p95 (ms)':>11}{'errors':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp).joinpath("legacy")
+        measure("legacy", {a: legacy_layout(legacy_dir, a) for a in agent_ids}, args.turns)
+
+        engine = create_storage_engine(Path(tmp).joinpath("shared", "agents.db"))
+        writer = SessionWriter(engine, flush_interval=args.flush_interval)
+        measure("shared", {a: shared_layout(engine, writer, a) for a in agent_ids}, args.turns, writer.flush)
+        stats = writer.stats()
+        print(f"shared: {stats['upserts']} session upserts -> {stats['rows_written']} rows "
+              f"in {stats['flushes']} transactions")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
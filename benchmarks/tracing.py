@@ -0,0 +1,112 @@
+"""Where an agent run spends its time, and what tracing it costs.
+
+The agent (``seo_specialist`` by default) is built by its real factory with
+the ``benchmarks.end_to_end`` script: a ``ScriptedModel``, stub tools, an
+``InMemoryVectorDb`` behind the ``CachedEmbedder`` and ``TracedVectorDb``
+wrappers, and a scratch storage database. It streams ``--runs`` runs with
+``TRACING`` off, then on. The benchmark prints the per-run overhead and the
+span breakdown of the last traced run, as ``python -m agents.tracing`` would.
+
+    python -m benchmarks.tracing --runs 5
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from importlib import import_module
+from pathlib import Path
+
+from agents import config, storage, tracing
+from agents.embedding_cache import CachedEmbedder, EmbeddingCache
+from agents.registry import AGENT_FACTORIES
+from agents.vectorstores.wrapper import TracedVectorDb
+from benchmarks.end_to_end import KNOWLEDGE, SCRIPTS
+from benchmarks.fakes import FakeEmbedder, InMemoryVectorDb, ScriptedModel, ScriptStep, stub_tool, synthetic_pages
+
+
+def knowledge(pages: int, scratch: str):
+    from agno.knowledge.document import DocumentKnowledgeBase
+
+    documents = synthetic_pages(pages, words=200)
+    embedder = CachedEmbedder(embedder=FakeEmbedder(call_latency=0.05), cache=EmbeddingCache(Path(scratch, "e.db")))
+    for document, embedding in zip(documents, embedder.get_embeddings_batch([d.content for d in documents])):
+        document.embedding = embedding
+    backend = InMemoryVectorDb(embedder)
+    backend.upsert_embedded(documents)
+    return DocumentKnowledgeBase(documents=documents, vector_db=TracedVectorDb(backend), num_documents=5)
+
+
+def build(agent_id: str, args, scratch: str):
+    module_name, func_name = AGENT_FACTORIES[agent_id].split(":")
+    builder = getattr(import_module(module_name), func_name)
+    _, script = SCRIPTS[agent_id]
+    model = tracing.traced(ScriptedModel)(
+        script=[ScriptStep(tool, {"query": query}) for tool, query in script], latency=args.latency,
+        chunk_latency=args.chunk_latency, reply_words=args.reply_words)
+    overrides = {"model": model}
+    if any(tool == KNOWLEDGE for tool, _ in script):
+        overrides["knowledge"] = knowledge(args.pages, scratch)
+    if any(tool != KNOWLEDGE for tool, _ in script):
+        overrides["tools"] = [stub_tool(tool, args.tool_latency) for tool in dict.fromkeys(t for t, _ in script)
+                              if tool != KNOWLEDGE]
+    agent = builder(**overrides)
+    agent.debug_mode = False
+    tracing.instrument(agent, agent_id)
+    return agent
+
+
+def run(agent, brief: str, runs: int, label: str) -> float:
+    totals = []
+    for i in range(runs):
+        start = time.perf_counter()
+        # A new session per run, so every run reads and writes its own session row
+        for _ in agent.run(brief, stream=True, session_id=f"{label}-{i}"):
+            pass
+        totals.append(time.perf_counter() - start)
+    return statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent", nargs="?", default="seo_specialist", choices=list(SCRIPTS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3, help="scripted model time to first token")
+    parser.add_argument("--chunk-latency", type=float, default=0.01, help="scripted model delay per streamed chunk")
+    parser.add_argument("--reply-words", type=int, default=300)
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="stub tool latency")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages in the knowledge base")
+    args = parser.parse_args()
+    logging.getLogger("agno").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = storage.create_storage_engine(Path(scratch, "agents.db"))
+        # Listeners are no-ops while TRACING is off, so one engine serves both phases
+        storage.trace_engine(engine)
+        storage._engine = engine
+        tracing._shared = tracing.Tracer(Path(scratch, "traces"), exports=["jsonl", "otlp"], endpoint=None)
+        agent = build(args.agent, args, scratch)
+        brief, _ = SCRIPTS[args.agent]
+
+        config.TRACING = False
+        off = run(agent, brief, args.runs, "off")
+        config.TRACING = True
+        on = run(agent, brief, args.runs, "on")
+        storage.session_writer().flush()
+        config.TRACING = False
+
+        print(f"{args.agent}: {args.runs} streamed runs, model {args.latency * 1000:.0f} ms to first token, "
+              f"tools {args.tool_latency * 1000:.0f} ms")
+        print(f"{'tracing':<10}{'p50 (ms)':>10}")
+        print(f"{'off':<10}{off * 1000:>10.1f}")
+        print(f"{'on':<10}{on * 1000:>10.1f}   ({(on - off) / off:+.1%})")
+        tracing._shared.flush()
+        spans = tracing.load_spans(tracing._shared.spans_file)
+        last = max((s for s in spans if s["name"] == "agent.run"), key=lambda s: s["end_ns"])
+        otlp_bytes = tracing._shared.otlp_file.stat().st_size
+        print(f"\n{len(spans)} spans exported, {otlp_bytes / 1024:.0f} KB of OTLP/JSON\n")
+        tracing.print_breakdown([s for s in spans if s["trace_id"] == last["trace_id"]])
+
+
+if __name__ == "__main__":
+    main()
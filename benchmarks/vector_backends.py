@@ -0,0 +1,106 @@
+"""Query latency of the vector backends on the same synthetic collection.
+
+Embeddings come from the zero-latency fake embedder, so the numbers are pure
+vector DB cost. That is a network round trip for Qdrant, an in-process
+memory-mapped scan (or IVF-PQ probe) for LanceDB, and one matmul over the
+memory-mapped matrix for the flat backend. The flat backend is also measured
+answering ``--batch`` queries per ``search_many`` call, with latencies per
+call, and its reopening time (mapping the saved ``.npy``) is reported.
+
+    python -m benchmarks.vector_backends --chunks 5000 --queries 200
+    QDRANT_URL=... python -m benchmarks.vector_backends --qdrant
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from agno.document.base import Document
+
+from agents import config
+from benchmarks.fakes import FakeEmbedder, synthetic_text
+
+
+def make_documents(count: int):
+    return [Document(name="synthetic", id=f"synthetic_{i}", content=synthetic_text(i, 120), meta_data={"chunk": i})
+            for i in range(count)]
+
+
+def measure(vector_db, queries, limit):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        vector_db.search(query, limit=limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1], len(queries) / (sum(latencies) / 1000)
+
+
+def measure_batched(vector_db, queries, limit, batch):
+    latencies = []
+    for start in range(0, len(queries), batch):
+        begin = time.perf_counter()
+        vector_db.search_many(queries[start:start + batch], limit=limit)
+        latencies.append((time.perf_counter() - begin) * 1000)
+    total_s = sum(latencies) / 1000
+    latencies.sort()
+    return statistics.median(latencies), latencies[max(int(len(latencies) * 0.95) - 1, 0)], len(queries) / total_s
+
+
+def load(vector_db, documents, batch=500):
+    vector_db.create()
+    for start in range(0, len(documents), batch):
+        vector_db.upsert(documents[start:start + batch])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=16, help="queries per batched flat search")
+    parser.add_argument("--qdrant", action="store_true", help="also benchmark the remote Qdrant at QDRANT_URL")
+    args = parser.parse_args()
+
+    embedder = FakeEmbedder(dimensions=config.EMBEDDING_DIMENSIONS, call_latency=0.0, per_text_latency=0.0)
+    documents = make_documents(args.chunks)
+    queries = [synthetic_text(10_000 + i, 12) for i in range(args.queries)]
+    print(f"{args.chunks} chunks x {config.EMBEDDING_DIMENSIONS} dims, {args.queries} queries, top-{args.limit}")
+    print(f"{'backend':<28}{'p50 (ms)':>10}{'p95 (ms)':>10}{'qps':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from agents.vectorstores.flat import FlatVectorDb
+
+        loaded = FlatVectorDb("benchmark", embedder, directory=tmp)
+        load(loaded, documents)
+        loaded.flush()
+        start = time.perf_counter()
+        flat = FlatVectorDb("benchmark", embedder, directory=tmp)
+        opened_ms = (time.perf_counter() - start) * 1000
+        print(f"{'flat (numpy mmap)':<28}" + "".join(f"{v:>10.2f}" for v in measure(flat, queries, args.limit)))
+        label = f"flat (batches of {args.batch})"
+        print(f"{label:<28}" + "".join(f"{v:>10.2f}" for v in measure_batched(flat, queries, args.limit, args.batch)))
+        print(f"{'':<28}flat collection reopened in {opened_ms:.1f} ms")
+
+        from agents.vectorstores.lance import LocalLanceDb
+
+        lance = LocalLanceDb(table_name="benchmark", uri=tmp, embedder=embedder)
+        load(lance, documents)
+        print(f"{'lancedb (flat)':<28}" + "".join(f"{v:>10.2f}" for v in measure(lance, queries, args.limit)))
+        if lance.row_count() >= 256:
+            lance.table.create_index(vector_column_name="vector", replace=True, **lance.index_params(lance.row_count()))
+            print(f"{'lancedb (ivf-pq)':<28}" + "".join(f"{v:>10.2f}" for v in measure(lance, queries, args.limit)))
+
+    if args.qdrant:
+        from agents.vectorstores import qdrant
+
+        remote = qdrant("benchmark_vector_backends", embedder)
+        load(remote, documents)
+        try:
+            print(f"{'qdrant (remote)':<28}" + "".join(f"{v:>10.2f}" for v in measure(remote, queries, args.limit)))
+        finally:
+            remote.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""``CachedAgenticChunking`` caches the model's segmentation, never the fallback's."""
+import tempfile
+import unittest
+from pathlib import Path
+
+from agno.document.base import Document
+
+from agents.chunking import CachedAgenticChunking, ChunkCache
+from benchmarks.fakes import FakeChunkingModel, synthetic_text
+
+
+class FlakyChunkingModel(FakeChunkingModel):
+    """Raises like a rate-limited endpoint for the first ``failures`` calls, then answers."""
+
+    def __init__(self, failures: int, max_chunk_size: int):
+        super().__init__(latency=0.0, max_chunk_size=max_chunk_size)
+        self.failures = failures
+
+    def response(self, messages, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            self.calls += 1
+            raise RuntimeError("429 Resource exhausted")
+        return super().response(messages, **kwargs)
+
+
+class CachedAgenticChunkingTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = ChunkCache(Path(self._tmp.name, "chunks.db"))
+        self.document = Document(name="page", content=synthetic_text(0, 600))
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self._tmp.cleanup()
+
+    def test_failed_run_is_not_cached(self):
+        model = FlakyChunkingModel(failures=1, max_chunk_size=1000)
+        chunking = CachedAgenticChunking(model=model, max_chunk_size=1000, cache=self.cache)
+
+        fallback = chunking.chunk(self.document)
+        self.assertEqual(len(fallback[0].content), 1000)
+        self.assertIsNone(self.cache.get(chunking.cache_key, self.document.content))
+
+        calls = model.calls
+        answered = chunking.chunk(self.document)
+        self.assertGreater(model.calls, calls)
+        self.assertTrue(all(c.content.endswith(".") for c in answered[:-1]))
+        self.assertEqual(self.cache.get(chunking.cache_key, self.document.content), [c.content for c in answered])
+
+        calls = model.calls
+        self.assertEqual([c.content for c in chunking.chunk(self.document)], [c.content for c in answered])
+        self.assertEqual(model.calls, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
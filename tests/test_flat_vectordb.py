@@ -0,0 +1,62 @@
+"""The flat backend under ``incremental_load``: one write per load, and it survives a reopen."""
+import tempfile
+import unittest
+from pathlib import Path
+
+from agno.knowledge.text import TextKnowledgeBase
+
+from agents.ingestion import IngestionManifest, incremental_load
+from agents.vectorstores.flat import FlatVectorDb
+from benchmarks.fakes import FakeEmbedder, synthetic_text
+
+
+class FlatIncrementalLoadTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.docs = self.tmp.joinpath("docs")
+        self.docs.mkdir()
+        for i in range(3):
+            self.docs.joinpath(f"doc{i}.txt").write_text(synthetic_text(i, 300))
+        self.embedder = FakeEmbedder(dimensions=32, call_latency=0.0, per_text_latency=0.0)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def load(self):
+        vector_db = FlatVectorDb("knowledge", self.embedder, directory=self.tmp.joinpath("flat"))
+        saves = []
+        save = vector_db._save
+        vector_db._save = lambda *args: (saves.append(len(args[1])), save(*args))
+        knowledge = TextKnowledgeBase(path=self.docs, vector_db=vector_db)
+        report = incremental_load(knowledge, IngestionManifest("knowledge", self.tmp.joinpath("ingestion")))
+        return vector_db, report, saves
+
+    def test_load_writes_once_and_reopens(self):
+        vector_db, report, saves = self.load()
+        self.assertEqual(report.files_changed, 3)
+        self.assertGreater(report.chunks_upserted, 0)
+        self.assertEqual(saves[-1], len(vector_db.ids))
+        # create() writes the empty collection; the upserts are written once, by optimize()
+        self.assertEqual(len(saves), 2)
+
+        reopened = FlatVectorDb("knowledge", self.embedder, directory=self.tmp.joinpath("flat"))
+        self.assertEqual(reopened.ids, vector_db.ids)
+        self.assertEqual(reopened.search(vector_db.rows[-1]["content"], limit=1)[0].id, vector_db.ids[-1])
+
+    def test_reload_deletes_stale_chunks(self):
+        vector_db, _, _ = self.load()
+        before = set(vector_db.ids)
+        self.docs.joinpath("doc2.txt").unlink()
+        vector_db, report, saves = self.load()
+        self.assertEqual(report.files_removed, 1)
+        self.assertGreater(report.chunks_deleted, 0)
+        self.assertEqual(len(saves), 1)
+        self.assertLess(set(vector_db.ids), before)
+        self.assertNotIn("doc2", {row["name"] for row in vector_db.rows})
+        reopened = FlatVectorDb("knowledge", self.embedder, directory=self.tmp.joinpath("flat"))
+        self.assertEqual(len(reopened.ids), len(before) - report.chunks_deleted)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""``incremental_load`` when the keyword index is behind the manifest."""
+import tempfile
+import unittest
+from pathlib import Path
+
+from agno.knowledge.text import TextKnowledgeBase
+
+from agents.bm25 import BM25Index
+from agents.ingestion import IngestionManifest, incremental_load
+from agents.vectorstores.flat import FlatVectorDb
+from agents.vectorstores.hybrid import HybridVectorDb
+from benchmarks.fakes import FakeEmbedder, synthetic_text
+
+
+class IndexVersionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.docs = self.tmp.joinpath("docs")
+        self.docs.mkdir()
+        for i in range(3):
+            self.docs.joinpath(f"doc{i}.txt").write_text(synthetic_text(i, 300))
+        self.embedder = FakeEmbedder(dimensions=32, call_latency=0.0, per_text_latency=0.0)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def load(self):
+        vector_db = HybridVectorDb(FlatVectorDb("knowledge", self.embedder, directory=self.tmp.joinpath("flat")),
+                                   index=BM25Index(self.tmp.joinpath("bm25", "knowledge.json")))
+        knowledge = TextKnowledgeBase(path=self.docs, vector_db=vector_db)
+        report = incremental_load(knowledge, IngestionManifest("knowledge", self.tmp.joinpath("ingestion")))
+        return vector_db, report
+
+    def test_stale_index_still_deletes_old_chunks(self):
+        vector_db, _ = self.load()
+        doc1 = {point_id for point_id, row in zip(vector_db.vector_db.ids, vector_db.vector_db.rows)
+                if row["name"] == "doc1"}
+        self.assertTrue(doc1)
+
+        # The keyword index is a version behind, and doc1 changed and doc2 went away meanwhile
+        vector_db.mark_indexed(0)
+        self.docs.joinpath("doc1.txt").write_text(synthetic_text(10, 300))
+        self.docs.joinpath("doc2.txt").unlink()
+        vector_db, report = self.load()
+
+        self.assertEqual(report.files_changed, 2)
+        self.assertEqual(report.files_removed, 1)
+        live = set(vector_db.vector_db.ids)
+        self.assertFalse(doc1 & live)
+        self.assertEqual({row["name"] for row in vector_db.vector_db.rows}, {"doc0", "doc1"})
+        self.assertEqual(set(vector_db.index.docs), live)
+        self.assertEqual(vector_db.indexed_version, report.version)
+
+
+if __name__ == "__main__":
+    unittest.main()